@@ -40,3 +40,37 @@ API_ENDPOINTS = {
 
 # 通用下载接口（用于获取导出任务历史和下载文件）
 DOWNLOAD_ENDPOINT = f"{EXPORT_BASE_URL}/export/hxl.export.reporthistory.page"
+
+
+# 各后端域名的模块并发上限（并发执行模式下，同一域名同时运行的模块数）
+HOST_CONCURRENCY_LIMITS = {
+    ERP_BASE_URL: 3,
+    EXPORT_BASE_URL: 3,
+    BI_BASE_URL: 2,
+    WMS_BASE_URL: 2,
+}
+DEFAULT_HOST_CONCURRENCY = 2  # 未配置域名的默认并发上限
+
+# 共享HTTP连接池大小（每个后端域名一个连接池，所有处理器共用）
+HTTP_POOL_SIZES = {
+    ERP_BASE_URL: 8,
+    EXPORT_BASE_URL: 8,
+    BI_BASE_URL: 6,
+    WMS_BASE_URL: 6,
+}
+HTTP_DEFAULT_POOL_SIZE = 8      # 未配置域名（如OSS下载地址）每个域名的连接池大小
+HTTP_DEFAULT_POOL_HOSTS = 10    # 未配置域名最多保留连接池的域名数
+
+# 客户端限流（令牌桶）：按URL前缀分组，最长前缀优先匹配，未匹配的地址（如OSS下载）不限流
+# rate: 每秒补充的请求数，burst: 允许的突发请求数
+RATE_LIMITS = {
+    ERP_BASE_URL: {"rate": 10, "burst": 10},
+    EXPORT_BASE_URL: {"rate": 5, "burst": 10},
+    DOWNLOAD_ENDPOINT: {"rate": 2, "burst": 4},   # 导出历史查询（轮询）单独限制
+    BI_BASE_URL: {"rate": 5, "burst": 5},
+    WMS_BASE_URL: {"rate": 5, "burst": 5},
+}
+
+# 服务端限流/过载信号：以下HTTP状态码，或业务码非0且提示信息包含以下关键字时，退避后重试
+THROTTLE_STATUS_CODES = (429, 502, 503, 504)
+THROTTLE_MSG_KEYWORDS = ("频繁", "限流", "稍后再试", "稍后重试", "繁忙", "too many requests")
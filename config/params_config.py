@@ -10,6 +10,7 @@ import pandas as pd
 from config.settings import DOWNLOADS_DIR
 from config.headers_config import OPERATOR_STORE_ID, COMPANY_ID, OPERATOR
 from utils.logger import get_logger
+from utils.xlsx_reader import read_xlsx
 
 logger = get_logger(__name__)
 
@@ -65,7 +66,7 @@ def get_store_ids_from_file() -> List[int]:
         logger.info(f"读取门店管理数据: {latest_file.name}")
         
         # 读取Excel文件
-        df = pd.read_excel(latest_file)
+        df = read_xlsx(latest_file)
         
         # 提取id字段
         if 'id' not in df.columns:
@@ -117,7 +118,7 @@ def get_item_and_store_ids_from_planning() -> tuple[List[int], List[int]]:
             return [], []
         
         logger.info(f"读取调改店模版: {planning_file.name}")
-        planning_df = pd.read_excel(planning_file, sheet_name="规划清单")
+        planning_df = read_xlsx(planning_file, sheet_name="规划清单")
         
         if '商品代码' not in planning_df.columns or '门店代码' not in planning_df.columns:
             logger.error("规划清单中缺少必要字段")
@@ -138,7 +139,7 @@ def get_item_and_store_ids_from_planning() -> tuple[List[int], List[int]]:
         
         latest_mapping = max(mapping_files, key=lambda f: f.stat().st_mtime)
         logger.info(f"读取组织档案映射: {latest_mapping.name}")
-        mapping_df = pd.read_excel(latest_mapping)
+        mapping_df = read_xlsx(latest_mapping)
         
         # 🔧 关键优化：将code转为字符串后去空格，确保与规划清单匹配
         # （组织档案映射清单中的code已存储为整数，读取时会自动转为数字，需转为字符串匹配）
@@ -163,7 +164,7 @@ def get_item_and_store_ids_from_planning() -> tuple[List[int], List[int]]:
         
         latest_store = max(store_files, key=lambda f: f.stat().st_mtime)
         logger.info(f"读取门店管理数据: {latest_store.name}")
-        store_df = pd.read_excel(latest_store)
+        store_df = read_xlsx(latest_store)
         
         # 🔧 关键修复：将store_number转为字符串类型并去除空格，确保匹配成功
         if 'store_number' not in store_df.columns:
@@ -200,9 +201,15 @@ STORE_PRODUCT_ATTR_EXPORT_PARAMS = {
     "product_actual_attribute": True
 }
 
-def get_download_params():
+def get_download_params(page_number: int = 0, page_size: int = 200, start_date: str = None):
     """
     获取下载接口参数（动态生成当前日期时间）
+    
+    Args:
+        page_number: 页码（从0开始）
+        page_size: 每页条数
+        start_date: 创建日期范围的起始日期（YYYY-MM-DD），默认当天；
+            跨零点等待的任务需要从其提交日期开始查询
     """
     current_date = get_current_date()
     current_datetime = get_current_datetime_iso()
@@ -211,9 +218,9 @@ def get_download_params():
         "operator_store_id": OPERATOR_STORE_ID,
         "company_id": COMPANY_ID,
         "operator": OPERATOR,
-        "page_number": 0,
-        "page_size": 200,
-        "create_time": [current_date, current_date],  # 动态获取当前日期
+        "page_number": page_number,
+        "page_size": page_size,
+        "create_time": [start_date or current_date, current_date],  # 动态获取当前日期
         "start_time": current_datetime,               # 动态获取当前时间
         "end_time": current_datetime,                 # 动态获取当前时间
         "time_desc": 0
@@ -474,6 +481,50 @@ _SALES_ANALYSIS_TEMPLATES = {
 }
 
 
+# 可按天分区增量采集的模板：日期范围长、汇总维度不含日期，数量/金额可按天相加
+SALES_ANALYSIS_PARTITION_TEMPLATES = [
+    "store_adjustment_category_lv3",
+    "store_adjustment_planning_sku",
+    "store_adjustment_all_sku",
+    "store_adjustment_grain_oil_nonfood",
+    "store_adjustment_frozen",
+]
+
+# 按天汇总后仍可相加的汇总维度
+SALES_ANALYSIS_ADDITIVE_SUMMARY_TYPES = {"STORE", "ITEM", "CATEGORY_LV1", "CATEGORY_LV2", "CATEGORY_LV3"}
+
+# 各可分区模板按天汇总时相加的列；导出中出现其他数值列（如库存等快照值）时不按天汇总，改为整段导出
+SALES_ANALYSIS_PARTITION_MEASURE_COLUMNS = {
+    "store_adjustment_category_lv3": ["数量合计", "金额合计"],
+    "store_adjustment_planning_sku": ["数量合计", "金额合计"],
+    "store_adjustment_all_sku": ["数量合计", "金额合计"],
+    "store_adjustment_grain_oil_nonfood": ["数量合计", "金额合计"],
+    "store_adjustment_frozen": ["数量合计", "金额合计"],
+}
+
+# 可能被读取为数值的维度列（按天汇总时作为分组键，不相加）
+SALES_ANALYSIS_PARTITION_NUMERIC_KEY_COLUMNS = ["门店代码", "商品代码", "商品条码"]
+
+
+def is_sales_params_partitionable(template_name, params):
+    """
+    判断销售分析参数是否可以按天拆分后相加还原
+    
+    Args:
+        template_name: 模板名称
+        params: 完整导出参数
+        
+    Returns:
+        bool: 是否可按天分区
+    """
+    if template_name not in SALES_ANALYSIS_PARTITION_TEMPLATES:
+        return False
+    if params.get("query_year_compare") or params.get("date_range") != "DAY":
+        return False
+    summary_types = params.get("summary_types") or []
+    return bool(summary_types) and set(summary_types) <= SALES_ANALYSIS_ADDITIVE_SUMMARY_TYPES
+
+
 def get_sales_analysis_params(template_name="dairy_cold_drinks", bizday=None, store_adjustment_planning_sku_bizday=None, store_adjustment_other_bizday=None):
     """
     获取销售分析参数（动态生成日期和门店ID）
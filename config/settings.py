@@ -14,20 +14,136 @@ DOWNLOADS_DIR = STORAGE_ROOT / "downloads"
 PROCESSED_DIR = STORAGE_ROOT / "processed"
 LOGS_DIR = STORAGE_ROOT / "logs"
 REFERENCE_DIR = STORAGE_ROOT / "reference"  # 架构信息表存储目录
+CACHE_DIR = STORAGE_ROOT / "cache"          # 运行缓存目录（导出耗时统计等）
+PARTITIONS_DIR = STORAGE_ROOT / "partitions"  # 按天分区的导出数据存储目录
 
 # 确保目录存在
-for directory in [DOWNLOADS_DIR, PROCESSED_DIR, LOGS_DIR, REFERENCE_DIR]:
+for directory in [DOWNLOADS_DIR, PROCESSED_DIR, LOGS_DIR, REFERENCE_DIR, CACHE_DIR, PARTITIONS_DIR]:
     directory.mkdir(parents=True, exist_ok=True)
 
 # 请求配置
 REQUEST_TIMEOUT = 30  # 请求超时时间（秒）
 MAX_RETRIES = 3       # 最大重试次数
 RETRY_DELAY = 2       # 重试延迟（秒）
+RETRY_BACKOFF_MAX = 30   # 指数退避的最长等待（秒），实际等待在 [0, min(上限, RETRY_DELAY*2^n)] 内随机
+RETRY_AFTER_MAX = 60     # 服务端 Retry-After 的最长遵循时间（秒）
+API_PAGE_MAX_WORKERS = 4  # 分页接口并发获取的页数上限
+
+# 熔断配置：某个后端连续失败（连接失败、超时、5xx）达到阈值后，在冷却时间内直接失败，
+# 依赖该后端的模块不再重试和轮询；冷却结束后放行一个探测请求，成功即恢复
+CIRCUIT_BREAKER_ENABLED = True
+CIRCUIT_FAILURE_THRESHOLD = 5   # 连续失败次数阈值
+CIRCUIT_RESET_TIMEOUT = 30      # 熔断冷却时间（秒）
+
+# 共享HTTP连接配置（连接池大小见 config/api_config.py 中的 HTTP_POOL_SIZES）
+HTTP_PREWARM_ENABLED = True     # 执行模块前预先建立到各后端域名的连接（TLS握手提前完成）
+HTTP_PREWARM_CONNECTIONS = 2    # 每个域名预热的连接数
+HTTP_PREWARM_TIMEOUT = 5        # 预热请求超时时间（秒）
+
+# 文件下载配置
+# 下载先写入 .part 临时文件，中断后用 Range 请求从已下载的位置续传，完成并校验长度后再改名
+DOWNLOAD_MAX_ATTEMPTS = 5       # 单个文件的最大下载（续传）次数
+
+# 分段并行下载（服务器返回 Accept-Ranges: bytes 且文件足够大时启用，否则单连接下载）
+SEGMENTED_DOWNLOAD_ENABLED = True
+SEGMENTED_DOWNLOAD_MIN_SIZE = 8 * 1024 * 1024    # 启用分段下载的最小文件大小（字节）
+SEGMENTED_DOWNLOAD_PART_SIZE = 4 * 1024 * 1024   # 每个分段的大小（字节），也是续传的最小单位
+SEGMENTED_DOWNLOAD_CONNECTIONS = 4               # 并行下载连接数（不超过OSS域名连接池大小）
+
+# 内存交接：下载完成后立即解析并登记数据，同一进程内的报表直接使用，不再重复读取和解析文件
+# 文件仍会保存到下载目录用于留档；数据常驻内存直到进程结束
+IN_MEMORY_HANDOFF_ENABLED = False
+HANDOFF_PARSE_WORKERS = 2   # 下载后解析的线程数（独立于下载线程，解析不占用下载并发）
+
+# xlsx 读取引擎："openpyxl"、"calamine"（需要安装 python-calamine）或 "auto"
+# auto：仅当 xlsx 基准测试（python -m utils.xlsx_benchmark）确认 calamine 与 openpyxl 在某模块文件上的读取结果
+# （类型和值）完全一致时该模块使用 calamine，否则使用 openpyxl
+XLSX_READER_ENGINE = "auto"
+XLSX_READER_MODULE_ENGINES = {}     # 按模块（文件名前缀）指定引擎，如 {"库存查询": "openpyxl"}
+XLSX_READER_CHECK_FILE = CACHE_DIR / "xlsx_reader_check.json"  # 基准测试的一致性校验结果
+
+# 数据加载缓存：同一进程内多个报表加载同一文件时只解析一次，按内存预算淘汰最久未使用的数据
+LOADER_CACHE_ENABLED = True
+LOADER_CACHE_MAX_BYTES = 1024 * 1024 * 1024  # 内存预算（字节）
+
+# 加载数据时按模块转换为紧凑类型（分类类型、定宽整数等，见 utils/frame_schema.py）
+FRAME_SCHEMA_ENABLED = False  # 默认关闭：会改变列类型，与生产结果核对后再开启
+
+# 列式旁路缓存（需要安装 pyarrow，未安装时自动跳过）
+# 下载目录中的 xlsx 首次解析后另存为列式文件（同目录下的 SIDECAR_DIR_NAME 子目录），
+# 以源文件的大小、修改时间和哈希校验，之后加载同一文件时直接读取列式文件
+SIDECAR_CACHE_ENABLED = False      # 默认关闭：与直接读取 xlsx 的结果核对后再开启
+SIDECAR_FORMAT = "parquet"          # "parquet" 或 "feather"
+SIDECAR_DIR_NAME = ".columnar"
+SIDECAR_WRITE_ON_DOWNLOAD = False   # 下载完成后立即生成（在下载后解析线程中进行），否则在首次加载时生成
 
 # 导出任务轮询配置
 EXPORT_POLL_INTERVAL = 15   # 轮询间隔（秒）- 优化为15秒，更快响应
 EXPORT_MAX_WAIT_TIME = 300  # 最大等待时间（秒）- 给足够时间让任务完成
-EXPORT_INITIAL_WAIT = 20    # 初始等待时间（秒）- 等待任务启动和记录生成
+EXPORT_INITIAL_WAIT = 20    # 初始等待时间上限（秒）- 自适应轮询的首次等待不超过此值
+EXPORT_RESULT_TIMEOUT_SLACK = 2 * EXPORT_POLL_INTERVAL  # 等待轮询结果的额外宽限（秒）- 轮询器异常未返回结果时调用方不再无限等待
+
+# 自适应轮询配置（根据导出进度 schedule 估算剩余时间）
+EXPORT_POLL_MIN_INTERVAL = 2       # 最短轮询间隔（秒）
+EXPORT_POLL_MAX_INTERVAL = EXPORT_POLL_INTERVAL  # 最长轮询间隔（秒）- 退避上限
+EXPORT_POLL_BACKOFF_FACTOR = 1.5   # 无进度信息时的退避倍数
+EXPORT_FIRST_POLL_DEFAULT = 3      # 无历史耗时记录时的首次轮询等待（秒）
+EXPORT_DURATION_EWMA_ALPHA = 0.3   # 历史耗时学习的平滑系数（越大越偏向最近一次）
+EXPORT_DURATION_STATS_FILE = CACHE_DIR / "export_durations.json"  # 各模块导出耗时统计
+
+# 导出历史索引配置（轮询时按页读取历史列表，直到覆盖最早的等待任务）
+EXPORT_HISTORY_PAGE_SIZE = 200     # 每页条数
+EXPORT_HISTORY_MAX_PAGES = 5       # 单次轮询最多读取的页数
+
+# 导出结果复用缓存（相同导出URL+参数在有效期内直接复用已下载的文件，跳过导出）
+# 单次运行可在 MODULE_PARAMS 中传入 force_refresh=True 强制重新导出
+EXPORT_CACHE_ENABLED = False  # 默认关闭：复用的可能是较早的导出结果，与生产结果核对后再开启
+EXPORT_CACHE_FILE = CACHE_DIR / "export_cache.json"
+EXPORT_CACHE_DEFAULT_TTL = 3600  # 默认有效期（秒）
+EXPORT_CACHE_TTL = {             # 按导出模块名称设置有效期（秒），0 表示不缓存
+    "库存查询": 1800,
+    "库存库位明细": 1800,
+    "门店商品属性": 3600,
+    "组织商品档案": 6 * 3600,
+    "商品销售分析": 6 * 3600,
+    "配送分析": 3600,
+}
+
+# 模块并发执行配置
+# 导出类模块大部分时间在等待导出完成，并发执行可重叠等待阶段
+# 每个后端域名的并发上限见 config/api_config.py 中的 HOST_CONCURRENCY_LIMITS
+MODULE_CONCURRENCY_ENABLED = True  # 是否并发执行采集模块（False 为逐个顺序执行）
+MODULE_MAX_WORKERS = 6             # 并发执行的工作线程总数上限
+EXPORT_BATCH_ENABLED = True        # 同一导出模块的多组参数（如销售分析多模板）先全部提交再统一等待
+
+# 采集-报表流水线配置
+# 报表依赖的采集模块完成后立即生成，无需等待全部模块结束
+PIPELINE_ENABLED = True   # 是否按依赖关系交错执行采集和报表（仅线程并发模式）
+REPORT_MAX_WORKERS = 2    # 同时生成的报表数上限
+
+# 库存统计（多仓库）配置
+INVENTORY_STATISTICS_CONSOLIDATE = False  # 是否将各仓库的库存库位明细合并为一个汇总文件
+
+# 组织档案映射清单增量同步配置
+# 本地快照（code → item_id, name）保存在 ORG_ITEM_MAPPING_SNAPSHOT_FILE，每次只查询上次同步以来更新过的商品并合并；
+# 增量查询看不到被删除/隐藏的商品，因此按 ORG_ITEM_MAPPING_FULL_SYNC_DAYS 定期全量重建，
+# 单次运行也可在 MODULE_PARAMS 中传入 full_sync=True 强制全量
+ORG_ITEM_MAPPING_DELTA_SYNC_ENABLED = False  # 默认关闭：与全量结果核对后再开启
+ORG_ITEM_MAPPING_SNAPSHOT_FILE = CACHE_DIR / "org_item_mapping_snapshot.json"
+ORG_ITEM_MAPPING_FULL_SYNC_DAYS = 7  # 距上次全量同步超过N天时自动全量，0 表示每次全量
+
+# 销售分析按天分区配置（仅对 SALES_ANALYSIS_PARTITION_TEMPLATES 中可按天相加的模板生效）
+# 每天的数据单独导出并保存到 PARTITIONS_DIR，再次运行时只导出缺失的日期，再汇总为请求的日期范围
+SALES_PARTITION_ENABLED = False  # 默认关闭：结果由分区汇总而来，与生产结果核对后再开启
+SALES_PARTITION_REFRESH_DAYS = 2        # 最近N天的分区每次重新导出（数据可能仍在补录）
+SALES_PARTITION_MAX_MISSING_DAYS = 15   # 缺失天数超过此值时本次改为整段导出
+SALES_PARTITION_BACKFILL_DAYS = 3       # 整段导出时每次运行顺带补齐的分区天数（逐步补齐，不在首次运行集中提交）
+
+# 异步执行配置（需要安装 aiohttp）
+# 启用后由单个事件循环驱动所有导出与下载，替代线程池并发
+ASYNC_PIPELINE_ENABLED = False  # 是否使用 asyncio 异步流水线执行采集模块
+ASYNC_HTTP_POOL_SIZE = 50       # 异步HTTP客户端共享连接池的总连接数上限
+ASYNC_HTTP_POOL_PER_HOST = 10   # 异步HTTP客户端每个域名的连接数上限
 
 # 日志配置
 LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
@@ -2,7 +2,17 @@
 应用程序执行器 - 统一模块调用接口
 """
 
-from typing import Dict, Any, Optional
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Dict, Any, Optional, List, Set, Callable
+from urllib.parse import urlparse
+from config.api_config import EXPORT_ENDPOINTS, API_ENDPOINTS, HOST_CONCURRENCY_LIMITS, DEFAULT_HOST_CONCURRENCY
+from config.api_config import DOWNLOAD_ENDPOINT
+from config.settings import MODULE_CONCURRENCY_ENABLED, MODULE_MAX_WORKERS, EXPORT_BATCH_ENABLED, HTTP_PREWARM_ENABLED
+from core.http_transport import get_transport
+from core.circuit_breaker import get_circuit_breakers, STATE_DISPLAY_NAMES
+from core.base_module import ExportBasedModule
 from modules.store_product_attr import StoreProductAttrModule
 from modules.org_product_info import OrgProductInfoModule
 from modules.inventory_query import InventoryQueryModule
@@ -43,8 +53,18 @@ class AppRunner:
         "org_item_mapping": "组织档案映射清单",
     }
     
+    # 模块之间的输入依赖：生成导出参数时读取其他模块的下载文件，
+    # 本次运行同时采集这些模块时必须等其完成后再执行（未启用时使用已有文件）
+    MODULE_DEPENDENCIES = {
+        "sales_analysis": ["store_management", "org_item_mapping"],
+    }
+    
     def __init__(self):
         self.results = {}
+        self._print_lock = threading.Lock()
+        self._host_lock = threading.Lock()
+        self._host_semaphores: Dict[str, threading.Semaphore] = {}
+        self._async_host_semaphores: Dict[str, asyncio.Semaphore] = {}
     
     def run_module(self, module_key: str, module_config: Any) -> bool:
         """
@@ -61,6 +81,9 @@ class AppRunner:
             logger.error(f"未知模块: {module_key}")
             return False
         
+        if self.is_circuit_open(module_key):
+            return False
+        
         try:
             # 获取模块类
             module_class = self.MODULE_CLASSES[module_key]
@@ -90,6 +113,100 @@ class AppRunner:
             logger.error(f"{self.MODULE_DISPLAY_NAMES.get(module_key, module_key)}模块异常: {str(e)}")
             return False
     
+    def run_module_batch(self, module_key: str, module_configs: List[Any]) -> List[bool]:
+        """
+        批量执行同一导出模块的多组配置（先全部提交，再统一等待）
+        
+        Args:
+            module_key: 模块键名（必须是导出类模块）
+            module_configs: 模块配置列表
+            
+        Returns:
+            List[bool]: 与 module_configs 顺序一致的执行结果
+        """
+        display_name = self.MODULE_DISPLAY_NAMES.get(module_key, module_key)
+        if self.is_circuit_open(module_key):
+            return [False] * len(module_configs)
+        
+        try:
+            module = self.MODULE_CLASSES[module_key]()
+            kwargs_list = [self._parse_module_config(config) for config in module_configs]
+            
+            logger.info(f"开始批量执行模块: {display_name}，共 {len(kwargs_list)} 组参数")
+            
+            file_paths = module.execute_batch(kwargs_list)
+            return [bool(path) for path in file_paths]
+            
+        except Exception as e:
+            logger.error(f"{display_name}模块批量执行异常: {str(e)}")
+            return [False] * len(module_configs)
+    
+    async def run_module_async(self, module_key: str, module_config: Any) -> bool:
+        """
+        统一执行模块（异步版本，调用模块的 execute_async）
+        
+        Args:
+            module_key: 模块键名
+            module_config: 模块配置（可以是bool/dict）
+            
+        Returns:
+            bool: 执行是否成功
+        """
+        if module_key not in self.MODULE_CLASSES:
+            logger.error(f"未知模块: {module_key}")
+            return False
+        
+        if self.is_circuit_open(module_key):
+            return False
+        
+        try:
+            module_class = self.MODULE_CLASSES[module_key]
+            display_name = self.MODULE_DISPLAY_NAMES.get(module_key, module_key)
+            
+            module = module_class()
+            kwargs = self._parse_module_config(module_config)
+            
+            logger.info(f"开始异步执行模块: {display_name}")
+            if kwargs:
+                logger.info(f"模块参数: {list(kwargs.keys())}")
+            
+            result = await module.execute_async(**kwargs)
+            
+            if result:
+                logger.info(f"{display_name}执行成功: {result}")
+                return True
+            else:
+                logger.error(f"{display_name}执行失败")
+                return False
+                
+        except Exception as e:
+            logger.error(f"{self.MODULE_DISPLAY_NAMES.get(module_key, module_key)}模块异常: {str(e)}")
+            return False
+    
+    def is_circuit_open(self, module_key: str) -> bool:
+        """
+        模块依赖的后端是否处于熔断（处于熔断时直接判定失败，不再创建模块执行）
+        
+        导出类模块同时依赖导出接口和导出历史接口所在的后端
+        
+        Args:
+            module_key: 模块键名
+            
+        Returns:
+            bool: 处于熔断返回True
+        """
+        urls = [EXPORT_ENDPOINTS.get(module_key) or API_ENDPOINTS.get(module_key)]
+        if issubclass(self.MODULE_CLASSES[module_key], ExportBasedModule):
+            urls.append(DOWNLOAD_ENDPOINT)
+        
+        breakers = get_circuit_breakers()
+        for url in urls:
+            if url and breakers.is_open(url):
+                logger.error(f"{self.MODULE_DISPLAY_NAMES.get(module_key, module_key)}依赖的后端熔断中，跳过执行: "
+                             f"{self._get_base_url(url)}")
+                return True
+        return False
+    
     def _parse_module_config(self, config: Any) -> Dict[str, Any]:
         """
         解析模块配置（用于向后兼容）
@@ -110,7 +227,8 @@ class AppRunner:
             return {}
     
     def execute_modules(self, module_switches: Dict[str, Any], 
-                       module_params: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+                       module_params: Optional[Dict[str, Dict[str, Any]]] = None,
+                       concurrent: Optional[bool] = None) -> Dict[str, Any]:
         """
         执行启用的模块（统一调用方式）
         
@@ -123,6 +241,9 @@ class AppRunner:
                 格式: {"module_name": {"param1": "value1", ...}}
                 只对启用的模块生效
                 
+            concurrent: 是否并发执行（默认读取 MODULE_CONCURRENCY_ENABLED）
+                并发模式使用有界线程池，并按后端域名限制同时运行的模块数
+                
         Returns:
             dict: 执行结果统计
             
@@ -139,12 +260,89 @@ class AppRunner:
                 }
             }
         """
+        if concurrent is None:
+            concurrent = MODULE_CONCURRENCY_ENABLED
+        
+        jobs = self.build_jobs(module_switches, module_params)
+        groups = self.group_jobs(jobs)
+        self.prewarm_connections(jobs)
+        
+        if concurrent and len(groups) > 1:
+            max_workers = max(1, min(MODULE_MAX_WORKERS, len(groups)))
+            logger.info(f"并发执行 {len(jobs)} 个模块任务（{len(groups)} 组），工作线程数: {max_workers}")
+        else:
+            max_workers = 1
+        job_results = self.run_job_groups(jobs, groups, max_workers)
+        
+        return self.summarize(jobs, job_results)
+    
+    async def execute_modules_async(self, module_switches: Dict[str, Any],
+                                    module_params: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        在单个事件循环中执行启用的模块（异步流水线，需要 aiohttp）
+        
+        所有导出模块共享一个HTTP连接池，等待导出完成时不占用线程；
+        按后端域名限流的规则与 execute_modules 并发模式一致
+        
+        Args:
+            module_switches: 模块启用开关字典（格式同 execute_modules）
+            module_params: 模块参数配置字典（可选）
+            
+        Returns:
+            dict: 执行结果统计
+        """
+        from core.async_request_handler import close_async_session
+        
+        jobs = self.build_jobs(module_switches, module_params)
+        dependencies = self.build_job_dependencies(jobs)
+        logger.info(f"异步执行 {len(jobs)} 个模块任务")
+        
+        tasks: Dict[int, asyncio.Task] = {}
+        
+        async def run_after_dependencies(index: int) -> bool:
+            # 所有任务创建完成后才开始执行，依赖的任务都已在 tasks 中
+            if dependencies[index]:
+                await asyncio.gather(*(tasks[dependency] for dependency in dependencies[index]))
+            return await self._run_job_async(jobs[index])
+        
+        try:
+            for index in range(len(jobs)):
+                tasks[index] = asyncio.ensure_future(run_after_dependencies(index))
+            job_results = await asyncio.gather(*(tasks[index] for index in range(len(jobs))))
+        finally:
+            await close_async_session()
+        
+        return self.summarize(jobs, list(job_results))
+    
+    def summarize(self, jobs: List[Dict[str, Any]], job_results: List[bool]) -> Dict[str, Any]:
+        """汇总任务执行结果并保存到 self.results"""
+        success_modules = sum(1 for result in job_results if result)
+        failed_modules = [job["label"] for job, result in zip(jobs, job_results) if not result]
+        
+        self.results = {
+            "total": len(jobs),
+            "success": success_modules,
+            "failed": failed_modules,
+            "circuits": get_circuit_breakers().get_summary()
+        }
+        return self.results
+    
+    def build_jobs(self, module_switches: Dict[str, Any],
+                   module_params: Optional[Dict[str, Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """
+        根据模块开关和参数生成待执行的任务列表（按配置顺序）
+        
+        Args:
+            module_switches: 模块启用开关字典
+            module_params: 模块参数配置字典（可选）
+            
+        Returns:
+            List[Dict]: 任务列表，每项包含 module_key / config / label / start_message / success_message / fail_message
+        """
         if module_params is None:
             module_params = {}
         
-        total_modules = 0
-        success_modules = 0
-        failed_modules = []
+        jobs = []
         
         for module_key, module_switch in module_switches.items():
             # 向后兼容：处理旧格式配置
@@ -152,6 +350,9 @@ class AppRunner:
             # 新格式: "sales_analysis": True/False
             # 🆕 多报表格式: "sales_analysis": {"dairy_cold_drinks": True, "store_adjustment_category_lv3": False}
             
+            # 获取显示名称
+            display_name = self.MODULE_DISPLAY_NAMES.get(module_key, module_key)
+            
             # 处理多报表开关（字典格式，但不包含 template_name 键）
             if isinstance(module_switch, dict) and "template_name" not in module_switch:
                 # 多报表模式：{"template1": True, "template2": False}
@@ -159,9 +360,6 @@ class AppRunner:
                     if not is_enabled:
                         continue
                     
-                    # 获取显示名称
-                    display_name = self.MODULE_DISPLAY_NAMES.get(module_key, module_key)
-                    
                     # 获取模板参数
                     template_config = {"template_name": template_name}
                     
@@ -169,18 +367,14 @@ class AppRunner:
                     if module_key in module_params:
                         template_config.update(module_params[module_key])
                     
-                    # 打印执行信息
-                    total_modules += 1
-                    print(f">> 执行{display_name}模块（模板: {template_name}）...")
-                    
-                    # 执行模块
-                    if self.run_module(module_key, template_config):
-                        success_modules += 1
-                        print(f"[成功] {display_name} - {template_name}模块完成")
-                    else:
-                        failed_modules.append(f"{display_name} - {template_name}")
-                        print(f"[失败] {display_name} - {template_name}模块失败")
-                    print()
+                    jobs.append({
+                        "module_key": module_key,
+                        "config": template_config,
+                        "label": f"{display_name} - {template_name}",
+                        "start_message": f">> 执行{display_name}模块（模板: {template_name}）...",
+                        "success_message": f"[成功] {display_name} - {template_name}模块完成",
+                        "fail_message": f"[失败] {display_name} - {template_name}模块失败",
+                    })
                 
                 continue  # 跳过后续处理
             
@@ -200,31 +394,273 @@ class AppRunner:
             if not is_enabled:
                 continue
             
-            # 获取显示名称
-            display_name = self.MODULE_DISPLAY_NAMES.get(module_key, module_key)
-            
             # 获取模块参数（如果有）
             module_config = module_params.get(module_key, {})
-            
-            # 打印执行信息
-            total_modules += 1
             config_info = self._get_config_display(module_config)
-            print(f">> 执行{display_name}模块{config_info}...")
             
-            # 执行模块
-            if self.run_module(module_key, module_config):
-                success_modules += 1
-                print(f"[成功] {display_name}模块完成")
-            else:
-                failed_modules.append(display_name)
-                print(f"[失败] {display_name}模块失败")
+            jobs.append({
+                "module_key": module_key,
+                "config": module_config,
+                "label": display_name,
+                "start_message": f">> 执行{display_name}模块{config_info}...",
+                "success_message": f"[成功] {display_name}模块完成",
+                "fail_message": f"[失败] {display_name}模块失败",
+            })
+        
+        return jobs
+    
+    def group_jobs(self, jobs: List[Dict[str, Any]]) -> List[List[int]]:
+        """
+        将同一导出模块的多个任务（如 sales_analysis 的多个模板）合并为一个批次
+        
+        Args:
+            jobs: build_jobs 生成的任务列表
+            
+        Returns:
+            List[List[int]]: 任务下标分组（按首次出现顺序），未启用批量时每组一个任务
+        """
+        groups: Dict[str, List[int]] = {}
+        ordered_groups: List[List[int]] = []
+        
+        for index, job in enumerate(jobs):
+            module_class = self.MODULE_CLASSES.get(job["module_key"])
+            batchable = (EXPORT_BATCH_ENABLED and module_class is not None
+                         and issubclass(module_class, ExportBasedModule))
+            if batchable and job["module_key"] in groups:
+                groups[job["module_key"]].append(index)
+                continue
+            
+            group = [index]
+            if batchable:
+                groups[job["module_key"]] = group
+            ordered_groups.append(group)
+        
+        return ordered_groups
+    
+    def _run_job_group(self, jobs: List[Dict[str, Any]]) -> List[bool]:
+        """
+        执行一组任务并打印执行信息（多个任务时批量提交导出）
+        
+        Args:
+            jobs: 同一模块的任务列表
+            
+        Returns:
+            List[bool]: 与 jobs 顺序一致的执行结果
+        """
+        if len(jobs) == 1:
+            return [self._run_job(jobs[0])]
+        
+        with self._print_lock:
+            for job in jobs:
+                print(job["start_message"])
+        
+        results = self.run_module_batch(jobs[0]["module_key"], [job["config"] for job in jobs])
+        
+        with self._print_lock:
+            for job, success in zip(jobs, results):
+                print(job["success_message"] if success else job["fail_message"])
             print()
         
-        return {
-            "total": total_modules,
-            "success": success_modules,
-            "failed": failed_modules
-        }
+        return results
+    
+    def _run_job(self, job: Dict[str, Any]) -> bool:
+        """
+        执行单个任务并打印执行信息
+        
+        Args:
+            job: build_jobs 生成的任务
+            
+        Returns:
+            bool: 执行是否成功
+        """
+        with self._print_lock:
+            print(job["start_message"])
+        
+        success = self.run_module(job["module_key"], job["config"])
+        
+        with self._print_lock:
+            print(job["success_message"] if success else job["fail_message"])
+            print()
+        
+        return success
+    
+    def build_job_dependencies(self, jobs: List[Dict[str, Any]]) -> List[Set[int]]:
+        """
+        计算每个任务依赖的任务（按 MODULE_DEPENDENCIES，只包含本次运行中的任务）
+        
+        Args:
+            jobs: build_jobs 生成的任务列表
+            
+        Returns:
+            List[Set[int]]: 与 jobs 顺序一致，每个任务依赖的任务下标
+        """
+        module_jobs: Dict[str, Set[int]] = {}
+        for index, job in enumerate(jobs):
+            module_jobs.setdefault(job["module_key"], set()).add(index)
+        
+        dependencies = []
+        for job in jobs:
+            job_indexes = set()
+            for module_key in self.MODULE_DEPENDENCIES.get(job["module_key"], []):
+                job_indexes |= module_jobs.get(module_key, set())
+            dependencies.append(job_indexes)
+        return dependencies
+    
+    def run_job_groups(self, jobs: List[Dict[str, Any]], groups: List[List[int]], max_workers: int,
+                       on_group_done: Optional[Callable[[List[int], List[bool]], None]] = None) -> List[bool]:
+        """
+        按模块依赖执行任务分组（有界线程池 + 按域名限流）
+        
+        分组所依赖的任务全部结束后才开始执行（依赖失败时仍然执行，使用已有数据文件）；
+        max_workers 为 1 时按依赖顺序逐组执行
+        
+        Args:
+            jobs: build_jobs 生成的任务列表
+            groups: group_jobs 生成的任务下标分组
+            max_workers: 工作线程数
+            on_group_done: 每组结束时的回调（任务下标分组, 执行结果）
+            
+        Returns:
+            List[bool]: 与 jobs 顺序一致的执行结果
+        """
+        job_dependencies = self.build_job_dependencies(jobs)
+        group_of_job = {index: group_index for group_index, group in enumerate(groups) for index in group}
+        remaining = {}
+        for group_index, group in enumerate(groups):
+            dependencies = {group_of_job[dependency] for index in group for dependency in job_dependencies[index]}
+            dependencies.discard(group_index)
+            remaining[group_index] = dependencies
+            if dependencies:
+                logger.info(f"{jobs[group[0]]['label']} 等待依赖模块: "
+                            f"{sorted({jobs[groups[dependency][0]]['label'] for dependency in dependencies})}")
+        
+        job_results = [False] * len(jobs)
+        running: Dict[Future, int] = {}
+        with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="module") as executor:
+            
+            def submit_ready():
+                for group_index in [index for index, dependencies in remaining.items() if not dependencies]:
+                    del remaining[group_index]
+                    future = executor.submit(self.run_group,
+                                             [jobs[index] for index in groups[group_index]])
+                    running[future] = group_index
+            
+            submit_ready()
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    group_index = running.pop(future)
+                    results = future.result()
+                    for index, success in zip(groups[group_index], results):
+                        job_results[index] = success
+                    if on_group_done is not None:
+                        on_group_done(groups[group_index], results)
+                    for dependencies in remaining.values():
+                        dependencies.discard(group_index)
+                submit_ready()
+        
+        if remaining:
+            # 依赖成环（配置错误）时这些分组无法执行
+            logger.error(f"模块依赖存在循环，未执行: {[jobs[groups[index][0]]['label'] for index in remaining]}")
+        return job_results
+    
+    def run_group(self, jobs: List[Dict[str, Any]]) -> List[bool]:
+        """在所属后端域名的并发名额内执行一组任务（一组只占用一个名额）"""
+        try:
+            with self._get_host_semaphore(jobs[0]["module_key"]):
+                return self._run_job_group(jobs)
+        except Exception as e:
+            logger.error(f"{jobs[0]['label']}任务调度异常: {str(e)}")
+            return [False] * len(jobs)
+    
+    async def _run_job_async(self, job: Dict[str, Any]) -> bool:
+        """在所属后端域名的并发名额内异步执行任务"""
+        try:
+            async with self._get_async_host_semaphore(job["module_key"]):
+                print(job["start_message"])
+                success = await self.run_module_async(job["module_key"], job["config"])
+                print(job["success_message"] if success else job["fail_message"])
+                print()
+                return success
+        except Exception as e:
+            logger.error(f"{job['label']}任务调度异常: {str(e)}")
+            return False
+    
+    def _get_async_host_semaphore(self, module_key: str) -> asyncio.Semaphore:
+        """获取模块所属后端域名的异步并发信号量（限额与线程模式一致）"""
+        host = self.get_module_host(module_key)
+        if host not in self._async_host_semaphores:
+            self._async_host_semaphores[host] = asyncio.Semaphore(self._get_host_limit(host))
+        return self._async_host_semaphores[host]
+    
+    def _get_host_semaphore(self, module_key: str) -> threading.Semaphore:
+        """
+        获取模块所属后端域名的并发信号量
+        
+        Args:
+            module_key: 模块键名
+            
+        Returns:
+            threading.Semaphore: 该域名共享的信号量
+        """
+        host = self.get_module_host(module_key)
+        with self._host_lock:
+            if host not in self._host_semaphores:
+                self._host_semaphores[host] = threading.Semaphore(self._get_host_limit(host))
+            return self._host_semaphores[host]
+    
+    @staticmethod
+    def _get_host_limit(host: str) -> int:
+        """获取域名的并发上限（未配置时使用 DEFAULT_HOST_CONCURRENCY）"""
+        limit = DEFAULT_HOST_CONCURRENCY
+        for base_url, host_limit in HOST_CONCURRENCY_LIMITS.items():
+            if urlparse(base_url).netloc == host:
+                limit = host_limit
+                break
+        return max(1, limit)
+    
+    @staticmethod
+    def get_module_host(module_key: str) -> str:
+        """
+        获取模块访问的后端域名
+        
+        Args:
+            module_key: 模块键名
+            
+        Returns:
+            str: 域名（未配置接口的模块返回模块键名本身）
+        """
+        url = EXPORT_ENDPOINTS.get(module_key) or API_ENDPOINTS.get(module_key)
+        if not url:
+            return module_key
+        return urlparse(url).netloc
+    
+    def prewarm_connections(self, jobs: List[Dict[str, Any]]):
+        """
+        预热任务将要访问的后端域名连接（含导出历史查询域名）
+        
+        Args:
+            jobs: build_jobs 生成的任务列表
+        """
+        if not HTTP_PREWARM_ENABLED or not jobs:
+            return
+        
+        base_urls = {self._get_base_url(DOWNLOAD_ENDPOINT)}
+        for job in jobs:
+            url = EXPORT_ENDPOINTS.get(job["module_key"]) or API_ENDPOINTS.get(job["module_key"])
+            if url:
+                base_urls.add(self._get_base_url(url))
+        
+        try:
+            get_transport().prewarm(sorted(base_urls))
+        except Exception as e:
+            logger.warning(f"连接预热失败: {str(e)}")
+    
+    @staticmethod
+    def _get_base_url(url: str) -> str:
+        """获取URL的 scheme://域名 部分"""
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc}"
     
     def _get_config_display(self, config: Any) -> str:
         """
@@ -256,6 +692,10 @@ class AppRunner:
         if results['failed']:
             print(f"失败模块: {', '.join(results['failed'])}")
         
+        for base_url, status in results.get('circuits', {}).items():
+            print(f"[熔断] {base_url}: 当前{STATE_DISPLAY_NAMES[status['state']]}，"
+                  f"熔断 {status['trips']} 次，快速失败请求 {status['rejected']} 个")
+        
         if results['total'] == 0:
             print("[警告] 没有启用任何模块，请检查模块开关配置")
         elif results['success'] == results['total']:
@@ -0,0 +1,139 @@
+"""
+异步文件下载处理器
+"""
+
+import os
+from pathlib import Path
+from typing import Optional
+from core.async_request_handler import AsyncRequestHandler
+from config.settings import DOWNLOADS_DIR
+from utils.logger import get_logger
+from utils.frame_registry import handoff_downloaded_file, is_handoff_enabled
+from utils.file_utils import generate_timestamped_filename, ensure_dir_exists, cleanup_module_files
+
+logger = get_logger(__name__)
+
+
+class AsyncDownloadHandler:
+    """处理异步文件下载逻辑（与 DownloadHandler 一致，但不支持断点续传和分段下载）"""
+
+    def __init__(self):
+        self.request_handler = AsyncRequestHandler()
+
+    async def download_file(self, url: str, module_name: str,
+                            save_dir: Optional[Path] = None,
+                            content: Optional[bytearray] = None) -> Optional[Path]:
+        """
+        从URL下载文件（支持阿里云OSS直接下载）
+
+        异步模式不支持断点续传和分段下载：下载中断或长度与 Content-Length 不一致时删除文件并返回None，
+        需要续传的大文件请使用同步下载（DownloadHandler）
+
+        Args:
+            url: 文件下载URL（阿里云OSS地址）
+            module_name: 模块名称（用于文件命名）
+            save_dir: 保存目录，默认为DOWNLOADS_DIR
+            content: 传入时收集下载的内容
+
+        Returns:
+            保存的文件路径，失败返回None
+        """
+        if not url:
+            logger.error("下载URL为空")
+            return None
+
+        logger.info(f"开始异步下载文件: {url}")
+
+        # 确定保存目录
+        if save_dir is None:
+            save_dir = DOWNLOADS_DIR
+        ensure_dir_exists(save_dir)
+
+        # 从URL提取文件名或生成新文件名
+        original_filename = url.split("/")[-1].split("?")[0]  # 去除查询参数
+        file_extension = os.path.splitext(original_filename)[1] or ".xlsx"
+
+        # 生成本地文件名
+        local_filename = generate_timestamped_filename(module_name, file_extension.lstrip('.'))
+        save_path = save_dir / local_filename
+
+        try:
+            response = await self.request_handler.get(url)
+
+            if not response:
+                logger.error("下载请求失败")
+                return None
+
+            # 压缩传输时 Content-Length 与解压后的长度不同，无法校验
+            content_length = response.headers.get("Content-Length")
+            identity = response.headers.get("Content-Encoding", "identity") == "identity"
+            total = int(content_length) if content_length and identity else None
+
+            # 写入文件
+            logger.info(f"保存文件到: {save_path}")
+            try:
+                with open(save_path, 'wb') as f:
+                    async for chunk in response.content.iter_chunked(8192):
+                        if chunk:
+                            f.write(chunk)
+                            if content is not None:
+                                content.extend(chunk)
+            finally:
+                response.release()
+
+            file_size = os.path.getsize(save_path)
+            if total is not None and file_size != total:
+                raise IOError(f"文件长度不一致: 期望 {total} 字节，实际 {file_size} 字节")
+            logger.info(f"文件下载成功: {save_path} (大小: {file_size / 1024:.2f} KB)")
+            return save_path
+
+        except Exception as e:
+            logger.error(f"文件下载失败: {str(e)}")
+            # 清理失败的文件
+            if save_path.exists():
+                save_path.unlink()
+            return None
+
+    async def download_from_export(
+        self,
+        download_url: str,
+        module_name: str,
+        file_name_prefix: Optional[str] = None,
+    ) -> Optional[Path]:
+        """
+        从导出任务获取的URL下载文件
+
+        Args:
+            download_url: 导出任务返回的下载URL
+            module_name: 模块名称
+            file_name_prefix: 文件名前缀，默认使用模块名称
+
+        Returns:
+            保存的文件路径，失败返回None
+        """
+        logger.info(f"开始下载文件: {download_url}")
+
+        # 确保下载目录存在
+        ensure_dir_exists(DOWNLOADS_DIR)
+
+        filename_base = file_name_prefix or module_name
+
+        # 🗑️ 清理旧文件（确保文件夹中每个类型只有一个文件）
+        deleted_count = cleanup_module_files(
+            DOWNLOADS_DIR, filename_base, keep_latest=0
+        )
+        if deleted_count > 0:
+            logger.info(f"清理了 {deleted_count} 个旧的 {filename_base} 文件")
+
+        # 下载新文件（需要下载后解析时保留下载内容，解析时不再读取文件）
+        content = bytearray() if is_handoff_enabled() else None
+        result = await self.download_file(download_url, filename_base, content=content)
+
+        # 内存交接模式：在解析线程中解析并登记（不阻塞事件循环）
+        handoff_downloaded_file(result, content)
+
+        if result:
+            file_size_kb = result.stat().st_size / 1024
+            print(f"[完成] 新文件下载完成: {result.name} ({file_size_kb:.2f} KB)")
+
+        return result
@@ -0,0 +1,126 @@
+"""
+异步导出任务处理器
+提交请求走异步HTTP客户端，等待阶段挂在共享导出历史轮询器上，不占用事件循环
+"""
+
+import asyncio
+import datetime
+from typing import Optional, Dict, Any, Tuple
+from core.async_request_handler import AsyncRequestHandler, aiohttp
+from core.columnar_json import loads_json
+from core.export_handler import ExportHandler
+from core.export_poller import get_export_poller, get_result_timeout
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class AsyncExportHandler:
+    """处理导出任务的异步提交和等待"""
+
+    def __init__(self):
+        self.request_handler = AsyncRequestHandler()
+
+    async def submit_export_task_with_id(self, export_url: str,
+                                         export_params: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
+        """
+        提交导出任务（只提交一次，不重试），并尝试从响应中获取任务ID
+
+        Args:
+            export_url: 导出接口URL
+            export_params: 导出参数
+
+        Returns:
+            (是否提交成功, 任务ID)
+        """
+        logger.info(f"异步提交导出任务: {export_url}")
+        logger.debug(f"导出参数: {export_params}")
+
+        # 使用单次请求，不重试（避免重复提交）
+        result = await self._single_post_request(export_url, export_params)
+
+        if result and result.get("code") == 0:
+            task_id = ExportHandler._extract_task_id(result)
+            logger.info(f"导出任务提交成功{f'，任务ID: {task_id}' if task_id else ''}")
+            return True, task_id
+        elif result and result.get("code") == 2006:
+            # 正在处理中，说明任务已存在，也算成功
+            logger.info("导出任务已在处理中，无需重复提交")
+            return True, None
+        elif result is None:
+            # 请求超时，但任务可能已在后台启动，继续等待检查
+            logger.warning("导出接口超时，但任务可能已在后台启动，继续等待检查...")
+            return True, None
+        else:
+            logger.error(f"导出任务提交失败: {result}")
+            return False, None
+
+    async def _single_post_request(self, url: str, json_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        发送单次POST请求（不重试）
+        """
+        response = None
+        try:
+            if not self.request_handler.circuit_breakers.allow_request(url):
+                logger.error(f"后端熔断中，跳过导出请求: {url}")
+                return None
+            await self.request_handler._throttle(url)
+            logger.info(f"发送异步POST请求: {url}")
+            async with self.request_handler.session.post(url, json=json_data,
+                                                         timeout=aiohttp.ClientTimeout(total=30)) as response:
+                self.request_handler.circuit_breakers.record_response(url, response.status)
+                response.raise_for_status()
+                result = await response.json(content_type=None, loads=loads_json)
+            logger.info(f"请求成功: {url}")
+            return result
+
+        except asyncio.TimeoutError as e:
+            # 超时错误降级为 WARNING，因为任务可能已在后台启动
+            logger.warning(f"请求超时: {str(e)}")
+            self.request_handler.circuit_breakers.record_failure(url)
+            return None
+        except asyncio.CancelledError:
+            if response is None:
+                self.request_handler.circuit_breakers.release_probe(url)
+            raise
+        except Exception as e:
+            if isinstance(e, aiohttp.ClientError) and not isinstance(e, aiohttp.ClientResponseError):
+                self.request_handler.circuit_breakers.record_failure(url)
+            elif response is None:
+                # 未收到响应也未记录结果，释放可能占用的探测名额
+                self.request_handler.circuit_breakers.release_probe(url)
+            logger.error(f"请求失败: {str(e)}")
+            return None
+
+    async def export_and_get_url(self, export_url: str, export_params: Dict[str, Any],
+                                 module_name: str) -> Optional[str]:
+        """
+        提交导出任务并等待完成，返回下载URL
+
+        Args:
+            export_url: 导出接口URL
+            export_params: 导出参数
+            module_name: 模块名称
+
+        Returns:
+            文件下载URL，失败返回None
+        """
+        # 记录开始时间，用于判断是否是本次导出的任务
+        start_time = datetime.datetime.now()
+        logger.info(f"开始异步导出任务，开始时间: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
+
+        # 1. 提交导出任务
+        success, task_id = await self.submit_export_task_with_id(export_url, export_params)
+        if not success:
+            return None
+
+        # 2. 登记到共享轮询器，非阻塞等待结果
+        logger.info("等待导出任务处理和记录生成...")
+        future = get_export_poller().register(module_name, start_time, task_id=task_id)
+        timeout = get_result_timeout()
+        try:
+            # 超时后 wait_for 会取消等待，取消同步传递到轮询器的 Future
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"等待导出结果超时（{timeout:.0f}秒），放弃等待: {module_name}")
+            return None
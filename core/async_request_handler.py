@@ -0,0 +1,218 @@
+"""
+异步HTTP请求处理器
+基于 aiohttp，同一事件循环内所有请求共享一个连接池
+"""
+
+import asyncio
+from typing import Dict, Any, Optional
+from config.headers_config import HEADERS
+from core.circuit_breaker import get_circuit_breakers
+from core.columnar_json import loads_json
+from core.rate_limiter import (
+    get_rate_limiter, compute_backoff, parse_retry_after, is_throttle_status, is_throttle_result,
+)
+from config.settings import (
+    REQUEST_TIMEOUT, MAX_RETRIES,
+    ASYNC_HTTP_POOL_SIZE, ASYNC_HTTP_POOL_PER_HOST,
+)
+from utils.logger import get_logger
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp 为可选依赖，仅异步流水线需要
+    aiohttp = None
+
+logger = get_logger(__name__)
+
+# 每个事件循环共享一个 ClientSession（连接池）
+_sessions: Dict[int, Any] = {}
+
+
+def get_async_session():
+    """
+    获取当前事件循环共享的 aiohttp 会话
+
+    Returns:
+        aiohttp.ClientSession
+    """
+    if aiohttp is None:
+        raise RuntimeError("异步流水线需要安装 aiohttp: pip install aiohttp")
+
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(id(loop))
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(limit=ASYNC_HTTP_POOL_SIZE, limit_per_host=ASYNC_HTTP_POOL_PER_HOST)
+        session = aiohttp.ClientSession(connector=connector, headers=HEADERS)
+        _sessions[id(loop)] = session
+    return session
+
+
+async def close_async_session():
+    """关闭当前事件循环的共享会话（在事件循环结束前调用）"""
+    loop = asyncio.get_running_loop()
+    session = _sessions.pop(id(loop), None)
+    if session is not None and not session.closed:
+        await session.close()
+
+
+class AsyncRequestHandler:
+    """封装异步HTTP请求逻辑（与 RequestHandler 行为一致）"""
+
+    def __init__(self):
+        if aiohttp is None:
+            raise RuntimeError("异步流水线需要安装 aiohttp: pip install aiohttp")
+        self.rate_limiter = get_rate_limiter()
+        self.circuit_breakers = get_circuit_breakers()
+
+    async def _throttle(self, url: str):
+        """按限流器预订令牌并异步等待"""
+        delay = self.rate_limiter.reserve(url)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _backoff(self, url: str, attempt: int, retry_after: Optional[float] = None):
+        """重试前退避等待（最后一次尝试后不等待）"""
+        if attempt >= MAX_RETRIES or self.circuit_breakers.is_open(url):
+            # 已熔断时下一次尝试会直接失败，无需等待
+            return
+        delay = compute_backoff(attempt, retry_after)
+        self.rate_limiter.record_backoff(url, delay)
+        logger.info(f"{delay:.1f} 秒后重试: {url}")
+        await asyncio.sleep(delay)
+
+    @property
+    def session(self):
+        return get_async_session()
+
+    async def post(self, url: str, json_data: Dict[str, Any],
+                   timeout: int = REQUEST_TIMEOUT) -> Optional[Dict[str, Any]]:
+        """
+        发送POST请求
+
+        Args:
+            url: 请求URL
+            json_data: JSON请求体
+            timeout: 超时时间
+
+        Returns:
+            响应JSON数据，失败返回None
+        """
+        for attempt in range(1, MAX_RETRIES + 1):
+            response = None
+            try:
+                if not self.circuit_breakers.allow_request(url):
+                    logger.error(f"后端熔断中，快速失败: {url}")
+                    return None
+                await self._throttle(url)
+                logger.info(f"发送异步POST请求: {url} (尝试 {attempt}/{MAX_RETRIES})")
+                async with self.session.post(url, json=json_data,
+                                             timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                    self.circuit_breakers.record_response(url, response.status)
+                    if is_throttle_status(response.status):
+                        logger.warning(f"服务端限流或过载: HTTP {response.status} (尝试 {attempt}/{MAX_RETRIES})")
+                        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                        await self._backoff(url, attempt, retry_after)
+                        continue
+                    response.raise_for_status()
+                    result = await response.json(content_type=None, loads=loads_json)
+
+                # 检查业务状态码
+                if result.get("code") == 0:
+                    logger.info(f"请求成功: {url}")
+                elif is_throttle_result(result) and attempt < MAX_RETRIES:
+                    logger.warning(f"业务限流: {result.get('msg')} (尝试 {attempt}/{MAX_RETRIES})")
+                    await self._backoff(url, attempt)
+                    continue
+                else:
+                    logger.error(f"业务错误: {result.get('msg', '未知错误')}")
+                return result
+
+            except asyncio.TimeoutError:
+                logger.warning(f"请求超时 (尝试 {attempt}/{MAX_RETRIES})")
+                self.circuit_breakers.record_failure(url)
+                await self._backoff(url, attempt)
+
+            except aiohttp.ClientError as e:
+                logger.error(f"请求异常: {str(e)} (尝试 {attempt}/{MAX_RETRIES})")
+                if not isinstance(e, aiohttp.ClientResponseError):
+                    # 连接失败等未收到响应的异常（HTTP错误状态已在收到响应时记录）
+                    self.circuit_breakers.record_failure(url)
+                await self._backoff(url, attempt)
+
+            except asyncio.CancelledError:
+                if response is None:
+                    self.circuit_breakers.release_probe(url)
+                raise
+
+            except Exception as e:
+                logger.error(f"未知错误: {str(e)}")
+                if response is None:
+                    # 未收到响应也未记录结果，释放可能占用的探测名额
+                    self.circuit_breakers.release_probe(url)
+                break
+
+        logger.error(f"请求失败，已达最大重试次数: {url}")
+        return None
+
+    async def get(self, url: str, params: Optional[Dict[str, Any]] = None,
+                  timeout: int = REQUEST_TIMEOUT):
+        """
+        发送GET请求（用于文件下载）
+
+        Args:
+            url: 请求URL
+            params: 查询参数
+            timeout: 连接与读取间隔超时时间
+
+        Returns:
+            aiohttp.ClientResponse（调用方读取后需 release），失败返回None
+        """
+        for attempt in range(1, MAX_RETRIES + 1):
+            response = None
+            try:
+                if not self.circuit_breakers.allow_request(url):
+                    logger.error(f"后端熔断中，快速失败: {url}")
+                    return None
+                await self._throttle(url)
+                logger.info(f"发送异步GET请求: {url} (尝试 {attempt}/{MAX_RETRIES})")
+                # 下载可能持续较久，只限制连接和单次读取的超时
+                client_timeout = aiohttp.ClientTimeout(total=None, sock_connect=timeout, sock_read=timeout)
+                response = await self.session.get(url, params=params, timeout=client_timeout)
+                self.circuit_breakers.record_response(url, response.status)
+                if is_throttle_status(response.status):
+                    logger.warning(f"服务端限流或过载: HTTP {response.status} (尝试 {attempt}/{MAX_RETRIES})")
+                    response.release()
+                    await self._backoff(url, attempt, parse_retry_after(response.headers.get("Retry-After")))
+                    continue
+                if response.status >= 400:
+                    response.release()
+                    response.raise_for_status()
+                logger.info(f"GET请求成功: {url}")
+                return response
+
+            except asyncio.TimeoutError:
+                logger.warning(f"请求超时 (尝试 {attempt}/{MAX_RETRIES})")
+                self.circuit_breakers.record_failure(url)
+                await self._backoff(url, attempt)
+
+            except aiohttp.ClientError as e:
+                logger.error(f"请求异常: {str(e)} (尝试 {attempt}/{MAX_RETRIES})")
+                if not isinstance(e, aiohttp.ClientResponseError):
+                    # 连接失败等未收到响应的异常（HTTP错误状态已在收到响应时记录）
+                    self.circuit_breakers.record_failure(url)
+                await self._backoff(url, attempt)
+
+            except asyncio.CancelledError:
+                if response is None:
+                    self.circuit_breakers.release_probe(url)
+                raise
+
+            except Exception as e:
+                logger.error(f"未知错误: {str(e)}")
+                if response is None:
+                    # 未收到响应也未记录结果，释放可能占用的探测名额
+                    self.circuit_breakers.release_probe(url)
+                break
+
+        logger.error(f"GET请求失败，已达最大重试次数: {url}")
+        return None
@@ -3,9 +3,15 @@
 定义所有数据采集模块的统一接口规范
 """
 
+import asyncio
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+from core.export_cache import get_export_cache
+from core.export_poller import iter_completed
+from core.columnar_json import RecordCollector, ColumnCollector
+from config.settings import API_PAGE_MAX_WORKERS
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -33,6 +39,20 @@ class BaseModule(ABC):
         """
         pass
     
+    async def execute_async(self, **kwargs) -> Optional[Path]:
+        """
+        异步执行数据采集任务
+        
+        默认在线程中运行同步的 execute，子类可覆盖为原生异步实现
+        
+        Args:
+            **kwargs: 模块特定的参数
+            
+        Returns:
+            Optional[Path]: 生成的文件路径，失败返回None
+        """
+        return await asyncio.to_thread(self.execute, **kwargs)
+    
     def get_module_info(self) -> Dict[str, Any]:
         """
         获取模块信息
@@ -64,6 +84,9 @@ class ExportBasedModule(BaseModule):
         
         self.export_handler = ExportHandler()
         self.download_handler = DownloadHandler()
+        # 异步处理器按需创建（依赖可选的 aiohttp）
+        self._async_export_handler = None
+        self._async_download_handler = None
     
     @abstractmethod
     def get_export_config(self, **kwargs) -> Dict[str, Any]:
@@ -91,6 +114,9 @@ class ExportBasedModule(BaseModule):
         try:
             logger.info(f"开始执行{self.module_name}导出流程")
             
+            # 是否跳过导出结果缓存（不传给 get_export_config）
+            force_refresh = kwargs.pop('force_refresh', False)
+            
             # 获取导出配置
             config = self.get_export_config(**kwargs)
             export_url = config['export_url']
@@ -101,6 +127,12 @@ class ExportBasedModule(BaseModule):
             logger.info(f"导出URL: {export_url}")
             logger.info(f"模块名称: {module_name}")
             
+            # 0. 相同导出在有效期内已完成时直接复用
+            if not force_refresh:
+                cached_file = get_export_cache().get(export_url, export_params, module_name)
+                if cached_file:
+                    return cached_file
+            
             # 1. 提交导出任务并获取下载URL
             download_url = self.export_handler.export_and_get_url(
                 export_url=export_url,
@@ -122,6 +154,7 @@ class ExportBasedModule(BaseModule):
             )
             
             if file_path:
+                get_export_cache().put(export_url, export_params, module_name, download_url, file_path)
                 logger.info(f"{self.module_name}执行成功: {file_path}")
             else:
                 logger.error(f"{self.module_name}文件下载失败")
@@ -131,6 +164,202 @@ class ExportBasedModule(BaseModule):
         except Exception as e:
             logger.error(f"{self.module_name}执行异常: {str(e)}")
             return None
+    
+    def execute_batch(self, kwargs_list: List[Dict[str, Any]]) -> List[Optional[Path]]:
+        """
+        批量执行导出任务：先依次提交所有导出，再统一等待并按完成先后下载
+        
+        后端可以并行处理这些导出，总耗时接近最慢的单个导出，而不是逐个相加
+        
+        Args:
+            kwargs_list: 每个导出任务的模块参数列表（与 execute 的 kwargs 相同）
+            
+        Returns:
+            List[Optional[Path]]: 与 kwargs_list 顺序一致的下载文件路径，失败为None
+        """
+        configs: List[Optional[Dict[str, Any]]] = []
+        force_refresh_flags: List[bool] = []
+        
+        logger.info(f"开始批量执行{self.module_name}导出流程，共 {len(kwargs_list)} 个导出")
+        
+        for kwargs in kwargs_list:
+            kwargs = dict(kwargs)
+            force_refresh_flags.append(kwargs.pop('force_refresh', False))
+            try:
+                configs.append(self.get_export_config(**kwargs))
+            except Exception as e:
+                logger.error(f"{self.module_name}获取导出配置异常: {str(e)}")
+                configs.append(None)
+        
+        results = self.run_export_configs(configs, force_refresh_flags)
+        
+        success_count = sum(1 for path in results if path)
+        logger.info(f"{self.module_name}批量导出完成: 成功 {success_count}/{len(kwargs_list)}")
+        return results
+    
+    def run_export_configs(self, configs: List[Optional[Dict[str, Any]]],
+                           force_refresh_flags: Optional[List[bool]] = None) -> List[Optional[Path]]:
+        """
+        依次提交多个导出配置，统一等待并按完成先后下载
+        
+        Args:
+            configs: get_export_config 返回的配置列表（None 表示该项无效）；
+                配置中可选 save_path 指定下载保存路径（不走导出结果缓存，也不清理同名前缀文件）
+            force_refresh_flags: 每项是否跳过导出结果缓存
+            
+        Returns:
+            List[Optional[Path]]: 与 configs 顺序一致的文件路径，失败为None
+        """
+        if force_refresh_flags is None:
+            force_refresh_flags = [False] * len(configs)
+        
+        results: List[Optional[Path]] = [None] * len(configs)
+        pending = {}
+        
+        # 1. 依次提交所有导出任务（不等待）
+        for index, (config, force_refresh) in enumerate(zip(configs, force_refresh_flags)):
+            if config is None:
+                continue
+            
+            use_cache = not force_refresh and not config.get('save_path')
+            try:
+                if use_cache:
+                    cached_file = get_export_cache().get(config['export_url'], config['export_params'],
+                                                         config['module_name'])
+                    if cached_file:
+                        results[index] = cached_file
+                        continue
+                
+                logger.info(f"[{index + 1}/{len(configs)}] 提交导出: {config.get('file_name_prefix', config['module_name'])}")
+                future = self.export_handler.start_export(
+                    export_url=config['export_url'],
+                    export_params=config['export_params'],
+                    module_name=config['module_name']
+                )
+            except Exception as e:
+                logger.error(f"{self.module_name}提交导出异常: {str(e)}")
+                continue
+            
+            if future is None:
+                logger.error(f"{self.module_name}导出任务提交失败")
+                continue
+            pending[future] = (index, config)
+        
+        # 2. 按完成先后下载
+        for future in iter_completed(pending):
+            index, config = pending[future]
+            file_name_prefix = config.get('file_name_prefix', config['module_name'])
+            try:
+                download_url = future.result()
+                if not download_url:
+                    logger.error(f"[{file_name_prefix}] 导出任务失败，未获取到下载URL")
+                    continue
+                
+                logger.info(f"[{file_name_prefix}] 获取到下载URL: {download_url}")
+                
+                if config.get('save_path'):
+                    results[index] = self._download_to(download_url, config['module_name'], Path(config['save_path']))
+                    continue
+                
+                results[index] = self.download_handler.download_from_export(
+                    download_url=download_url,
+                    module_name=config['module_name'],
+                    file_name_prefix=file_name_prefix,
+                )
+                if results[index]:
+                    get_export_cache().put(config['export_url'], config['export_params'],
+                                           config['module_name'], download_url, results[index])
+            except Exception as e:
+                logger.error(f"[{file_name_prefix}] 下载异常: {str(e)}")
+        
+        return results
+    
+    def _download_to(self, download_url: str, module_name: str, save_path: Path) -> Optional[Path]:
+        """
+        下载文件到指定路径（先下载到同目录的临时文件名，成功后替换）
+        
+        Args:
+            download_url: 下载URL
+            module_name: 模块名称（用于临时文件命名）
+            save_path: 目标文件路径
+            
+        Returns:
+            目标文件路径，失败返回None
+        """
+        downloaded = self.download_handler.download_file(download_url, module_name, save_dir=save_path.parent)
+        if not downloaded:
+            return None
+        downloaded.replace(save_path)
+        return save_path
+    
+    async def execute_async(self, **kwargs) -> Optional[Path]:
+        """
+        异步执行导出任务流程（异步HTTP客户端 + 非阻塞等待）
+        
+        Args:
+            **kwargs: 模块特定参数
+            
+        Returns:
+            Optional[Path]: 下载的文件路径
+        """
+        try:
+            if self._async_export_handler is None:
+                from core.async_export_handler import AsyncExportHandler
+                from core.async_download_handler import AsyncDownloadHandler
+                
+                self._async_export_handler = AsyncExportHandler()
+                self._async_download_handler = AsyncDownloadHandler()
+            
+            logger.info(f"开始异步执行{self.module_name}导出流程")
+            
+            force_refresh = kwargs.pop('force_refresh', False)
+            
+            # 获取导出配置（可能读取本地文件，放到线程中执行）
+            config = await asyncio.to_thread(self.get_export_config, **kwargs)
+            export_url = config['export_url']
+            export_params = config['export_params']
+            module_name = config['module_name']
+            file_name_prefix = config.get('file_name_prefix', module_name)
+            
+            logger.info(f"导出URL: {export_url}")
+            logger.info(f"模块名称: {module_name}")
+            
+            if not force_refresh:
+                cached_file = get_export_cache().get(export_url, export_params, module_name)
+                if cached_file:
+                    return cached_file
+            
+            # 1. 提交导出任务并获取下载URL
+            download_url = await self._async_export_handler.export_and_get_url(
+                export_url=export_url,
+                export_params=export_params,
+                module_name=module_name
+            )
+            
+            if not download_url:
+                logger.error("导出任务失败，未获取到下载URL")
+                return None
+            
+            logger.info(f"获取到下载URL: {download_url}")
+            
+            # 2. 下载文件
+            file_path = await self._async_download_handler.download_from_export(
+                download_url=download_url,
+                module_name=module_name,
+                file_name_prefix=file_name_prefix,
+            )
+            
+            if file_path:
+                get_export_cache().put(export_url, export_params, module_name, download_url, file_path)
+                logger.info(f"{self.module_name}执行成功: {file_path}")
+            else:
+                logger.error(f"{self.module_name}文件下载失败")
+            
+            return file_path
+            
+        except Exception as e:
+            logger.error(f"{self.module_name}异步执行异常: {str(e)}")
+            return None
 
 
 class ApiBasedModule(BaseModule):
@@ -150,6 +379,158 @@ class ApiBasedModule(BaseModule):
         
         self.request_handler = RequestHandler()
     
+    def fetch_all_pages(self, url: str, base_params: Dict[str, Any],
+                        key_field: Optional[str] = None,
+                        max_workers: int = API_PAGE_MAX_WORKERS) -> Optional[List[Dict[str, Any]]]:
+        """
+        并发获取分页接口的全部数据
+        
+        先请求第1页得到总页数，剩余页由有界线程池并发获取，再按页码顺序拼接。
+        指定 key_field 时检查跨页重复和缺失（排序不稳定时可能出现），
+        缺失时补拉一轮，仍不完整则记录警告
+        
+        Args:
+            url: 分页接口URL
+            base_params: 请求参数（包含 page_size，page_number 会被覆盖）
+            key_field: 记录唯一键字段，用于去重和完整性检查
+            max_workers: 并发请求数上限
+            
+        Returns:
+            List[Dict]: 按页码顺序的全部记录（已按 key_field 去重），失败返回None
+        """
+        return self._paginate(url, base_params, RecordCollector(), key_field, max_workers)
+    
+    def fetch_all_columns(self, url: str, base_params: Dict[str, Any], fields: List[str],
+                          key_field: Optional[str] = None,
+                          max_workers: int = API_PAGE_MAX_WORKERS) -> Optional[Dict[str, list]]:
+        """
+        并发获取分页接口的全部数据，只保留指定字段并按列存放
+        
+        每页解码后立即投影为按列的数组，不保留完整记录，适合大量记录只需少数字段的接口；
+        分页、去重和完整性检查与 fetch_all_pages 一致
+        
+        Args:
+            url: 分页接口URL
+            base_params: 请求参数（包含 page_size，page_number 会被覆盖）
+            fields: 需要保留的字段
+            key_field: 记录唯一键字段（自动加入 fields）
+            max_workers: 并发请求数上限
+            
+        Returns:
+            Dict[str, list]: 字段 -> 按页码顺序的值数组，失败返回None（可用 columns_to_frame 转为 DataFrame）
+        """
+        if key_field and key_field not in fields:
+            fields = list(fields) + [key_field]
+        return self._paginate(url, base_params, ColumnCollector(fields), key_field, max_workers)
+    
+    def _paginate(self, url: str, base_params: Dict[str, Any], collector: RecordCollector,
+                  key_field: Optional[str], max_workers: int):
+        """
+        分页获取的公共流程（页数据的存放形式由 collector 决定）
+        
+        Returns:
+            collector 拼接后的全部数据，失败返回None
+        """
+        first_page = self._fetch_page(url, base_params, 0, collector)
+        if first_page is None:
+            logger.error(f"获取第 1 页失败: {url}")
+            return None
+        
+        page_data, total_pages, total_elements = first_page
+        logger.info(f"总页数: {total_pages}, 总记录数: {total_elements}")
+        
+        pages: Dict[int, Any] = {0: page_data}
+        failed_pages = self._fetch_pages(url, base_params, range(1, total_pages), pages, max_workers, collector)
+        if failed_pages:
+            logger.error(f"以下页获取失败: {[page + 1 for page in failed_pages]}")
+            return None
+        
+        data = collector.concat(pages[page] for page in sorted(pages))
+        if not key_field:
+            logger.info(f"总共获取 {collector.count(data)} 条数据（{total_pages} 页）")
+            return data
+        
+        unique_data = self._dedup(collector, data, key_field)
+        if collector.count(unique_data) < total_elements:
+            # 排序不稳定或数据变动导致漏行，补拉一轮并合并
+            logger.warning(f"分页数据不完整: 去重后 {collector.count(unique_data)} 条，"
+                           f"接口总数 {total_elements} 条，重新获取一轮")
+            retry_pages: Dict[int, Any] = {}
+            self._fetch_pages(url, base_params, range(total_pages), retry_pages, max_workers, collector)
+            retry_data = collector.concat(retry_pages[page] for page in sorted(retry_pages))
+            unique_data = self._dedup(collector, collector.concat([data, retry_data]), key_field)
+            
+            if collector.count(unique_data) < total_elements:
+                logger.warning(f"补拉后仍缺少 {total_elements - collector.count(unique_data)} 条数据")
+        
+        logger.info(f"总共获取 {collector.count(unique_data)} 条数据（{total_pages} 页）")
+        return unique_data
+    
+    def _fetch_page(self, url: str, base_params: Dict[str, Any], page_number: int,
+                    collector: RecordCollector):
+        """
+        获取单页数据
+        
+        Returns:
+            (页数据, 总页数, 总记录数)，失败返回None
+        """
+        params = dict(base_params)
+        params["page_number"] = page_number
+        
+        response = self.request_handler.post(url=url, json_data=params)
+        if not response or response.get("code") != 0:
+            return None
+        
+        data = response.get("data") or {}
+        if not isinstance(data, dict) or "content" not in data:
+            logger.warning("数据格式异常: data字段不包含content")
+            return None
+        
+        content = data.get("content") or []
+        total_elements = data.get("total_elements", len(content))
+        total_pages = data.get("total_pages")
+        if total_pages is None:
+            page_size = params.get("page_size") or len(content) or 1
+            total_pages = -(-total_elements // page_size)
+        return collector.project(content), max(total_pages, 1), total_elements
+    
+    def _fetch_pages(self, url: str, base_params: Dict[str, Any], page_numbers,
+                     pages: Dict[int, Any], max_workers: int, collector: RecordCollector) -> List[int]:
+        """
+        并发获取多页数据，结果写入 pages
+        
+        Returns:
+            List[int]: 获取失败的页码
+        """
+        page_numbers = list(page_numbers)
+        if not page_numbers:
+            return []
+        
+        workers = max(1, min(max_workers, len(page_numbers)))
+        logger.info(f"并发获取 {len(page_numbers)} 页数据，并发数: {workers}")
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="page") as executor:
+            results = dict(zip(page_numbers, executor.map(
+                lambda page: self._fetch_page(url, base_params, page, collector), page_numbers
+            )))
+        
+        failed_pages = []
+        for page_number, result in results.items():
+            if result is None:
+                failed_pages.append(page_number)
+            else:
+                pages[page_number] = result[0]
+        return failed_pages
+    
+    @staticmethod
+    def _dedup(collector: RecordCollector, data, key_field: str):
+        """按唯一键去重（保留首次出现），并记录重复数量"""
+        unique_data = collector.dedup(data, key_field)
+        duplicates = collector.count(data) - collector.count(unique_data)
+        if duplicates:
+            logger.warning(f"分页数据存在 {duplicates} 条重复记录（{key_field}），已去重")
+        return unique_data
+    
     @abstractmethod
     def fetch_data(self, **kwargs) -> Optional[Any]:
         """
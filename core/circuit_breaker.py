@@ -0,0 +1,200 @@
+"""
+按后端域名的熔断器
+某个后端连续请求失败（连接失败、超时、5xx）后熔断，后续请求直接失败而不再重试和轮询；
+冷却时间过后放行一个探测请求，成功则恢复，失败则继续熔断
+"""
+
+import threading
+import time
+from typing import Dict, Any, Optional
+from urllib.parse import urlparse
+from config.settings import CIRCUIT_BREAKER_ENABLED, CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+STATE_DISPLAY_NAMES = {
+    STATE_CLOSED: "正常",
+    STATE_OPEN: "熔断",
+    STATE_HALF_OPEN: "探测中",
+}
+
+
+class CircuitBreaker:
+    """单个后端的熔断器（线程安全）"""
+
+    def __init__(self, base_url: str, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 reset_timeout: float = CIRCUIT_RESET_TIMEOUT):
+        self.base_url = base_url
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = STATE_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._trips = 0
+        self._rejected = 0
+
+    def allow_request(self) -> bool:
+        """
+        判断是否放行一次请求
+
+        熔断状态下冷却时间未到直接拒绝；冷却时间已到时转为探测状态，只放行一个探测请求
+
+        Returns:
+            bool: 放行返回True
+        """
+        with self._lock:
+            if self._state == STATE_CLOSED:
+                return True
+            if self._state == STATE_OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = STATE_HALF_OPEN
+                self._probe_in_flight = False
+                logger.info(f"熔断冷却结束，放行探测请求: {self.base_url}")
+            if self._state == STATE_HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self._rejected += 1
+            return False
+
+    def is_open(self) -> bool:
+        """是否处于熔断且冷却未结束（不占用探测名额，用于跳过整个模块）"""
+        with self._lock:
+            return self._state == STATE_OPEN and time.monotonic() - self._opened_at < self.reset_timeout
+
+    def record_success(self):
+        """记录一次成功请求（后端可达）"""
+        with self._lock:
+            if self._state != STATE_CLOSED:
+                logger.info(f"后端已恢复，解除熔断: {self.base_url}")
+            self._state = STATE_CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        """记录一次失败请求（连接失败、超时或5xx）"""
+        with self._lock:
+            self._failures += 1
+            if self._state == STATE_HALF_OPEN or (
+                    self._state == STATE_CLOSED and self._failures >= self.failure_threshold):
+                if self._state == STATE_CLOSED:
+                    self._trips += 1
+                    logger.error(f"后端连续失败 {self._failures} 次，熔断 {self.reset_timeout} 秒: {self.base_url}")
+                else:
+                    logger.warning(f"探测请求失败，继续熔断 {self.reset_timeout} 秒: {self.base_url}")
+                self._state = STATE_OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+    def release_probe(self):
+        """探测请求未得出结果就结束时（程序异常、被取消等）释放探测名额，下一个请求重新探测"""
+        with self._lock:
+            if self._state == STATE_HALF_OPEN:
+                self._probe_in_flight = False
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        获取熔断器状态
+
+        Returns:
+            Dict: {state: 状态, failures: 连续失败次数, trips: 熔断次数, rejected: 被拒绝的请求数}
+        """
+        with self._lock:
+            return {
+                "state": self._state,
+                "failures": self._failures,
+                "trips": self._trips,
+                "rejected": self._rejected,
+            }
+
+
+class CircuitBreakerRegistry:
+    """按 scheme://域名 管理各后端的熔断器"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    @staticmethod
+    def get_base_url(url: str) -> str:
+        """获取URL的 scheme://域名 部分"""
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc}"
+
+    def get_breaker(self, url: str) -> CircuitBreaker:
+        """获取URL所属后端的熔断器"""
+        base_url = self.get_base_url(url)
+        with self._lock:
+            breaker = self._breakers.get(base_url)
+            if breaker is None:
+                breaker = CircuitBreaker(base_url)
+                self._breakers[base_url] = breaker
+            return breaker
+
+    def allow_request(self, url: str) -> bool:
+        """是否放行对该URL的请求（未启用熔断时始终放行）"""
+        if not CIRCUIT_BREAKER_ENABLED:
+            return True
+        return self.get_breaker(url).allow_request()
+
+    def is_open(self, url: str) -> bool:
+        """该URL所属后端是否处于熔断（未启用熔断时始终为False）"""
+        if not CIRCUIT_BREAKER_ENABLED:
+            return False
+        return self.get_breaker(url).is_open()
+
+    def record_success(self, url: str):
+        """记录一次成功请求"""
+        if CIRCUIT_BREAKER_ENABLED:
+            self.get_breaker(url).record_success()
+
+    def record_failure(self, url: str):
+        """记录一次失败请求"""
+        if CIRCUIT_BREAKER_ENABLED:
+            self.get_breaker(url).record_failure()
+
+    def record_response(self, url: str, status: int):
+        """按响应状态记录：5xx 视为后端故障，其他响应说明后端可达"""
+        if status >= 500:
+            self.record_failure(url)
+        else:
+            self.record_success(url)
+
+    def release_probe(self, url: str):
+        """请求未收到响应也未记录失败就结束时调用，避免探测名额一直被占用"""
+        if CIRCUIT_BREAKER_ENABLED:
+            self.get_breaker(url).release_probe()
+
+    def get_summary(self) -> Dict[str, Dict[str, Any]]:
+        """
+        获取本次运行中发生过熔断的后端状态
+
+        Returns:
+            Dict: 基础地址 -> 熔断器状态
+        """
+        with self._lock:
+            breakers = list(self._breakers.values())
+        summary = {}
+        for breaker in breakers:
+            status = breaker.get_status()
+            if status["trips"] or status["state"] != STATE_CLOSED:
+                summary[breaker.base_url] = status
+        return summary
+
+
+_circuit_breakers: Optional[CircuitBreakerRegistry] = None
+_circuit_breakers_lock = threading.Lock()
+
+
+def get_circuit_breakers() -> CircuitBreakerRegistry:
+    """获取进程级共享的熔断器注册表"""
+    global _circuit_breakers
+    with _circuit_breakers_lock:
+        if _circuit_breakers is None:
+            _circuit_breakers = CircuitBreakerRegistry()
+        return _circuit_breakers
@@ -0,0 +1,144 @@
+"""
+JSON响应的快速解码与按列投影
+有 orjson 时使用 orjson 解码；分页记录只保留需要的字段并直接追加到按列的数组中，
+最后一次性构建带类型的 DataFrame，避免中间的字典列表
+"""
+
+import json
+from itertools import chain
+from typing import Dict, Any, Optional, List, Iterable
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，未安装时使用标准库 json
+    orjson = None
+
+
+def loads_json(data):
+    """
+    解码JSON（bytes 或 str），有 orjson 时使用 orjson
+
+    Args:
+        data: 响应体
+
+    Returns:
+        解码后的对象
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class RecordCollector:
+    """分页记录收集器：保留完整记录（字典列表）"""
+
+    def project(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """将单页记录转换为页数据"""
+        return records
+
+    def concat(self, pages: Iterable[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """按顺序拼接多页数据"""
+        return list(chain.from_iterable(pages))
+
+    def count(self, data: List[Dict[str, Any]]) -> int:
+        """数据行数"""
+        return len(data)
+
+    def dedup(self, data: List[Dict[str, Any]], key_field: str) -> List[Dict[str, Any]]:
+        """
+        按唯一键去重（保留首次出现的记录，缺少键的记录全部保留）
+
+        Args:
+            data: 记录列表
+            key_field: 唯一键字段
+
+        Returns:
+            去重后的记录列表
+        """
+        seen = set()
+        unique_records = []
+        for record in data:
+            key = record.get(key_field)
+            if key is not None:
+                if key in seen:
+                    continue
+                seen.add(key)
+            unique_records.append(record)
+        return unique_records
+
+
+class ColumnCollector(RecordCollector):
+    """分页列收集器：每页只保留指定字段，直接存为按列的数组"""
+
+    def __init__(self, fields: List[str]):
+        self.fields = list(fields)
+
+    def project(self, records: List[Dict[str, Any]]) -> Dict[str, list]:
+        """
+        将单页记录投影为按列的数组（只读取需要的字段，页内字典随后即可释放）
+
+        Args:
+            records: 单页记录
+
+        Returns:
+            Dict[str, list]: 字段 -> 该页的值数组
+        """
+        return {field: [record.get(field) for record in records] for field in self.fields}
+
+    def concat(self, pages: Iterable[Dict[str, list]]) -> Dict[str, list]:
+        """按顺序拼接多页的列数组"""
+        pages = list(pages)
+        return {field: list(chain.from_iterable(page[field] for page in pages)) for field in self.fields}
+
+    def count(self, data: Dict[str, list]) -> int:
+        """数据行数"""
+        return len(data[self.fields[0]]) if self.fields else 0
+
+    def dedup(self, data: Dict[str, list], key_field: str) -> Dict[str, list]:
+        """
+        按唯一键去重（保留首次出现的行，缺少键的行全部保留）
+
+        Args:
+            data: 按列的数组
+            key_field: 唯一键字段
+
+        Returns:
+            去重后的按列数组
+        """
+        seen = set()
+        keep = []
+        for index, key in enumerate(data[key_field]):
+            if key is not None:
+                if key in seen:
+                    continue
+                seen.add(key)
+            keep.append(index)
+
+        if len(keep) == self.count(data):
+            return data
+        return {field: [values[index] for index in keep] for field, values in data.items()}
+
+
+def columns_to_frame(columns: Dict[str, list], dtypes: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """
+    将按列的数组构建为 DataFrame
+
+    Args:
+        columns: 字段 -> 值数组
+        dtypes: 字段 -> 目标类型（"Int64" 等整数类型按数值转换，无法转换的值为空；其他类型直接转换）
+
+    Returns:
+        pd.DataFrame
+    """
+    dtypes = dtypes or {}
+    data = {}
+    for field, values in columns.items():
+        dtype = dtypes.get(field)
+        if dtype is None:
+            data[field] = pd.Series(values)
+        elif dtype.lower().startswith(("int", "uint", "float")):
+            data[field] = pd.to_numeric(pd.Series(values), errors="coerce").astype(dtype)
+        else:
+            data[field] = pd.Series(values).astype(dtype)
+    return pd.DataFrame(data, columns=list(columns))
@@ -2,16 +2,31 @@
 文件下载处理器
 """
 
+import hashlib
+import json
 import os
+import re
+import time
 from pathlib import Path
-from typing import Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List
 from core.request_handler import RequestHandler
-from config.settings import DOWNLOADS_DIR, AUTO_CLEANUP_FILES, KEEP_LATEST_FILES
+from core.rate_limiter import compute_backoff
+from config.settings import (
+    DOWNLOADS_DIR, AUTO_CLEANUP_FILES, KEEP_LATEST_FILES, DOWNLOAD_MAX_ATTEMPTS,
+    SEGMENTED_DOWNLOAD_ENABLED, SEGMENTED_DOWNLOAD_MIN_SIZE, SEGMENTED_DOWNLOAD_PART_SIZE,
+    SEGMENTED_DOWNLOAD_CONNECTIONS,
+)
 from utils.logger import get_logger
+from utils.frame_registry import handoff_downloaded_file, is_handoff_enabled
 from utils.file_utils import generate_timestamped_filename, ensure_dir_exists, cleanup_module_files, get_module_files
 
 logger = get_logger(__name__)
 
+# 临时文件名中URL摘要的长度（临时文件名为 前缀_摘要.part）
+PART_KEY_LENGTH = 12
+
 
 class DownloadHandler:
     """处理文件下载逻辑"""
@@ -20,7 +35,8 @@ class DownloadHandler:
         self.request_handler = RequestHandler()
     
     def download_file(self, url: str, module_name: str, 
-                     save_dir: Optional[Path] = None) -> Optional[Path]:
+                     save_dir: Optional[Path] = None,
+                     content: Optional[bytearray] = None) -> Optional[Path]:
         """
         从URL下载文件（支持阿里云OSS直接下载）
         
@@ -28,6 +44,7 @@ class DownloadHandler:
             url: 文件下载URL（阿里云OSS地址）
             module_name: 模块名称（用于文件命名）
             save_dir: 保存目录，默认为DOWNLOADS_DIR
+            content: 传入时收集下载的内容（仅单连接完整下载时完整，续传和分段下载时为空）
             
         Returns:
             保存的文件路径，失败返回None
@@ -51,32 +68,301 @@ class DownloadHandler:
         local_filename = generate_timestamped_filename(module_name, file_extension.lstrip('.'))
         save_path = save_dir / local_filename
         
+        # 临时文件按URL（不含签名参数）命名，重试或重新运行时可以续传
+        part_path = self.get_part_path(url, module_name, save_dir)
+        meta_path = part_path.with_name(part_path.name + ".json")
+        
+        started_at = time.time()
+        for attempt in range(1, DOWNLOAD_MAX_ATTEMPTS + 1):
+            try:
+                if self._download_to_part(url, part_path, meta_path, content):
+                    # 下载完成且长度校验通过，原子改名为正式文件
+                    os.replace(part_path, save_path)
+                    meta_path.unlink(missing_ok=True)
+                    
+                    file_size = os.path.getsize(save_path)
+                    elapsed = max(time.time() - started_at, 0.001)
+                    logger.info(f"文件下载成功: {save_path} (大小: {file_size / 1024:.2f} KB, "
+                                f"用时 {elapsed:.1f} 秒, 平均 {file_size / 1024 / 1024 / elapsed:.2f} MB/s)")
+                    return save_path
+                
+            except Exception as e:
+                downloaded = part_path.stat().st_size if part_path.exists() else 0
+                logger.warning(f"文件下载中断: {str(e)}，已下载 {downloaded / 1024:.2f} KB "
+                               f"(尝试 {attempt}/{DOWNLOAD_MAX_ATTEMPTS})")
+            
+            if attempt < DOWNLOAD_MAX_ATTEMPTS:
+                delay = compute_backoff(attempt)
+                self.request_handler.rate_limiter.record_backoff(url, delay)
+                time.sleep(delay)
+        
+        # 保留 .part 文件，下次下载同一文件时继续续传
+        logger.error(f"文件下载失败，已达最大尝试次数: {url}")
+        return None
+    
+    @staticmethod
+    def get_part_path(url: str, module_name: str, save_dir: Path) -> Path:
+        """
+        获取下载临时文件路径（同一文件的签名URL变化不影响续传）
+        
+        Args:
+            url: 下载URL
+            module_name: 模块名称（文件名前缀）
+            save_dir: 保存目录
+            
+        Returns:
+            .part 临时文件路径
+        """
+        url_key = hashlib.sha1(url.split("?")[0].encode("utf-8")).hexdigest()[:PART_KEY_LENGTH]
+        return save_dir / f"{module_name}_{url_key}.part"
+    
+    @staticmethod
+    def find_part_files(module_name: str, save_dir: Path) -> List[Path]:
+        """
+        查找某个文件名前缀的下载临时文件
+        
+        只匹配 前缀_URL摘要.part，不会匹配以该前缀开头的其他前缀
+        （如 商品销售数据 不匹配 商品销售数据_冷藏乳饮 的临时文件）
+        
+        Args:
+            module_name: 模块名称（文件名前缀）
+            save_dir: 保存目录
+            
+        Returns:
+            临时文件路径列表
+        """
+        pattern = re.compile(rf"{re.escape(module_name)}_[0-9a-f]{{{PART_KEY_LENGTH}}}\.part")
+        return [path for path in save_dir.glob("*.part") if pattern.fullmatch(path.name)]
+    
+    def _download_to_part(self, url: str, part_path: Path, meta_path: Path,
+                          content: Optional[bytearray] = None) -> bool:
+        """
+        下载（或续传）到 .part 临时文件
+        
+        Args:
+            url: 下载URL
+            part_path: 临时文件路径
+            meta_path: 续传信息文件路径（记录文件总长度和ETag）
+            content: 传入时收集从头写入的内容
+            
+        Returns:
+            bool: 文件是否已完整下载
+        """
+        if content is not None:
+            content.clear()
+        meta = self._load_part_meta(meta_path)
+        if meta.get("segments") and part_path.exists():
+            # 分段下载未完成，只下载剩余分段
+            return self._download_segments(url, part_path, meta_path, meta)
+        
+        offset = part_path.stat().st_size if part_path.exists() and meta else 0
+        total = meta.get("total")
+        
+        if offset and total:
+            if offset == total:
+                return True
+            if offset > total:
+                # 临时文件比完整文件还大，已损坏
+                self._discard_part(part_path, meta_path)
+                offset = 0
+        
+        headers = {}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+            if meta.get("etag"):
+                # 文件已变化时服务器返回完整内容，而不是错误的片段
+                headers["If-Range"] = meta["etag"]
+            logger.info(f"从 {offset / 1024:.2f} KB 处续传: {url}")
+        
+        response = self.request_handler.get(url, headers=headers or None)
+        if not response:
+            if offset:
+                # 续传请求失败（如Range不被接受），下次从头下载
+                logger.warning("续传请求失败，将重新下载完整文件")
+                self._discard_part(part_path, meta_path)
+            raise IOError("下载请求失败")
+        
         try:
-            # 发送GET请求下载文件（阿里云OSS不需要特殊headers）
-            response = self.request_handler.get(url)
+            if offset and response.status_code == 206:
+                range_start = self._parse_content_range_start(response.headers.get("Content-Range", ""))
+                if range_start != offset:
+                    self._discard_part(part_path, meta_path)
+                    raise IOError(f"续传位置不一致: 请求 {offset}，返回 {range_start}")
+                mode = "ab"
+                content_length = response.headers.get("Content-Length")
+                total = offset + int(content_length) if content_length else total
+            else:
+                # 服务器返回完整内容（不支持Range或文件已变化），从头写入
+                mode = "wb"
+                offset = 0
+                content_length = response.headers.get("Content-Length")
+                total = int(content_length) if content_length else None
             
-            if not response:
-                logger.error("下载请求失败")
-                return None
+            if response.headers.get("Content-Encoding", "identity") != "identity":
+                # 压缩传输时 Content-Length 与解压后的长度不同，无法校验
+                total = None
+            
+            if not offset and self._can_download_segmented(response, total):
+                # 大文件且服务器支持Range：改为多连接分段下载
+                response.close()
+                meta = self._create_segment_meta(url, total, response.headers.get("ETag"))
+                with open(part_path, "wb") as f:
+                    f.truncate(total)  # 预分配文件空间
+                self._save_part_meta(meta_path, meta)
+                return self._download_segments(url, part_path, meta_path, meta)
             
-            # 写入文件
-            logger.info(f"保存文件到: {save_path}")
-            with open(save_path, 'wb') as f:
+            self._save_part_meta(meta_path, {
+                "url": url.split("?")[0],
+                "total": total,
+                "etag": response.headers.get("ETag"),
+            })
+            
+            # 写入文件（结束后归还连接到共享连接池）
+            logger.info(f"保存文件到: {part_path}")
+            collect = content is not None and mode == "wb"
+            with open(part_path, mode) as f:
                 for chunk in response.iter_content(chunk_size=8192):
                     if chunk:
                         f.write(chunk)
+                        if collect:
+                            content.extend(chunk)
+        finally:
+            response.close()
+        
+        size = part_path.stat().st_size
+        if total and size != total:
+            raise IOError(f"文件长度不一致: 期望 {total} 字节，实际 {size} 字节")
+        return True
+    
+    @staticmethod
+    def _can_download_segmented(response, total: Optional[int]) -> bool:
+        """判断是否可以分段并行下载（服务器声明支持Range且文件足够大）"""
+        return (SEGMENTED_DOWNLOAD_ENABLED
+                and response.status_code == 200
+                and response.headers.get("Accept-Ranges", "").lower() == "bytes"
+                and total is not None
+                and total >= SEGMENTED_DOWNLOAD_MIN_SIZE)
+    
+    @staticmethod
+    def _create_segment_meta(url: str, total: int, etag: Optional[str]) -> Dict[str, Any]:
+        """
+        按 SEGMENTED_DOWNLOAD_PART_SIZE 划分下载分段
+        
+        Returns:
+            续传信息（segments 为 [起始, 结束, 是否完成] 列表）
+        """
+        segments = []
+        for start in range(0, total, SEGMENTED_DOWNLOAD_PART_SIZE):
+            end = min(start + SEGMENTED_DOWNLOAD_PART_SIZE, total) - 1
+            segments.append([start, end, False])
+        return {"url": url.split("?")[0], "total": total, "etag": etag, "segments": segments}
+    
+    def _download_segments(self, url: str, part_path: Path, meta_path: Path, meta: Dict[str, Any]) -> bool:
+        """
+        多连接并行下载未完成的分段，写入预分配的临时文件
+        
+        Args:
+            url: 下载URL
+            part_path: 临时文件路径（已预分配为完整长度）
+            meta_path: 续传信息文件路径
+            meta: 续传信息（含分段完成状态）
+            
+        Returns:
+            bool: 文件是否已完整下载
+        """
+        segments = meta["segments"]
+        pending = [segment for segment in segments if not segment[2]]
+        connections = max(1, min(SEGMENTED_DOWNLOAD_CONNECTIONS, len(pending)))
+        meta_lock = threading.Lock()
+        
+        logger.info(f"分段下载: 共 {len(segments)} 段，剩余 {len(pending)} 段，并行连接数 {connections}")
+        
+        def fetch(segment: List[Any]) -> bool:
+            start, end = segment[0], segment[1]
+            headers = {"Range": f"bytes={start}-{end}"}
+            if meta.get("etag"):
+                headers["If-Range"] = meta["etag"]
+            
+            response = self.request_handler.get(url, headers=headers)
+            if not response:
+                return False
+            
+            try:
+                if response.status_code != 206 or \
+                        self._parse_content_range_start(response.headers.get("Content-Range", "")) != start:
+                    logger.warning(f"分段 {start}-{end} 返回的内容范围不符（状态码 {response.status_code}）")
+                    return False
+                
+                written = 0
+                with open(part_path, "r+b") as f:
+                    f.seek(start)
+                    for chunk in response.iter_content(chunk_size=65536):
+                        if chunk:
+                            f.write(chunk)
+                            written += len(chunk)
+            finally:
+                response.close()
             
-            file_size = os.path.getsize(save_path)
-            logger.info(f"文件下载成功: {save_path} (大小: {file_size / 1024:.2f} KB)")
-            return save_path
+            if written != end - start + 1:
+                logger.warning(f"分段 {start}-{end} 长度不一致: 期望 {end - start + 1}，实际 {written}")
+                return False
             
-        except Exception as e:
-            logger.error(f"文件下载失败: {str(e)}")
-            # 清理失败的文件
-            if save_path.exists():
-                save_path.unlink()
+            with meta_lock:
+                segment[2] = True
+                self._save_part_meta(meta_path, meta)
+            return True
+        
+        def fetch_safely(segment: List[Any]) -> bool:
+            try:
+                return fetch(segment)
+            except Exception as e:
+                logger.warning(f"分段 {segment[0]}-{segment[1]} 下载中断: {str(e)}")
+                return False
+        
+        with ThreadPoolExecutor(max_workers=connections, thread_name_prefix="segment") as executor:
+            results = list(executor.map(fetch_safely, pending))
+        
+        failed = results.count(False)
+        if failed:
+            raise IOError(f"{failed} 个分段下载失败，将续传剩余分段")
+        
+        size = part_path.stat().st_size
+        if size != meta["total"]:
+            self._discard_part(part_path, meta_path)
+            raise IOError(f"文件长度不一致: 期望 {meta['total']} 字节，实际 {size} 字节")
+        return True
+    
+    @staticmethod
+    def _parse_content_range_start(content_range: str) -> Optional[int]:
+        """解析 Content-Range（bytes start-end/total）中的起始位置"""
+        try:
+            return int(content_range.split(" ", 1)[1].split("-", 1)[0])
+        except (IndexError, ValueError):
             return None
     
+    @staticmethod
+    def _load_part_meta(meta_path: Path) -> Dict[str, Any]:
+        """读取续传信息，不存在或损坏时返回空字典"""
+        try:
+            if meta_path.exists():
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+        except (OSError, ValueError):
+            pass
+        return {}
+    
+    @staticmethod
+    def _save_part_meta(meta_path: Path, meta: Dict[str, Any]):
+        """保存续传信息"""
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+    
+    @staticmethod
+    def _discard_part(part_path: Path, meta_path: Path):
+        """删除临时文件和续传信息"""
+        part_path.unlink(missing_ok=True)
+        meta_path.unlink(missing_ok=True)
+    
     def download_from_export(
         self,
         download_url: str,
@@ -108,8 +394,18 @@ class DownloadHandler:
         if deleted_count > 0:
             logger.info(f"清理了 {deleted_count} 个旧的 {filename_base} 文件")
         
-        # 下载新文件
-        result = self.download_file(download_url, filename_base)
+        # 清理之前导出遗留的未完成临时文件（当前文件的临时文件保留用于续传）
+        current_part = self.get_part_path(download_url, filename_base, DOWNLOADS_DIR)
+        for stale_part in self.find_part_files(filename_base, DOWNLOADS_DIR):
+            if stale_part != current_part:
+                self._discard_part(stale_part, stale_part.with_name(stale_part.name + ".json"))
+        
+        # 下载新文件（需要下载后解析时保留下载内容，解析时不再读取文件）
+        content = bytearray() if is_handoff_enabled() else None
+        result = self.download_file(download_url, filename_base, content=content)
+        
+        # 内存交接模式：在解析线程中解析并登记，报表加载时直接使用
+        handoff_downloaded_file(result, content)
 
         if result:
             file_size_kb = result.stat().st_size / 1024
@@ -0,0 +1,142 @@
+"""
+导出结果复用缓存
+以 (导出URL, 导出参数) 的规范化哈希为键，记录已完成导出的下载URL和本地文件，
+有效期内重复的导出请求直接复用本地文件
+"""
+
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any
+from config.settings import (
+    EXPORT_CACHE_ENABLED, EXPORT_CACHE_FILE, EXPORT_CACHE_DEFAULT_TTL, EXPORT_CACHE_TTL,
+)
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ExportResultCache:
+    """导出结果缓存（JSON文件持久化，线程安全）"""
+
+    def __init__(self, cache_file: Path = EXPORT_CACHE_FILE):
+        self.cache_file = cache_file
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """读取缓存索引"""
+        try:
+            if self.cache_file.exists():
+                with open(self.cache_file, "r", encoding="utf-8") as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.warning(f"读取导出缓存失败: {str(e)}")
+        return {}
+
+    def _save(self):
+        """保存缓存索引（调用方持有锁），同时清除过期条目"""
+        now = time.time()
+        self._entries = {
+            key: entry for key, entry in self._entries.items()
+            if now - entry.get("created_at", 0) < self.get_ttl(entry.get("module_name", ""))
+        }
+        try:
+            with open(self.cache_file, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            logger.warning(f"保存导出缓存失败: {str(e)}")
+
+    @staticmethod
+    def make_key(export_url: str, export_params: Dict[str, Any]) -> str:
+        """
+        生成导出请求的规范化哈希（参数顺序不影响结果）
+
+        Args:
+            export_url: 导出接口URL
+            export_params: 导出参数
+
+        Returns:
+            str: sha256 十六进制摘要
+        """
+        payload = json.dumps({"url": export_url, "params": export_params},
+                             sort_keys=True, ensure_ascii=False, default=str, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def get_ttl(module_name: str) -> float:
+        """获取模块的缓存有效期（秒）"""
+        return EXPORT_CACHE_TTL.get(module_name, EXPORT_CACHE_DEFAULT_TTL)
+
+    def get(self, export_url: str, export_params: Dict[str, Any], module_name: str) -> Optional[Path]:
+        """
+        查找有效期内的导出结果
+
+        Args:
+            export_url: 导出接口URL
+            export_params: 导出参数
+            module_name: 导出模块名称（决定有效期）
+
+        Returns:
+            仍存在的本地文件路径，未命中返回None
+        """
+        if not EXPORT_CACHE_ENABLED or self.get_ttl(module_name) <= 0:
+            return None
+
+        key = self.make_key(export_url, export_params)
+        with self._lock:
+            entry = self._entries.get(key)
+        if not entry:
+            return None
+
+        age = time.time() - entry.get("created_at", 0)
+        if age >= self.get_ttl(module_name):
+            return None
+
+        file_path = Path(entry.get("file_path", ""))
+        if not file_path.is_file():
+            # 文件已被清理（如同名前缀的新导出覆盖），视为未命中
+            return None
+
+        logger.info(f"[{module_name}] 命中导出缓存（{age / 60:.0f} 分钟前导出）: {file_path.name}")
+        return file_path
+
+    def put(self, export_url: str, export_params: Dict[str, Any], module_name: str,
+            download_url: str, file_path: Path):
+        """
+        记录一次完成的导出
+
+        Args:
+            export_url: 导出接口URL
+            export_params: 导出参数
+            module_name: 导出模块名称
+            download_url: 导出返回的下载URL
+            file_path: 下载到本地的文件路径
+        """
+        if not EXPORT_CACHE_ENABLED or self.get_ttl(module_name) <= 0:
+            return
+
+        key = self.make_key(export_url, export_params)
+        with self._lock:
+            self._entries[key] = {
+                "module_name": module_name,
+                "download_url": download_url,
+                "file_path": str(file_path),
+                "created_at": time.time(),
+            }
+            self._save()
+
+
+_export_cache: Optional[ExportResultCache] = None
+_export_cache_lock = threading.Lock()
+
+
+def get_export_cache() -> ExportResultCache:
+    """获取进程级共享的导出结果缓存"""
+    global _export_cache
+    with _export_cache_lock:
+        if _export_cache is None:
+            _export_cache = ExportResultCache()
+        return _export_cache
@@ -2,12 +2,13 @@
 导出任务处理器
 """
 
-import time
-from typing import Optional, Dict, Any
+import datetime
+import requests
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Optional, Dict, Any, Tuple
 from core.request_handler import RequestHandler
-from config.api_config import DOWNLOAD_ENDPOINT
-from config.params_config import get_download_params
-from config.settings import EXPORT_POLL_INTERVAL, EXPORT_MAX_WAIT_TIME, EXPORT_INITIAL_WAIT
+from core.columnar_json import loads_json
+from core.export_poller import get_export_poller, get_result_timeout
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -30,6 +31,21 @@ class ExportHandler:
         Returns:
             是否提交成功
         """
+        success, _ = self.submit_export_task_with_id(export_url, export_params)
+        return success
+    
+    def submit_export_task_with_id(self, export_url: str,
+                                   export_params: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
+        """
+        提交导出任务（只提交一次，不重试），并尝试从响应中获取任务ID
+        
+        Args:
+            export_url: 导出接口URL
+            export_params: 导出参数
+            
+        Returns:
+            (是否提交成功, 任务ID)，响应中没有任务ID时为None，由轮询器在首次出现时绑定
+        """
         logger.info(f"提交导出任务: {export_url}")
         logger.debug(f"导出参数: {export_params}")
         
@@ -37,34 +53,72 @@ class ExportHandler:
         result = self._single_post_request(export_url, export_params)
         
         if result and result.get("code") == 0:
-            logger.info("导出任务提交成功")
-            return True
+            task_id = self._extract_task_id(result)
+            logger.info(f"导出任务提交成功{f'，任务ID: {task_id}' if task_id else ''}")
+            return True, task_id
         elif result and result.get("code") == 2006:
             # 正在处理中，说明任务已存在，也算成功
             logger.info("导出任务已在处理中，无需重复提交")
-            return True
+            return True, None
         elif result is None:
             # 请求超时，但任务可能已在后台启动，继续等待检查
             logger.warning("导出接口超时，但任务可能已在后台启动，继续等待检查...")
-            return True
+            return True, None
         else:
             logger.error(f"导出任务提交失败: {result}")
-            return False
+            return False, None
+    
+    @staticmethod
+    def _extract_task_id(result: Dict[str, Any]) -> Optional[str]:
+        """
+        从导出接口响应中提取任务ID
+        
+        兼容 data 直接为ID，或 data 为包含 id / task_id / history_id 的字典
+        """
+        def _as_task_id(value: Any) -> Optional[str]:
+            # 只接受整数或纯数字字符串，避免把提示信息误当成任务ID
+            if isinstance(value, bool):
+                return None
+            if isinstance(value, int):
+                return str(value)
+            if isinstance(value, str) and value.strip().isdigit():
+                return value.strip()
+            return None
+        
+        data = result.get("data")
+        if isinstance(data, dict):
+            for key in ("id", "task_id", "history_id"):
+                task_id = _as_task_id(data.get(key))
+                if task_id:
+                    return task_id
+            return None
+        return _as_task_id(data)
     
     def _single_post_request(self, url: str, json_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         发送单次POST请求（不重试）
         """
+        response = None
         try:
+            if not self.request_handler.circuit_breakers.allow_request(url):
+                logger.error(f"后端熔断中，跳过导出请求: {url}")
+                return None
+            self.request_handler.rate_limiter.acquire(url)
             logger.info(f"发送POST请求: {url}")
             response = self.request_handler.session.post(url, json=json_data, timeout=30)
+            self.request_handler.circuit_breakers.record_response(url, response.status_code)
             response.raise_for_status()
             
-            result = response.json()
+            result = loads_json(response.content)
             logger.info(f"请求成功: {url}")
             return result
             
         except Exception as e:
+            if isinstance(e, requests.exceptions.RequestException) and e.response is None:
+                self.request_handler.circuit_breakers.record_failure(url)
+            elif response is None:
+                # 未收到响应也未记录结果，释放可能占用的探测名额
+                self.request_handler.circuit_breakers.release_probe(url)
             # 超时错误降级为 WARNING，因为任务可能已在后台启动
             if "timeout" in str(e).lower():
                 logger.warning(f"请求超时: {str(e)}")
@@ -72,99 +126,10 @@ class ExportHandler:
                 logger.error(f"请求失败: {str(e)}")
             return None
     
-    def wait_for_export_completion(self, module_name: str, 
-                                   max_wait_time: int = EXPORT_MAX_WAIT_TIME) -> Optional[str]:
+    def start_export(self, export_url: str, export_params: Dict[str, Any],
+                     module_name: str) -> Optional[Future]:
         """
-        轮询等待导出任务完成并获取下载URL
-        
-        Args:
-            module_name: 模块名称（用于匹配任务）
-            max_wait_time: 最大等待时间（秒）
-            
-        Returns:
-            文件下载URL，失败返回None
-        """
-        logger.info(f"开始轮询导出任务状态，模块: {module_name}")
-        
-        start_time = time.time()
-        poll_count = 0
-        
-        while time.time() - start_time < max_wait_time:
-            poll_count += 1
-            logger.info(f"第 {poll_count} 次轮询...")
-            
-            # 获取下载任务列表
-            download_params = get_download_params()
-            result = self.request_handler.post(DOWNLOAD_ENDPOINT, download_params)
-            
-            if not result or result.get("code") != 0:
-                logger.warning(f"获取任务列表失败，等待 {EXPORT_POLL_INTERVAL} 秒后重试")
-                time.sleep(EXPORT_POLL_INTERVAL)
-                continue
-            
-            # 解析任务列表
-            content = result.get("data", {}).get("content", [])
-            
-            if not content:
-                logger.warning("任务列表为空，等待后重试")
-                time.sleep(EXPORT_POLL_INTERVAL)
-                continue
-            
-            # 查找匹配的任务 - 按创建时间排序，获取最新的
-            matching_tasks = []
-            
-            for task in content:
-                task_name = task.get("name", "")
-                task_module = task.get("module_name", "")
-                state = task.get("state")
-                schedule = task.get("schedule", 0)
-                create_time = task.get("create_time", "")
-                
-                # 匹配模块名称
-                if module_name in task_name or module_name in task_module:
-                    matching_tasks.append({
-                        "task": task,
-                        "name": task_name,
-                        "state": state,
-                        "schedule": schedule,
-                        "create_time": create_time,
-                        "url": task.get("url", "")
-                    })
-            
-            if not matching_tasks:
-                logger.info("未找到匹配的任务（过滤掉历史任务后为空），等待后重试")
-                time.sleep(EXPORT_POLL_INTERVAL)
-                continue
-            
-            # 按创建时间排序，最新的在前面（假设content已经按时间排序，第一个就是最新的）
-            latest_task = matching_tasks[0]
-            
-            logger.info(f"找到匹配任务: {latest_task['name']}, 状态: {latest_task['state']}, "
-                       f"进度: {latest_task['schedule']}%, 创建时间: {latest_task['create_time']}")
-            
-            # state=1 且 schedule=100 表示完成
-            if latest_task['state'] == 1 and latest_task['schedule'] == 100:
-                url = latest_task['url']
-                if url:
-                    logger.info(f"导出任务完成，下载URL: {url}")
-                    return url
-                else:
-                    logger.error("任务完成但未找到下载URL")
-                    return None
-            else:
-                logger.info(f"任务进行中，进度: {latest_task['schedule']}%")
-                # 继续轮询
-            
-            # 等待后继续轮询
-            time.sleep(EXPORT_POLL_INTERVAL)
-        
-        logger.error(f"等待超时（{max_wait_time}秒），导出任务未完成")
-        return None
-    
-    def export_and_get_url(self, export_url: str, export_params: Dict[str, Any], 
-                          module_name: str) -> Optional[str]:
-        """
-        提交导出任务并等待完成，返回下载URL
+        提交导出任务并登记到共享轮询器，不阻塞等待
         
         Args:
             export_url: 导出接口URL
@@ -172,132 +137,43 @@ class ExportHandler:
             module_name: 模块名称
             
         Returns:
-            文件下载URL，失败返回None
+            Future（结果为下载URL或None），提交失败返回None
         """
         # 记录开始时间，用于判断是否是本次导出的任务
-        import datetime
         start_time = datetime.datetime.now()
         logger.info(f"开始导出任务，开始时间: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
         
         # 1. 提交导出任务
-        if not self.submit_export_task(export_url, export_params):
+        success, task_id = self.submit_export_task_with_id(export_url, export_params)
+        if not success:
             return None
         
-        # 2. 等待初始时间让导出任务处理和记录生成
-        logger.info(f"等待导出任务处理和记录生成，预计需要{EXPORT_INITIAL_WAIT}秒...")
-        time.sleep(EXPORT_INITIAL_WAIT)  # 等待配置的初始时间让任务充分处理并生成记录
-        
-        # 3. 开始轮询获取结果
-        download_url = self.wait_for_export_completion_with_time(module_name, start_time)
-        return download_url
+        # 2. 登记到共享轮询器，按自适应节奏与其他导出任务共用历史列表轮询
+        logger.info("等待导出任务处理和记录生成...")
+        return get_export_poller().register(module_name, start_time, task_id=task_id)
     
-    def wait_for_export_completion_with_time(self, module_name: str, start_time, 
-                                           max_wait_time: int = EXPORT_MAX_WAIT_TIME) -> Optional[str]:
+    def export_and_get_url(self, export_url: str, export_params: Dict[str, Any], 
+                          module_name: str) -> Optional[str]:
         """
-        轮询等待导出任务完成并获取下载URL（带时间判断）
+        提交导出任务并等待完成，返回下载URL
         
         Args:
-            module_name: 模块名称（用于匹配任务）
-            start_time: 导出开始时间
-            max_wait_time: 最大等待时间（秒）
+            export_url: 导出接口URL
+            export_params: 导出参数
+            module_name: 模块名称
             
         Returns:
             文件下载URL，失败返回None
         """
-        logger.info(f"开始轮询导出任务状态，模块: {module_name}")
-        
-        poll_start_time = time.time()
-        poll_count = 0
-        
-        while time.time() - poll_start_time < max_wait_time:
-            poll_count += 1
-            logger.info(f"第 {poll_count} 次轮询...")
-            
-            # 获取下载任务列表
-            download_params = get_download_params()
-            result = self.request_handler.post(DOWNLOAD_ENDPOINT, download_params)
-            
-            if not result or result.get("code") != 0:
-                logger.warning(f"获取任务列表失败，等待 {EXPORT_POLL_INTERVAL} 秒后重试")
-                time.sleep(EXPORT_POLL_INTERVAL)
-                continue
-            
-            # 解析任务列表
-            content = result.get("data", {}).get("content", [])
-            
-            if not content:
-                logger.warning("任务列表为空，等待后重试")
-                time.sleep(EXPORT_POLL_INTERVAL)
-                continue
-            
-            # 查找匹配的任务 - 只考虑开始时间之后创建的任务
-            matching_tasks = []
-            
-            for task in content:
-                task_name = task.get("name", "")
-                task_module = task.get("module_name", "")
-                state = task.get("state")
-                schedule = task.get("schedule", 0)
-                create_time_str = task.get("create_time", "")
-                
-                # 匹配模块名称
-                if module_name in task_name or module_name in task_module:
-                    # 解析创建时间
-                    try:
-                        import datetime
-                        create_time = datetime.datetime.strptime(create_time_str, "%Y-%m-%d %H:%M:%S")
-                        
-                        # 只考虑开始时间之后创建的任务（允许5秒误差）
-                        time_diff = (create_time - start_time).total_seconds()
-                        if time_diff >= -5:  # 允许少量时间差，避免匹配到历史任务
-                            matching_tasks.append({
-                                "task": task,
-                                "name": task_name,
-                                "state": state,
-                                "schedule": schedule,
-                                "create_time": create_time_str,
-                                "url": task.get("url", ""),
-                                "time_diff": time_diff
-                            })
-                    except ValueError:
-                        # 时间格式解析失败，跳过时间判断
-                        matching_tasks.append({
-                            "task": task,
-                            "name": task_name,
-                            "state": state,
-                            "schedule": schedule,
-                            "create_time": create_time_str,
-                            "url": task.get("url", ""),
-                            "time_diff": 0
-                        })
-            
-            if not matching_tasks:
-                logger.info("未找到匹配的任务，可能任务尚未开始")
-                time.sleep(EXPORT_POLL_INTERVAL)
-                continue
-            
-            # 按时间差排序，选择最接近开始时间的任务
-            matching_tasks.sort(key=lambda x: abs(x['time_diff']))
-            latest_task = matching_tasks[0]
-            
-            logger.info(f"找到匹配任务: {latest_task['name']}, 状态: {latest_task['state']}, "
-                       f"进度: {latest_task['schedule']}%, 创建时间: {latest_task['create_time']}")
-            
-            # state=1 且 schedule=100 表示完成
-            if latest_task['state'] == 1 and latest_task['schedule'] == 100:
-                url = latest_task['url']
-                if url:
-                    logger.info(f"导出任务完成，下载URL: {url}")
-                    return url
-                else:
-                    logger.error("任务完成但未找到下载URL")
-                    return None
-            else:
-                logger.info(f"任务进行中，进度: {latest_task['schedule']}%")
-                # 继续轮询
-            
-            # 等待后继续轮询
-            time.sleep(EXPORT_POLL_INTERVAL)
+        future = self.start_export(export_url, export_params, module_name)
+        if future is None:
+            return None
         
-        logger.error(f"等待超时（{max_wait_time}秒），导出任务未完成")
-        return None
+        # 3. 等待共享轮询器返回结果（超时由轮询器负责，这里只做兜底）
+        timeout = get_result_timeout()
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            logger.error(f"等待导出结果超时（{timeout:.0f}秒），放弃等待: {module_name}")
+            return None
@@ -0,0 +1,170 @@
+"""
+导出历史索引
+轮询时按页读取导出历史，直到覆盖最早的等待任务（最多 EXPORT_HISTORY_MAX_PAGES 页），
+记录按任务ID和名称建立索引，创建时间每条记录只解析一次，等待任务直接查询索引
+"""
+
+import datetime
+import threading
+from typing import Optional, Dict, Any, List, Set, Tuple
+from config.api_config import DOWNLOAD_ENDPOINT
+from config.params_config import get_download_params
+from config.settings import EXPORT_HISTORY_PAGE_SIZE, EXPORT_HISTORY_MAX_PAGES
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def get_row_key(task: Dict[str, Any]) -> str:
+    """历史记录的唯一键：优先使用任务ID，缺失时使用名称+创建时间"""
+    task_id = task.get("id")
+    if task_id not in (None, ""):
+        return str(task_id)
+    return f"{task.get('name', '')}|{task.get('create_time', '')}"
+
+
+def parse_create_time(value: Any) -> Optional[datetime.datetime]:
+    """解析历史记录的创建时间，格式不符返回None"""
+    try:
+        return datetime.datetime.strptime(value or "", "%Y-%m-%d %H:%M:%S")
+    except (TypeError, ValueError):
+        return None
+
+
+class ExportHistoryIndex:
+    """
+    导出历史本地索引
+
+    - rows: 任务ID -> {"task": 最新的历史记录, "created_at": 解析后的创建时间}
+    - names: 任务名称/模块名称 -> 任务ID集合（等待任务按名称包含关系匹配，只需遍历不同的名称）
+    """
+
+    def __init__(self, request_handler, page_size: int = EXPORT_HISTORY_PAGE_SIZE,
+                 max_pages: int = EXPORT_HISTORY_MAX_PAGES):
+        self.request_handler = request_handler
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self._lock = threading.Lock()
+        self.rows: Dict[str, Dict[str, Any]] = {}
+        self.names: Dict[str, Set[str]] = {}
+        # 每次刷新的序号：只返回最近一次刷新中读到的记录，避免使用已过时的任务状态
+        self._generation = 0
+
+    def refresh(self, horizon: datetime.datetime) -> bool:
+        """
+        刷新索引：从第1页开始读取，直到某页出现早于 horizon 的记录、不满一页或达到页数上限
+
+        Args:
+            horizon: 需要覆盖的最早创建时间（最早等待任务的开始时间减去允许误差）
+
+        Returns:
+            bool: 第1页获取成功返回True
+        """
+        start_date = horizon.strftime("%Y-%m-%d")
+        pages_read = 0
+        with self._lock:
+            self._generation += 1
+        for page_number in range(self.max_pages):
+            result = self.request_handler.post(
+                DOWNLOAD_ENDPOINT, get_download_params(page_number, self.page_size, start_date)
+            )
+            if not result or result.get("code") != 0:
+                if page_number == 0:
+                    return False
+                logger.warning(f"获取导出历史第 {page_number + 1} 页失败，本轮只使用前 {page_number} 页")
+                break
+
+            content = (result.get("data") or {}).get("content") or []
+            pages_read += 1
+            oldest = self._upsert(content)
+            if len(content) < self.page_size or (oldest is not None and oldest < horizon):
+                break
+        else:
+            logger.warning(f"导出历史已读取 {self.max_pages} 页仍未覆盖到 {horizon}，较早的任务可能无法匹配")
+
+        if pages_read > 1:
+            logger.info(f"导出历史本轮读取 {pages_read} 页")
+        self._prune(horizon)
+        return True
+
+    def _upsert(self, content: List[Dict[str, Any]]) -> Optional[datetime.datetime]:
+        """
+        写入一页记录（已有记录只更新内容，创建时间未变时不重复解析）
+
+        Returns:
+            本页最早的创建时间，全部无法解析返回None
+        """
+        oldest = None
+        with self._lock:
+            for task in content:
+                key = get_row_key(task)
+                entry = self.rows.get(key)
+                if entry is not None and entry["task"].get("create_time") == task.get("create_time"):
+                    entry["task"] = task
+                else:
+                    entry = {"task": task, "created_at": parse_create_time(task.get("create_time"))}
+                    self.rows[key] = entry
+                    for name in (task.get("name"), task.get("module_name")):
+                        if name:
+                            self.names.setdefault(name, set()).add(key)
+                entry["generation"] = self._generation
+
+                created_at = entry["created_at"]
+                if created_at is not None and (oldest is None or created_at < oldest):
+                    oldest = created_at
+        return oldest
+
+    def _prune(self, horizon: datetime.datetime):
+        """移除早于 horizon 的记录（不会再被任何等待任务匹配）"""
+        with self._lock:
+            stale = [key for key, entry in self.rows.items()
+                     if entry["created_at"] is not None and entry["created_at"] < horizon]
+            for key in stale:
+                del self.rows[key]
+            if stale:
+                stale_keys = set(stale)
+                for name in list(self.names):
+                    self.names[name] -= stale_keys
+                    if not self.names[name]:
+                        del self.names[name]
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """按任务ID获取最近一次刷新中的历史记录"""
+        with self._lock:
+            entry = self.rows.get(key)
+            if entry is None or entry["generation"] != self._generation:
+                return None
+            return entry["task"]
+
+    def find_candidates(self, module_name: str, start_time: datetime.datetime,
+                        exclude: Set[str]) -> List[Tuple[float, str, Dict[str, Any]]]:
+        """
+        查找可能属于某个等待任务的历史记录
+
+        名称或模块名称包含 module_name，且创建时间不早于开始时间5秒（无法解析时间的记录视为时间差0）
+
+        Args:
+            module_name: 模块名称
+            start_time: 导出开始时间
+            exclude: 已被其他等待任务绑定的任务ID
+
+        Returns:
+            List[(时间差绝对值, 任务ID, 历史记录)]，按时间差从小到大排序
+        """
+        candidates = []
+        with self._lock:
+            keys = set()
+            for name, name_keys in self.names.items():
+                if module_name in name:
+                    keys |= name_keys
+            for key in keys - exclude:
+                entry = self.rows[key]
+                if entry["generation"] != self._generation:
+                    continue
+                created_at = entry["created_at"]
+                time_diff = (created_at - start_time).total_seconds() if created_at is not None else 0
+                if time_diff < -5:  # 允许少量时间差，避免匹配到历史任务
+                    continue
+                candidates.append((abs(time_diff), key, entry["task"]))
+        candidates.sort(key=lambda item: item[0])
+        return candidates
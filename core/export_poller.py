@@ -0,0 +1,305 @@
+"""
+导出历史轮询服务
+进程级共享：每个轮询周期只请求一次导出历史列表，统一匹配所有等待中的导出任务
+"""
+
+import datetime
+import threading
+import time
+from concurrent.futures import Future, wait, FIRST_COMPLETED
+from typing import Optional, Dict, Any, List, Iterable, Iterator
+from core.request_handler import RequestHandler
+from core.export_history import ExportHistoryIndex
+from core.poll_scheduler import AdaptivePollSchedule, get_duration_stats
+from config.api_config import DOWNLOAD_ENDPOINT
+from config.settings import EXPORT_MAX_WAIT_TIME, EXPORT_INITIAL_WAIT, EXPORT_RESULT_TIMEOUT_SLACK
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ExportHistoryPoller:
+    """导出历史轮询器 - 多个导出任务共用一个轮询线程"""
+
+    def __init__(self):
+        self.request_handler = RequestHandler()
+        self.history = ExportHistoryIndex(self.request_handler)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._waiters: List[Dict[str, Any]] = []
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, module_name: str, start_time: datetime.datetime,
+                 max_wait_time: int = EXPORT_MAX_WAIT_TIME,
+                 initial_wait: Optional[float] = None,
+                 task_id: Optional[str] = None) -> Future:
+        """
+        登记一个等待中的导出任务
+
+        Args:
+            module_name: 模块名称（用于匹配任务）
+            start_time: 导出开始时间（只匹配此时间之后创建的任务）
+            max_wait_time: 最大轮询时间（秒），从首次轮询开始计算
+            initial_wait: 首次轮询前的等待时间（秒），默认根据该模块的历史导出耗时自适应
+            task_id: 提交响应中返回的任务ID；为None时在历史列表中首次出现时绑定
+
+        Returns:
+            Future: 任务完成时结果为下载URL，失败或超时结果为None
+        """
+        now = time.time()
+        schedule = AdaptivePollSchedule(module_name, get_duration_stats().get_expected_duration(module_name))
+        if initial_wait is None:
+            initial_wait = schedule.initial_delay()
+
+        future: Future = Future()
+        waiter = {
+            "module_name": module_name,
+            "start_time": start_time,
+            "future": future,
+            "schedule": schedule,
+            "submitted_at": now,
+            "task_id": task_id,
+            "task_id_source": "submit" if task_id else None,
+            "missed_polls": 0,
+            "next_poll_at": now + initial_wait,
+            "deadline": now + initial_wait + max_wait_time,
+            "max_wait_time": max_wait_time,
+            "poll_count": 0,
+        }
+
+        with self._lock:
+            self._waiters.append(waiter)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="export-poller", daemon=True)
+                self._thread.start()
+
+        self._wakeup.set()
+        logger.info(f"登记导出等待任务: {module_name}，首次轮询将在 {initial_wait:.1f} 秒后进行")
+        return future
+
+    def pending_count(self) -> int:
+        """当前等待中的导出任务数"""
+        with self._lock:
+            return len(self._waiters)
+
+    def _run(self):
+        """轮询线程主循环，没有等待任务时自动退出"""
+        while True:
+            with self._lock:
+                if not self._waiters:
+                    self._thread = None
+                    return
+                next_poll_at = min(waiter["next_poll_at"] for waiter in self._waiters)
+
+            delay = next_poll_at - time.time()
+            if delay > 0:
+                self._wakeup.wait(delay)
+                self._wakeup.clear()
+                continue
+
+            try:
+                self._tick()
+            except Exception as e:
+                logger.error(f"导出历史轮询异常: {str(e)}")
+                self._reschedule_due_waiters(time.time())
+
+    def _tick(self):
+        """执行一次轮询：获取一次历史列表并匹配所有等待任务"""
+        now = time.time()
+        with self._lock:
+            # 调用方等待超时后会取消 Future，这些等待任务不再轮询
+            self._waiters = [waiter for waiter in self._waiters if not waiter["future"].done()]
+            waiters = list(self._waiters)
+        if not waiters:
+            return
+
+        due_waiters = [waiter for waiter in waiters if waiter["next_poll_at"] <= now]
+        for waiter in due_waiters:
+            waiter["poll_count"] += 1
+
+        logger.info(f"轮询导出历史，等待中任务 {len(waiters)} 个（本轮到期 {len(due_waiters)} 个）")
+
+        # 刷新导出历史索引（所有等待任务共用），覆盖到最早的等待任务
+        horizon = min(waiter["start_time"] for waiter in waiters) - datetime.timedelta(seconds=5)
+        refreshed = self.history.refresh(horizon)
+        
+        if not refreshed and self.request_handler.circuit_breakers.is_open(DOWNLOAD_ENDPOINT):
+            # 导出历史接口所在后端熔断，所有等待任务立即失败，不再轮询到超时
+            logger.error(f"导出历史接口所在后端熔断中，{len(waiters)} 个等待任务全部失败")
+            for waiter in waiters:
+                self._finish(waiter, None)
+            return
+        
+        if not refreshed:
+            logger.warning("获取任务列表失败，等待后重试")
+        elif not self.history.rows:
+            logger.warning("任务列表为空，等待后重试")
+
+        claimed_ids = {waiter["task_id"] for waiter in waiters if waiter.get("task_id")}
+
+        # 按提交顺序处理，保证同一模块的多个并发导出按先后顺序绑定各自的任务
+        for waiter in sorted(waiters, key=lambda item: item["submitted_at"]):
+            task = self._lookup_task(waiter, claimed_ids) if refreshed else None
+            if task is not None and self._resolve_if_finished(waiter, task):
+                continue
+
+            if time.time() >= waiter["deadline"]:
+                logger.error(f"等待超时（{waiter['max_wait_time']}秒），导出任务未完成: {waiter['module_name']}")
+                self._finish(waiter, None)
+
+        self._reschedule_due_waiters(now)
+
+    def _reschedule_due_waiters(self, now: float):
+        """为本轮到期的任务安排下一次轮询时间（按各自的自适应节奏）"""
+        with self._lock:
+            for waiter in self._waiters:
+                if waiter["next_poll_at"] <= now:
+                    delay = waiter["schedule"].next_delay()
+                    waiter["next_poll_at"] = now + delay
+                    logger.debug(f"[{waiter['module_name']}] 下次轮询间隔: {delay:.1f} 秒")
+
+    def _lookup_task(self, waiter: Dict[str, Any], claimed_ids: set) -> Optional[Dict[str, Any]]:
+        """
+        查找等待任务对应的导出记录
+
+        已绑定任务ID时通过索引直接查找；否则按模块名称和提交时间绑定一条未被占用的记录
+        """
+        module_name = waiter["module_name"]
+        task_id = waiter.get("task_id")
+
+        if task_id:
+            task = self.history.get(task_id)
+            if task is not None:
+                waiter["missed_polls"] = 0
+                return task
+
+            waiter["missed_polls"] += 1
+            if waiter["task_id_source"] == "submit" and waiter["missed_polls"] >= 3:
+                # 提交响应中的ID始终未出现在历史列表中，可能不是历史记录ID，改为按名称绑定
+                logger.warning(f"[{module_name}] 历史列表中未找到提交返回的任务ID {task_id}，改为按名称和时间绑定")
+                claimed_ids.discard(task_id)
+                waiter["task_id"] = None
+                waiter["task_id_source"] = None
+            else:
+                logger.info(f"[{module_name}] 本轮历史列表中未找到任务 {task_id}")
+                return None
+
+        return self._bind_task(waiter, claimed_ids)
+
+    def _bind_task(self, waiter: Dict[str, Any], claimed_ids: set) -> Optional[Dict[str, Any]]:
+        """
+        为未绑定ID的等待任务绑定历史记录
+
+        匹配规则：模块名称匹配，且创建时间不早于开始时间5秒，取时间差最小的记录；
+        已被其他等待任务绑定的记录不参与匹配
+        """
+        module_name = waiter["module_name"]
+        matching_tasks = self.history.find_candidates(module_name, waiter["start_time"], claimed_ids)
+
+        if not matching_tasks:
+            logger.info(f"[{module_name}] 未找到匹配的任务，可能任务尚未开始")
+            return None
+
+        _, row_key, task = matching_tasks[0]
+
+        waiter["task_id"] = row_key
+        waiter["task_id_source"] = "history"
+        waiter["missed_polls"] = 0
+        claimed_ids.add(row_key)
+        logger.info(f"[{module_name}] 绑定导出任务ID: {row_key}（创建时间: {task.get('create_time', '')}）")
+        return task
+
+    def _resolve_if_finished(self, waiter: Dict[str, Any], task: Dict[str, Any]) -> bool:
+        """
+        检查匹配到的任务是否完成，完成则结束等待
+
+        Returns:
+            bool: 是否已结束等待
+        """
+        module_name = waiter["module_name"]
+        state = task.get("state")
+        schedule = task.get("schedule", 0)
+
+        logger.info(f"[{module_name}] 找到匹配任务: {task.get('name', '')}, 状态: {state}, "
+                    f"进度: {schedule}%, 创建时间: {task.get('create_time', '')}")
+
+        # state=1 且 schedule=100 表示完成
+        if state == 1 and schedule == 100:
+            url = task.get("url", "")
+            if url:
+                logger.info(f"[{module_name}] 导出任务完成，下载URL: {url}")
+                get_duration_stats().record(module_name, time.time() - waiter["submitted_at"])
+                self._finish(waiter, url)
+            else:
+                logger.error(f"[{module_name}] 任务完成但未找到下载URL")
+                self._finish(waiter, None)
+            return True
+
+        waiter["schedule"].observe(schedule)
+        remaining = waiter["schedule"].estimate_remaining()
+        if remaining is not None:
+            logger.info(f"[{module_name}] 任务进行中，进度: {schedule}%，预计剩余 {remaining:.1f} 秒")
+        else:
+            logger.info(f"[{module_name}] 任务进行中，进度: {schedule}%")
+        return False
+
+    def _finish(self, waiter: Dict[str, Any], url: Optional[str]):
+        """移除等待任务并设置结果"""
+        with self._lock:
+            self._waiters = [item for item in self._waiters if item is not waiter]
+        if not waiter["future"].done():
+            waiter["future"].set_result(url)
+
+
+def get_result_timeout(max_wait_time: int = EXPORT_MAX_WAIT_TIME) -> float:
+    """
+    调用方等待登记结果的最长时间（秒）
+
+    轮询器在首次等待 + 最大轮询时间后必然给出结果，这里再加上宽限时间作为兜底
+
+    Args:
+        max_wait_time: 登记时使用的最大轮询时间（秒）
+
+    Returns:
+        float: 等待超时时间（秒）
+    """
+    return EXPORT_INITIAL_WAIT + max_wait_time + EXPORT_RESULT_TIMEOUT_SLACK
+
+
+def iter_completed(futures: Iterable[Future], max_wait_time: int = EXPORT_MAX_WAIT_TIME) -> Iterator[Future]:
+    """
+    按完成先后返回登记得到的 Future（同 as_completed）
+
+    等待时间只计算实际等待结果的时间（不含调用方处理已完成结果的时间，如下载文件）；
+    超时时已完成的 Future 仍会全部返回，只取消仍未完成的，调用方不会无限等待
+
+    Args:
+        futures: register 返回的 Future
+        max_wait_time: 登记时使用的最大轮询时间（秒）
+    """
+    pending = set(futures)
+    timeout = get_result_timeout(max_wait_time)
+    waited = 0.0
+    while pending:
+        started = time.monotonic()
+        done, pending = wait(pending, timeout=max(0.0, timeout - waited), return_when=FIRST_COMPLETED)
+        waited += time.monotonic() - started
+        if not done:
+            for future in pending:
+                future.cancel()
+            logger.error(f"{len(pending)} 个导出任务等待结果超时（{timeout:.0f}秒），放弃等待")
+            return
+        yield from done
+
+
+_poller: Optional[ExportHistoryPoller] = None
+_poller_lock = threading.Lock()
+
+
+def get_export_poller() -> ExportHistoryPoller:
+    """获取进程级共享的导出历史轮询器"""
+    global _poller
+    with _poller_lock:
+        if _poller is None:
+            _poller = ExportHistoryPoller()
+        return _poller
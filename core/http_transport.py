@@ -0,0 +1,153 @@
+"""
+共享HTTP传输层
+进程内所有请求处理器共用同一组连接池（每个后端域名一个 HTTPAdapter），
+避免每个处理器各自建立TLS连接，并提供连接复用统计；
+requests.Session 不是线程安全的（Cookie、重定向等状态按请求修改），每个线程使用各自的 Session
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from config.api_config import (
+    HTTP_POOL_SIZES, HTTP_DEFAULT_POOL_SIZE, HTTP_DEFAULT_POOL_HOSTS,
+)
+from config.headers_config import HEADERS
+from core.circuit_breaker import get_circuit_breakers
+from core.rate_limiter import get_rate_limiter
+from config.settings import HTTP_PREWARM_CONNECTIONS, HTTP_PREWARM_TIMEOUT
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class TransportRegistry:
+    """
+    共享HTTP传输注册表
+
+    - 每个已配置的后端域名使用独立的 HTTPAdapter（连接池大小见 HTTP_POOL_SIZES）
+    - 其他域名（如OSS下载地址）使用默认适配器
+    - 适配器的连接池由 urllib3 管理，多线程共用是安全的；Session 按线程创建，挂载同一组适配器
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._prewarmed: set = set()
+
+        # 默认适配器：未配置的域名
+        default_adapter = HTTPAdapter(pool_connections=HTTP_DEFAULT_POOL_HOSTS,
+                                      pool_maxsize=HTTP_DEFAULT_POOL_SIZE)
+        self._adapters: List[tuple] = [("https://", default_adapter), ("http://", default_adapter)]
+
+        # 每个后端域名独立的连接池
+        for base_url, pool_size in HTTP_POOL_SIZES.items():
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            self._adapters.append((base_url.rstrip("/") + "/", adapter))
+
+    @property
+    def session(self) -> requests.Session:
+        """当前线程的 Session（首次使用时创建，挂载共享的连接池适配器）"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(HEADERS)
+            for prefix, adapter in self._adapters:
+                session.mount(prefix, adapter)
+            self._local.session = session
+        return session
+
+    def prewarm(self, base_urls: Optional[List[str]] = None,
+                connections: int = HTTP_PREWARM_CONNECTIONS):
+        """
+        预先建立到后端域名的连接，后续请求直接复用（已预热的域名不重复预热）
+
+        Args:
+            base_urls: 需要预热的基础地址，默认全部已配置域名
+            connections: 每个域名并行建立的连接数
+        """
+        if base_urls is None:
+            base_urls = list(HTTP_POOL_SIZES)
+
+        with self._lock:
+            targets = [url for url in base_urls if urlparse(url).netloc not in self._prewarmed]
+            self._prewarmed.update(urlparse(url).netloc for url in targets)
+
+        if not targets or connections <= 0:
+            return
+
+        circuit_breakers = get_circuit_breakers()
+        rate_limiter = get_rate_limiter()
+
+        def _touch(url: str):
+            # 与正常请求一样经过熔断器和限流器
+            if not circuit_breakers.allow_request(url):
+                logger.debug(f"后端熔断中，跳过连接预热: {url}")
+                return
+            try:
+                rate_limiter.acquire(url)
+                # 任意状态码都说明连接已建立，响应读完后连接归还连接池
+                response = self.session.head(url, timeout=HTTP_PREWARM_TIMEOUT, allow_redirects=False)
+                response.close()
+                circuit_breakers.record_response(url, response.status_code)
+            except requests.exceptions.RequestException as e:
+                circuit_breakers.record_failure(url)
+                logger.debug(f"连接预热失败: {url} ({str(e)})")
+            except Exception:
+                circuit_breakers.release_probe(url)
+                raise
+
+        requests_to_send = [url for url in targets for _ in range(connections)]
+        with ThreadPoolExecutor(max_workers=len(requests_to_send), thread_name_prefix="prewarm") as executor:
+            list(executor.map(_touch, requests_to_send))
+
+        logger.info(f"已预热 {len(targets)} 个域名的连接（每个域名 {connections} 个）")
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        获取各域名的连接复用统计
+
+        Returns:
+            Dict: 域名 -> {requests: 请求数, connections: 新建连接数, reused: 复用连接的请求数}
+        """
+        stats: Dict[str, Dict[str, Any]] = {}
+        adapters = {id(adapter): adapter for _, adapter in self._adapters}
+        for adapter in adapters.values():
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                host_stats = stats.setdefault(pool.host, {"requests": 0, "connections": 0, "reused": 0})
+                host_stats["requests"] += pool.num_requests
+                host_stats["connections"] += pool.num_connections
+                host_stats["reused"] = max(0, host_stats["requests"] - host_stats["connections"])
+        return stats
+
+    def log_stats(self):
+        """记录连接复用统计"""
+        stats = self.get_stats()
+        if not stats:
+            return
+
+        total_requests = sum(item["requests"] for item in stats.values())
+        total_connections = sum(item["connections"] for item in stats.values())
+        logger.info(f"HTTP连接复用统计: 请求 {total_requests} 次，新建连接 {total_connections} 个，"
+                    f"节省握手 {max(0, total_requests - total_connections)} 次")
+        for host, item in stats.items():
+            logger.info(f"  {host}: 请求 {item['requests']}，新建连接 {item['connections']}，复用 {item['reused']}")
+
+
+_transport: Optional[TransportRegistry] = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> TransportRegistry:
+    """获取进程级共享的HTTP传输注册表"""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = TransportRegistry()
+        return _transport
@@ -0,0 +1,123 @@
+"""
+按天分区的导出数据存储
+同一组导出参数（不含日期）的每一天单独保存为一个文件，供长日期范围的增量采集复用
+"""
+
+import datetime
+import threading
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+import pandas as pd
+from core.export_cache import ExportResultCache
+from config.settings import PARTITIONS_DIR
+from utils.logger import get_logger
+from utils.xlsx_reader import read_xlsx
+
+logger = get_logger(__name__)
+
+
+class PartitionStore:
+    """按天分区的导出文件存储：PARTITIONS_DIR/<参数哈希>/<YYYY-MM-DD>.xlsx"""
+
+    def __init__(self, root: Path = PARTITIONS_DIR):
+        self.root = root
+
+    @staticmethod
+    def make_key(export_url: str, export_params: Dict[str, Any], date_field: str = "bizday") -> str:
+        """
+        生成分区键：导出参数中除日期字段外的规范化哈希
+
+        Args:
+            export_url: 导出接口URL
+            export_params: 导出参数
+            date_field: 日期范围字段名
+
+        Returns:
+            str: 分区键
+        """
+        params = {key: value for key, value in export_params.items() if key != date_field}
+        return ExportResultCache.make_key(export_url, params)[:16]
+
+    @staticmethod
+    def expand_days(date_range: List[str]) -> List[str]:
+        """
+        将 ["YYYY-MM-DD", "YYYY-MM-DD"] 展开为逐日列表（含首尾）
+
+        Args:
+            date_range: 日期范围
+
+        Returns:
+            List[str]: 日期列表
+        """
+        start = datetime.datetime.strptime(date_range[0], "%Y-%m-%d").date()
+        end = datetime.datetime.strptime(date_range[1], "%Y-%m-%d").date()
+        return [(start + datetime.timedelta(days=offset)).strftime("%Y-%m-%d")
+                for offset in range((end - start).days + 1)]
+
+    def get_partition_path(self, key: str, day: str) -> Path:
+        """获取某一天的分区文件路径"""
+        return self.root / key / f"{day}.xlsx"
+
+    def get_missing_days(self, key: str, days: List[str], refresh_days: int = 0) -> List[str]:
+        """
+        获取需要导出的日期：缺失的分区，以及最近 refresh_days 天内的分区
+
+        Args:
+            key: 分区键
+            days: 请求的日期列表
+            refresh_days: 距今这么多天内的分区视为可能变动，始终重新导出
+
+        Returns:
+            List[str]: 需要导出的日期
+        """
+        refresh_from = (datetime.date.today() - datetime.timedelta(days=refresh_days)).strftime("%Y-%m-%d")
+        return [day for day in days
+                if day >= refresh_from or not self.get_partition_path(key, day).is_file()]
+
+    def list_partitions(self, key: str) -> List[Path]:
+        """
+        获取分区键下已保存的分区文件
+
+        Args:
+            key: 分区键
+
+        Returns:
+            List[Path]: 分区文件路径，最近的日期在前
+        """
+        directory = self.root / key
+        if not directory.is_dir():
+            return []
+        return sorted(directory.glob("*.xlsx"), reverse=True)
+
+    def load_days(self, key: str, days: List[str]) -> Optional[List[pd.DataFrame]]:
+        """
+        读取多天的分区数据
+
+        Args:
+            key: 分区键
+            days: 日期列表
+
+        Returns:
+            按日期顺序的 DataFrame 列表，有缺失分区时返回None
+        """
+        frames = []
+        for day in days:
+            path = self.get_partition_path(key, day)
+            if not path.is_file():
+                logger.error(f"缺少分区数据: {path}")
+                return None
+            frames.append(read_xlsx(path))
+        return frames
+
+
+_partition_store: Optional[PartitionStore] = None
+_partition_store_lock = threading.Lock()
+
+
+def get_partition_store() -> PartitionStore:
+    """获取进程级共享的分区存储"""
+    global _partition_store
+    with _partition_store_lock:
+        if _partition_store is None:
+            _partition_store = PartitionStore()
+        return _partition_store
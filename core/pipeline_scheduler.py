@@ -0,0 +1,150 @@
+"""
+采集-报表流水线调度器
+根据报表声明的 DEPENDENCIES 构建依赖图：报表所需的数据文件全部落地后立即生成，
+不必等待无关的采集模块，整体耗时由关键路径决定；
+采集模块之间的输入依赖（AppRunner.MODULE_DEPENDENCIES）同样计入依赖图
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, Any, Optional, List, Tuple, Set
+from pathlib import Path
+from core.app_runner import AppRunner
+from core.report_manager import ReportManager
+from config.settings import MODULE_MAX_WORKERS, REPORT_MAX_WORKERS
+from utils.data_loader import get_data_loader
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class PipelineScheduler:
+    """按依赖关系交错执行采集模块和加工报表"""
+
+    def __init__(self, app_runner: AppRunner, report_manager: ReportManager):
+        self.app_runner = app_runner
+        self.report_manager = report_manager
+        self.module_name_mapping = get_data_loader().module_name_mapping
+        self._lock = threading.Lock()
+
+    def get_file_prefix(self, name: str) -> str:
+        """
+        获取模块或依赖名称对应的数据文件前缀（与 DataLoader 的映射一致）
+
+        Args:
+            name: 模块键名、报表依赖名或中文文件前缀
+
+        Returns:
+            str: 文件前缀
+        """
+        if name in self.module_name_mapping:
+            return self.module_name_mapping[name]
+        return AppRunner.MODULE_DISPLAY_NAMES.get(name, name)
+
+    def build_dependency_graph(self, jobs: List[Dict[str, Any]],
+                               report_names: List[str]) -> Dict[str, Set[int]]:
+        """
+        计算每个报表依赖的采集任务
+
+        Args:
+            jobs: AppRunner.build_jobs 生成的任务列表
+            report_names: 启用的报表名称
+
+        Returns:
+            Dict[str, Set[int]]: 报表名称 -> 依赖的任务下标集合（含这些任务间接依赖的采集任务）；
+                依赖未在本次运行中采集时使用已有的数据文件，不产生等待
+        """
+        job_dependencies = self.app_runner.build_job_dependencies(jobs)
+        prefix_to_jobs: Dict[str, Set[int]] = {}
+        for index, job in enumerate(jobs):
+            prefix = self.get_file_prefix(job["module_key"])
+            prefix_to_jobs.setdefault(prefix, set()).add(index)
+
+        graph = {}
+        for report_name in report_names:
+            dependencies = self.report_manager.get_report_info(report_name)["dependencies"]
+            job_indexes = set()
+            for dependency in dependencies:
+                job_indexes |= prefix_to_jobs.get(self.get_file_prefix(dependency), set())
+            # 采集任务之间的输入依赖（如销售分析依赖门店管理）
+            unexpanded = list(job_indexes)
+            while unexpanded:
+                for dependency in job_dependencies[unexpanded.pop()] - job_indexes:
+                    job_indexes.add(dependency)
+                    unexpanded.append(dependency)
+            graph[report_name] = job_indexes
+            logger.info(f"报表 {report_name} 依赖任务: "
+                        f"{[jobs[index]['label'] for index in sorted(job_indexes)] or '无（使用已有数据文件）'}")
+        return graph
+
+    def run(self, module_switches: Dict[str, Any],
+            module_params: Optional[Dict[str, Dict[str, Any]]],
+            processing_switches: Dict[str, bool]) -> Tuple[Dict[str, Any], Dict[str, Optional[Path]]]:
+        """
+        执行采集模块，并在依赖满足时立即生成报表
+
+        Args:
+            module_switches: 模块启用开关字典
+            module_params: 模块参数配置字典（可选）
+            processing_switches: 报表开关配置字典
+
+        Returns:
+            (采集结果统计, 报表名称到结果文件路径的字典)
+        """
+        jobs = self.app_runner.build_jobs(module_switches, module_params)
+        report_names = self.report_manager.get_enabled_reports(processing_switches)
+        graph = self.build_dependency_graph(jobs, report_names)
+        self.app_runner.prewarm_connections(jobs)
+
+        # 剩余未完成的依赖任务
+        pending = {name: set(job_indexes) for name, job_indexes in graph.items()}
+        failed_jobs: Set[int] = set()
+        report_futures: Dict[str, Future] = {}
+
+        max_workers = max(1, min(MODULE_MAX_WORKERS, len(jobs)))
+        logger.info(f"流水线执行 {len(jobs)} 个模块任务和 {len(report_names)} 个报表")
+
+        with ThreadPoolExecutor(max_workers=max(1, REPORT_MAX_WORKERS), thread_name_prefix="report") as report_executor:
+
+            def submit_report(report_name: str):
+                failed_dependencies = [jobs[index]["label"] for index in graph[report_name] & failed_jobs]
+                if failed_dependencies:
+                    logger.warning(f"报表 {report_name} 的依赖模块执行失败: {failed_dependencies}，将使用已有数据文件")
+                logger.info(f"报表 {report_name} 的依赖已就绪，开始生成")
+                report_futures[report_name] = report_executor.submit(
+                    self.report_manager.run_report_with_output, report_name
+                )
+
+            def on_job_done(index: int, success: bool):
+                ready = []
+                with self._lock:
+                    if not success:
+                        failed_jobs.add(index)
+                    for report_name, job_indexes in pending.items():
+                        if index in job_indexes:
+                            job_indexes.discard(index)
+                            if not job_indexes:
+                                ready.append(report_name)
+                    for report_name in ready:
+                        submit_report(report_name)
+
+            # 无需等待采集的报表立即开始
+            with self._lock:
+                for report_name in report_names:
+                    if not pending[report_name]:
+                        submit_report(report_name)
+
+            def on_group_done(group: List[int], results: List[bool]):
+                for index, success in zip(group, results):
+                    on_job_done(index, bool(success))
+
+            # 同一导出模块的多个任务作为一个批次执行（见 AppRunner.group_jobs），
+            # 模块之间的输入依赖（见 AppRunner.MODULE_DEPENDENCIES）满足后才开始执行
+            groups = self.app_runner.group_jobs(jobs)
+            job_results = self.app_runner.run_job_groups(jobs, groups, max_workers, on_group_done=on_group_done)
+
+            module_results = self.app_runner.summarize(jobs, job_results)
+            report_results = {name: report_futures[name].result() for name in report_names}
+
+        self.report_manager.print_skipped_reports(processing_switches)
+        return module_results, report_results
@@ -0,0 +1,154 @@
+"""
+导出任务自适应轮询调度
+根据导出进度（schedule）估算完成时间，并按模块学习历史导出耗时
+"""
+
+import json
+import threading
+import time
+from typing import Optional, Dict, List, Tuple
+from config.settings import (
+    EXPORT_POLL_MIN_INTERVAL, EXPORT_POLL_MAX_INTERVAL, EXPORT_POLL_BACKOFF_FACTOR,
+    EXPORT_FIRST_POLL_DEFAULT, EXPORT_DURATION_EWMA_ALPHA, EXPORT_DURATION_STATS_FILE,
+    EXPORT_INITIAL_WAIT,
+)
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ExportDurationStats:
+    """按模块名称记录导出耗时（指数加权平均），持久化到缓存目录"""
+
+    def __init__(self, stats_file=EXPORT_DURATION_STATS_FILE):
+        self.stats_file = stats_file
+        self._lock = threading.Lock()
+        self._durations: Dict[str, float] = self._load()
+
+    def _load(self) -> Dict[str, float]:
+        """读取历史耗时统计"""
+        try:
+            if self.stats_file.exists():
+                with open(self.stats_file, "r", encoding="utf-8") as f:
+                    return {name: float(value) for name, value in json.load(f).items()}
+        except Exception as e:
+            logger.warning(f"读取导出耗时统计失败: {str(e)}")
+        return {}
+
+    def get_expected_duration(self, module_name: str) -> Optional[float]:
+        """获取模块的典型导出耗时（秒），无记录返回None"""
+        with self._lock:
+            return self._durations.get(module_name)
+
+    def record(self, module_name: str, duration: float):
+        """
+        记录一次导出耗时
+
+        Args:
+            module_name: 模块名称
+            duration: 提交到检测完成的耗时（秒）
+        """
+        with self._lock:
+            previous = self._durations.get(module_name)
+            if previous is None:
+                updated = duration
+            else:
+                updated = EXPORT_DURATION_EWMA_ALPHA * duration + (1 - EXPORT_DURATION_EWMA_ALPHA) * previous
+            self._durations[module_name] = round(updated, 2)
+
+            try:
+                with open(self.stats_file, "w", encoding="utf-8") as f:
+                    json.dump(self._durations, f, ensure_ascii=False, indent=2)
+            except Exception as e:
+                logger.warning(f"保存导出耗时统计失败: {str(e)}")
+
+        logger.info(f"[{module_name}] 本次导出耗时 {duration:.1f} 秒，典型耗时更新为 {updated:.1f} 秒")
+
+
+class AdaptivePollSchedule:
+    """
+    单个导出任务的轮询节奏
+
+    - 首次轮询：有历史耗时则安排在预计完成时间附近，否则使用较短的默认等待
+    - 有进度时：根据 schedule 的增长速率估算剩余时间
+    - 无进度时：按倍数退避，不超过 EXPORT_POLL_MAX_INTERVAL
+    """
+
+    def __init__(self, module_name: str, expected_duration: Optional[float] = None):
+        self.module_name = module_name
+        self.expected_duration = expected_duration
+        self.last_delay: Optional[float] = None
+        self._samples: List[Tuple[float, float]] = []  # (时间戳, 进度百分比)
+
+    def initial_delay(self) -> float:
+        """首次轮询前的等待时间（秒）"""
+        if self.expected_duration:
+            # 略早于预计完成时间，避免错过完成时刻；不超过原固定初始等待
+            delay = self.expected_duration * 0.9
+            delay = min(max(delay, EXPORT_POLL_MIN_INTERVAL), EXPORT_INITIAL_WAIT)
+        else:
+            delay = EXPORT_FIRST_POLL_DEFAULT
+        self.last_delay = delay
+        return delay
+
+    def observe(self, schedule: float, now: Optional[float] = None):
+        """
+        记录一次观测到的导出进度
+
+        Args:
+            schedule: 进度百分比（0-100）
+            now: 观测时间戳
+        """
+        if now is None:
+            now = time.time()
+        try:
+            schedule = float(schedule or 0)
+        except (TypeError, ValueError):
+            return
+
+        if self._samples and schedule < self._samples[-1][1]:
+            # 进度回退（可能匹配到了新任务），重新开始估算
+            self._samples = []
+        self._samples.append((now, schedule))
+        self._samples = self._samples[-5:]
+
+    def estimate_remaining(self) -> Optional[float]:
+        """根据进度增长速率估算剩余时间（秒），无法估算返回None"""
+        if len(self._samples) < 2:
+            return None
+
+        (first_time, first_schedule), (last_time, last_schedule) = self._samples[0], self._samples[-1]
+        elapsed = last_time - first_time
+        progressed = last_schedule - first_schedule
+        if elapsed <= 0 or progressed <= 0:
+            return None
+
+        rate = progressed / elapsed
+        return (100 - last_schedule) / rate
+
+    def next_delay(self) -> float:
+        """下一次轮询前的等待时间（秒）"""
+        remaining = self.estimate_remaining()
+        if remaining is not None:
+            delay = remaining
+        elif self.last_delay is None:
+            delay = EXPORT_POLL_MIN_INTERVAL
+        else:
+            delay = self.last_delay * EXPORT_POLL_BACKOFF_FACTOR
+
+        delay = min(max(delay, EXPORT_POLL_MIN_INTERVAL), EXPORT_POLL_MAX_INTERVAL)
+        self.last_delay = delay
+        return delay
+
+
+_duration_stats: Optional[ExportDurationStats] = None
+_duration_stats_lock = threading.Lock()
+
+
+def get_duration_stats() -> ExportDurationStats:
+    """获取进程级共享的导出耗时统计"""
+    global _duration_stats
+    with _duration_stats_lock:
+        if _duration_stats is None:
+            _duration_stats = ExportDurationStats()
+        return _duration_stats
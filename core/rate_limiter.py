@@ -0,0 +1,212 @@
+"""
+客户端限流与重试退避
+按接口分组（URL前缀）的令牌桶限流，加上带随机抖动的指数退避，
+并遵循服务端的 Retry-After 和业务限流提示，避免并发模块同时重试压垮后端
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional
+from config.api_config import RATE_LIMITS, THROTTLE_STATUS_CODES, THROTTLE_MSG_KEYWORDS
+from config.settings import RETRY_DELAY, RETRY_BACKOFF_MAX, RETRY_AFTER_MAX
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class TokenBucket:
+    """令牌桶：rate 个/秒匀速补充，最多积累 burst 个（线程安全）"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        预订一个令牌
+
+        令牌不足时余额记为负数，调用方按返回的时间等待即可，
+        同步和异步调用方都能使用（不在锁内睡眠）
+
+        Returns:
+            float: 需要等待的秒数（0 表示可以立即发送）
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+class RateLimiter:
+    """按接口分组的限流器，同时统计限流等待和重试退避耗时"""
+
+    def __init__(self, limits: Dict[str, Dict[str, Any]] = RATE_LIMITS):
+        # 前缀越长越优先匹配（如导出历史接口可单独配置比所在域名更严的限制）
+        self._groups = sorted(limits.items(), key=lambda item: len(item[0]), reverse=True)
+        self._buckets = {prefix: TokenBucket(limit["rate"], limit["burst"]) for prefix, limit in self._groups}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def get_group(self, url: str) -> Optional[str]:
+        """
+        获取URL所属的限流分组
+
+        Args:
+            url: 请求URL
+
+        Returns:
+            匹配的URL前缀，未配置限流返回None
+        """
+        for prefix, _ in self._groups:
+            if url.startswith(prefix):
+                return prefix
+        return None
+
+    def reserve(self, url: str) -> float:
+        """
+        为一次请求预订令牌
+
+        Args:
+            url: 请求URL
+
+        Returns:
+            float: 发送前需要等待的秒数
+        """
+        group = self.get_group(url)
+        if group is None:
+            return 0.0
+        delay = self._buckets[group].reserve()
+        self._record(group, "requests", 1)
+        if delay > 0:
+            self._record(group, "throttled", 1)
+            self._record(group, "throttle_wait", delay)
+        return delay
+
+    def acquire(self, url: str):
+        """预订令牌并阻塞等待（同步请求使用）"""
+        delay = self.reserve(url)
+        if delay > 0:
+            logger.debug(f"限流等待 {delay:.2f} 秒: {url}")
+            time.sleep(delay)
+
+    def record_backoff(self, url: str, delay: float):
+        """记录一次重试退避等待"""
+        group = self.get_group(url) or "其他"
+        self._record(group, "retries", 1)
+        self._record(group, "backoff_wait", delay)
+
+    def _record(self, group: str, field: str, value: float):
+        with self._lock:
+            stats = self._stats.setdefault(group, {
+                "requests": 0, "throttled": 0, "throttle_wait": 0.0, "retries": 0, "backoff_wait": 0.0,
+            })
+            stats[field] += value
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        获取各分组的限流统计
+
+        Returns:
+            Dict: 分组 -> {requests: 请求数, throttled: 被限流次数, throttle_wait: 限流等待秒数,
+                retries: 重试次数, backoff_wait: 退避等待秒数}
+        """
+        with self._lock:
+            return {group: dict(stats) for group, stats in self._stats.items()}
+
+    def log_stats(self):
+        """记录限流和退避统计"""
+        stats = self.get_stats()
+        if not stats:
+            return
+
+        logger.info("请求限流统计:")
+        for group, item in stats.items():
+            logger.info(f"  {group}: 请求 {item['requests']:.0f}，限流 {item['throttled']:.0f} 次"
+                        f"（等待 {item['throttle_wait']:.1f} 秒），"
+                        f"重试 {item['retries']:.0f} 次（退避 {item['backoff_wait']:.1f} 秒）")
+
+
+def compute_backoff(attempt: int, retry_after: Optional[float] = None) -> float:
+    """
+    计算第 attempt 次失败后的重试等待时间
+
+    服务端给出 Retry-After 时以其为准（不超过 RETRY_AFTER_MAX），
+    否则使用全抖动指数退避：在 [0, min(RETRY_BACKOFF_MAX, RETRY_DELAY * 2^(attempt-1))] 内随机，
+    避免多个并发请求在同一时刻重试
+
+    Args:
+        attempt: 已失败的次数（从1开始）
+        retry_after: 服务端要求的等待秒数
+
+    Returns:
+        float: 等待秒数
+    """
+    if retry_after is not None:
+        return min(max(retry_after, 0.0), RETRY_AFTER_MAX)
+    ceiling = min(RETRY_BACKOFF_MAX, RETRY_DELAY * (2 ** (attempt - 1)))
+    return random.uniform(0, ceiling)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    解析 Retry-After 响应头（秒数或HTTP日期）
+
+    Args:
+        value: 响应头的值
+
+    Returns:
+        等待秒数，无法解析返回None
+    """
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return parsedate_to_datetime(value).timestamp() - time.time()
+    except (TypeError, ValueError):
+        return None
+
+
+def is_throttle_status(status_code: int) -> bool:
+    """HTTP状态码是否为限流/过载（应退避后重试）"""
+    return status_code in THROTTLE_STATUS_CODES
+
+
+def is_throttle_result(result: Any) -> bool:
+    """
+    业务响应是否为限流提示（HTTP 200 但业务码非0，且提示信息包含限流关键字）
+
+    Args:
+        result: 响应JSON
+
+    Returns:
+        bool: 是限流提示返回True
+    """
+    if not isinstance(result, dict) or result.get("code") == 0:
+        return False
+    msg = str(result.get("msg") or "").lower()
+    return any(keyword.lower() in msg for keyword in THROTTLE_MSG_KEYWORDS)
+
+
+_rate_limiter: Optional[RateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """获取进程级共享的限流器"""
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter()
+        return _rate_limiter
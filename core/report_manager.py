@@ -117,6 +117,39 @@ class ReportManager:
         
         return results
     
+    def get_enabled_reports(self, processing_switches: Dict[str, bool]) -> List[str]:
+        """
+        获取启用且存在的报表名称（按配置顺序）
+        
+        Args:
+            processing_switches: 报表开关配置字典
+            
+        Returns:
+            报表名称列表
+        """
+        return [name for name, enabled in processing_switches.items() if enabled and name in self.available_reports]
+    
+    def run_report_with_output(self, report_name: str) -> Optional[Path]:
+        """
+        运行指定报表并打印执行结果
+        
+        Args:
+            report_name: 报表名称
+            
+        Returns:
+            生成的报表文件路径，失败返回None
+        """
+        print(f">> 运行报表: {report_name}")
+        result = self.run_report(report_name)
+        
+        if result:
+            print(f"[成功] {report_name} 完成")
+        else:
+            print(f"[失败] {report_name} 失败")
+        print()
+        
+        return result
+    
     def run_enabled_reports(self, processing_switches: Dict[str, bool]) -> Dict[str, Optional[Path]]:
         """
         运行启用的报表
@@ -128,7 +161,7 @@ class ReportManager:
             报表名称到结果文件路径的字典
         """
         results = {}
-        enabled_reports = [name for name, enabled in processing_switches.items() if enabled and name in self.available_reports]
+        enabled_reports = self.get_enabled_reports(processing_switches)
         
         if not enabled_reports:
             logger.warning("没有启用任何报表")
@@ -138,23 +171,18 @@ class ReportManager:
         logger.info(f"开始运行启用的报表，共 {len(enabled_reports)} 个")
         
         for report_name in enabled_reports:
-            print(f">> 运行报表: {report_name}")
-            result = self.run_report(report_name)
-            results[report_name] = result
-            
-            if result:
-                print(f"[成功] {report_name} 完成")
-            else:
-                print(f"[失败] {report_name} 失败")
-            print()
+            results[report_name] = self.run_report_with_output(report_name)
+        
+        self.print_skipped_reports(processing_switches)
         
-        # 显示被跳过的报表
+        return results
+    
+    def print_skipped_reports(self, processing_switches: Dict[str, bool]):
+        """显示被禁用的报表"""
         skipped_reports = [name for name, enabled in processing_switches.items() if not enabled and name in self.available_reports]
         if skipped_reports:
             print(f"[跳过] 以下报表被禁用: {', '.join(skipped_reports)}")
             print()
-        
-        return results
     
     def check_dependencies(self, report_name: str, available_modules: List[str]) -> bool:
         """
@@ -5,8 +5,13 @@ HTTP请求处理器
 import requests
 import time
 from typing import Dict, Any, Optional
-from config.headers_config import HEADERS
-from config.settings import REQUEST_TIMEOUT, MAX_RETRIES, RETRY_DELAY
+from core.http_transport import get_transport
+from core.circuit_breaker import get_circuit_breakers
+from core.columnar_json import loads_json
+from core.rate_limiter import (
+    get_rate_limiter, compute_backoff, parse_retry_after, is_throttle_status, is_throttle_result,
+)
+from config.settings import REQUEST_TIMEOUT, MAX_RETRIES
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -16,8 +21,30 @@ class RequestHandler:
     """封装HTTP请求逻辑"""
     
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update(HEADERS)
+        self.rate_limiter = get_rate_limiter()
+        self.circuit_breakers = get_circuit_breakers()
+    
+    @property
+    def session(self):
+        """当前线程的 Session（共用进程级连接池，避免每个处理器各自建立连接）"""
+        return get_transport().session
+    
+    def _backoff(self, url: str, attempt: int, retry_after: Optional[float] = None):
+        """
+        重试前退避等待（最后一次尝试后不等待）
+        
+        Args:
+            url: 请求URL
+            attempt: 已失败的次数
+            retry_after: 服务端要求的等待秒数
+        """
+        if attempt >= MAX_RETRIES or self.circuit_breakers.is_open(url):
+            # 已熔断时下一次尝试会直接失败，无需等待
+            return
+        delay = compute_backoff(attempt, retry_after)
+        self.rate_limiter.record_backoff(url, delay)
+        logger.info(f"{delay:.1f} 秒后重试: {url}")
+        time.sleep(delay)
     
     def post(self, url: str, json_data: Dict[str, Any], 
              timeout: int = REQUEST_TIMEOUT) -> Optional[Dict[str, Any]]:
@@ -33,40 +60,59 @@ class RequestHandler:
             响应JSON数据，失败返回None
         """
         for attempt in range(1, MAX_RETRIES + 1):
+            response = None
             try:
+                if not self.circuit_breakers.allow_request(url):
+                    logger.error(f"后端熔断中，快速失败: {url}")
+                    return None
+                self.rate_limiter.acquire(url)
                 logger.info(f"发送POST请求: {url} (尝试 {attempt}/{MAX_RETRIES})")
                 response = self.session.post(url, json=json_data, timeout=timeout)
+                self.circuit_breakers.record_response(url, response.status_code)
+                if is_throttle_status(response.status_code):
+                    logger.warning(f"服务端限流或过载: HTTP {response.status_code} (尝试 {attempt}/{MAX_RETRIES})")
+                    self._backoff(url, attempt, parse_retry_after(response.headers.get("Retry-After")))
+                    continue
                 response.raise_for_status()
                 
-                result = response.json()
+                result = loads_json(response.content)
                 
                 # 检查业务状态码
                 if result.get("code") == 0:
                     logger.info(f"请求成功: {url}")
                     return result
+                elif is_throttle_result(result) and attempt < MAX_RETRIES:
+                    logger.warning(f"业务限流: {result.get('msg')} (尝试 {attempt}/{MAX_RETRIES})")
+                    self._backoff(url, attempt)
                 else:
                     logger.error(f"业务错误: {result.get('msg', '未知错误')}")
                     return result
                     
             except requests.exceptions.Timeout:
                 logger.warning(f"请求超时 (尝试 {attempt}/{MAX_RETRIES})")
-                if attempt < MAX_RETRIES:
-                    time.sleep(RETRY_DELAY)
+                self.circuit_breakers.record_failure(url)
+                self._backoff(url, attempt)
                     
             except requests.exceptions.RequestException as e:
                 logger.error(f"请求异常: {str(e)} (尝试 {attempt}/{MAX_RETRIES})")
-                if attempt < MAX_RETRIES:
-                    time.sleep(RETRY_DELAY)
+                if e.response is None:
+                    # 连接失败等未收到响应的异常（HTTP错误状态已在收到响应时记录）
+                    self.circuit_breakers.record_failure(url)
+                self._backoff(url, attempt)
                     
             except Exception as e:
                 logger.error(f"未知错误: {str(e)}")
+                if response is None:
+                    # 未收到响应也未记录结果，释放可能占用的探测名额
+                    self.circuit_breakers.release_probe(url)
                 break
         
         logger.error(f"请求失败，已达最大重试次数: {url}")
         return None
     
     def get(self, url: str, params: Optional[Dict[str, Any]] = None,
-            timeout: int = REQUEST_TIMEOUT) -> Optional[requests.Response]:
+            timeout: int = REQUEST_TIMEOUT,
+            headers: Optional[Dict[str, str]] = None) -> Optional[requests.Response]:
         """
         发送GET请求（用于文件下载）
         
@@ -74,30 +120,47 @@ class RequestHandler:
             url: 请求URL
             params: 查询参数
             timeout: 超时时间
+            headers: 额外请求头（如断点续传的 Range）
             
         Returns:
             响应对象，失败返回None
         """
         for attempt in range(1, MAX_RETRIES + 1):
+            response = None
             try:
+                if not self.circuit_breakers.allow_request(url):
+                    logger.error(f"后端熔断中，快速失败: {url}")
+                    return None
+                self.rate_limiter.acquire(url)
                 logger.info(f"发送GET请求: {url} (尝试 {attempt}/{MAX_RETRIES})")
-                response = self.session.get(url, params=params, timeout=timeout, stream=True)
+                response = self.session.get(url, params=params, headers=headers, timeout=timeout, stream=True)
+                self.circuit_breakers.record_response(url, response.status_code)
+                if is_throttle_status(response.status_code):
+                    logger.warning(f"服务端限流或过载: HTTP {response.status_code} (尝试 {attempt}/{MAX_RETRIES})")
+                    response.close()
+                    self._backoff(url, attempt, parse_retry_after(response.headers.get("Retry-After")))
+                    continue
                 response.raise_for_status()
                 logger.info(f"GET请求成功: {url}")
                 return response
                 
             except requests.exceptions.Timeout:
                 logger.warning(f"请求超时 (尝试 {attempt}/{MAX_RETRIES})")
-                if attempt < MAX_RETRIES:
-                    time.sleep(RETRY_DELAY)
+                self.circuit_breakers.record_failure(url)
+                self._backoff(url, attempt)
                     
             except requests.exceptions.RequestException as e:
                 logger.error(f"请求异常: {str(e)} (尝试 {attempt}/{MAX_RETRIES})")
-                if attempt < MAX_RETRIES:
-                    time.sleep(RETRY_DELAY)
+                if e.response is None:
+                    # 连接失败等未收到响应的异常（HTTP错误状态已在收到响应时记录）
+                    self.circuit_breakers.record_failure(url)
+                self._backoff(url, attempt)
                     
             except Exception as e:
                 logger.error(f"未知错误: {str(e)}")
+                if response is None:
+                    # 未收到响应也未记录结果，释放可能占用的探测名额
+                    self.circuit_breakers.release_probe(url)
                 break
         
         logger.error(f"GET请求失败，已达最大重试次数: {url}")
@@ -2,8 +2,14 @@
 自动化数据报表脚本 - 主程序入口
 """
 
+import asyncio
 from core.app_runner import AppRunner
 from core.report_manager import get_report_manager
+from core.pipeline_scheduler import PipelineScheduler
+from core.http_transport import get_transport
+from core.rate_limiter import get_rate_limiter
+from utils.frame_cache import get_frame_cache
+from config.settings import ASYNC_PIPELINE_ENABLED, MODULE_CONCURRENCY_ENABLED, PIPELINE_ENABLED
 
 # ==================== 数据采集模块 ====================
 MODULE_SWITCHES = {
@@ -51,6 +57,26 @@ PROCESSING_SWITCHES = {
 }
 
 
+def print_report_summary(report_results):
+    """打印报表生成总结"""
+    print("=" * 60)
+    print(">>> 报表生成总结 <<<")
+    print("=" * 60)
+    success_reports = [name for name, result in report_results.items() if result]
+    failed_reports = [name for name, result in report_results.items() if not result]
+    
+    print(f"总报表数: {len(report_results)}")
+    print(f"成功报表数: {len(success_reports)}")
+    print(f"失败报表数: {len(failed_reports)}")
+    
+    if success_reports:
+        print(f"成功报表: {', '.join(success_reports)}")
+    if failed_reports:
+        print(f"失败报表: {', '.join(failed_reports)}")
+    
+    print("=" * 60)
+
+
 def main():
     """主程序入口"""
     print("=" * 60)
@@ -58,7 +84,28 @@ def main():
     print("=" * 60)
     
     app_runner = AppRunner()
-    results = app_runner.execute_modules(MODULE_SWITCHES, MODULE_PARAMS)
+    
+    if ENABLE_PROCESSING and PIPELINE_ENABLED and MODULE_CONCURRENCY_ENABLED and not ASYNC_PIPELINE_ENABLED:
+        # 流水线模式：报表依赖的模块完成后立即生成报表，其他模块继续并行采集
+        report_manager = get_report_manager()
+        report_manager.print_reports_info()
+        
+        scheduler = PipelineScheduler(app_runner, report_manager)
+        results, report_results = scheduler.run(MODULE_SWITCHES, MODULE_PARAMS, PROCESSING_SWITCHES)
+        
+        app_runner.print_summary(results)
+        print()
+        print_report_summary(report_results)
+        get_transport().log_stats()
+        get_rate_limiter().log_stats()
+        get_frame_cache().log_stats()
+        return
+    
+    if ASYNC_PIPELINE_ENABLED:
+        # 异步流水线：单事件循环 + 共享连接池（需要 aiohttp）
+        results = asyncio.run(app_runner.execute_modules_async(MODULE_SWITCHES, MODULE_PARAMS))
+    else:
+        results = app_runner.execute_modules(MODULE_SWITCHES, MODULE_PARAMS)
     app_runner.print_summary(results)
     
     if ENABLE_PROCESSING:
@@ -71,22 +118,11 @@ def main():
         report_manager.print_reports_info()
         report_results = report_manager.run_enabled_reports(PROCESSING_SWITCHES)
         
-        print("=" * 60)
-        print(">>> 报表生成总结 <<<")
-        print("=" * 60)
-        success_reports = [name for name, result in report_results.items() if result]
-        failed_reports = [name for name, result in report_results.items() if not result]
-        
-        print(f"总报表数: {len(report_results)}")
-        print(f"成功报表数: {len(success_reports)}")
-        print(f"失败报表数: {len(failed_reports)}")
-        
-        if success_reports:
-            print(f"成功报表: {', '.join(success_reports)}")
-        if failed_reports:
-            print(f"失败报表: {', '.join(failed_reports)}")
-        
-        print("=" * 60)
+        print_report_summary(report_results)
+    
+    get_transport().log_stats()
+    get_rate_limiter().log_stats()
+    get_frame_cache().log_stats()
 
 
 if __name__ == "__main__":
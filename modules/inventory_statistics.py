@@ -1,23 +1,32 @@
 """
 库存统计模块
 与库存查询模块不同，用于统计分析
-支持多仓库循环采集
+支持多仓库并行采集
 """
 
+import pandas as pd
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, List
 from core.base_module import BaseModule
+from core.export_cache import get_export_cache
 from core.export_handler import ExportHandler
+from core.export_poller import iter_completed
 from core.download_handler import DownloadHandler
 from config.api_config import EXPORT_ENDPOINTS
 from config.params_config import INVENTORY_STATISTICS_WAREHOUSES, INVENTORY_STATISTICS_BASE_PARAMS
+from config.settings import DOWNLOADS_DIR, INVENTORY_STATISTICS_CONSOLIDATE
+from utils.file_utils import generate_timestamped_filename, cleanup_module_files
 from utils.logger import get_logger
+from utils.xlsx_reader import read_xlsx
 
 logger = get_logger(__name__)
 
+# 合并多仓库文件时标记来源仓库的列（导出本身已有"仓库"列，使用单独的列名避免冲突）
+SOURCE_WAREHOUSE_COLUMN = "采集仓库"
+
 
 class InventoryStatisticsModule(BaseModule):
-    """库存统计数据采集模块 - 支持多仓库循环采集"""
+    """库存统计数据采集模块 - 支持多仓库并行采集"""
     
     def __init__(self):
         super().__init__()
@@ -30,17 +39,24 @@ class InventoryStatisticsModule(BaseModule):
     
     def execute(self, **kwargs) -> Optional[Path]:
         """
-        执行多仓库循环采集
+        执行多仓库并行采集
+        
+        所有仓库的导出任务先依次提交，再由共享轮询器统一等待完成，
+        哪个仓库先完成就先下载，总耗时接近最慢的单个仓库
         
         Args:
             **kwargs: 可选参数
                 - warehouses: 自定义仓库列表（覆盖默认配置）
+                - consolidate: 是否将各仓库文件合并为一个汇总文件（默认读取 INVENTORY_STATISTICS_CONSOLIDATE）
+                - force_refresh: 是否跳过导出结果缓存，强制重新导出
         
         Returns:
-            最后一个成功下载的文件路径，全部失败返回None
+            合并模式返回汇总文件路径；否则返回最后一个成功下载的文件路径；全部失败返回None
         """
         # 获取仓库列表
         warehouses = kwargs.get('warehouses', self.warehouses)
+        consolidate = kwargs.get('consolidate', INVENTORY_STATISTICS_CONSOLIDATE)
+        force_refresh = kwargs.get('force_refresh', False)
         
         if not warehouses:
             logger.error("仓库列表为空，无法执行采集")
@@ -48,17 +64,15 @@ class InventoryStatisticsModule(BaseModule):
         
         logger.info(f"开始库存统计多仓库采集，共 {len(warehouses)} 个仓库")
         
-        success_count = 0
-        failed_count = 0
-        last_success_file = None
-        
-        # 循环处理每个仓库
+        # 1. 依次提交所有仓库的导出任务（提交很快，等待阶段并行）
+        warehouse_futures = {}
+        results: Dict[str, Optional[Path]] = {}
         for index, warehouse in enumerate(warehouses, 1):
             warehouse_name = warehouse.get('name', f'仓库{index}')
             store_id = warehouse.get('store_id')
             storehouse_id = warehouse.get('storehouse_id')
             
-            logger.info(f"[{index}/{len(warehouses)}] 开始采集: {warehouse_name}")
+            logger.info(f"[{index}/{len(warehouses)}] 提交导出: {warehouse_name}")
             logger.info(f"  门店ID: {store_id}, 仓库ID: {storehouse_id}")
             
             # 构建导出参数
@@ -66,66 +80,127 @@ class InventoryStatisticsModule(BaseModule):
             export_params['store_ids'] = [store_id]
             export_params['storehouse_ids'] = [storehouse_id]
             
-            # 执行单个仓库的导出下载
-            file_path = self._export_single_warehouse(
-                warehouse_name=warehouse_name,
-                export_params=export_params
-            )
+            results[warehouse_name] = None
+            
+            # 相同导出在有效期内已完成时直接复用
+            if not force_refresh:
+                cached_file = get_export_cache().get(self.export_url, export_params, self.module_display_name)
+                if cached_file:
+                    results[warehouse_name] = cached_file
+                    continue
+            
+            try:
+                future = self.export_handler.start_export(
+                    export_url=self.export_url,
+                    export_params=export_params,
+                    module_name=self.module_display_name
+                )
+            except Exception as e:
+                logger.error(f"[{warehouse_name}] 提交导出异常: {str(e)}")
+                future = None
+            
+            if future is None:
+                logger.error(f"❌ [{warehouse_name}] 导出任务提交失败")
+                continue
+            warehouse_futures[future] = (warehouse_name, export_params)
+        
+        # 2. 按完成先后下载各仓库文件
+        for future in iter_completed(warehouse_futures):
+            warehouse_name, export_params = warehouse_futures[future]
+            download_url = future.result()
+            file_path = self._download_warehouse(warehouse_name, download_url)
+            results[warehouse_name] = file_path
             
             if file_path:
+                get_export_cache().put(self.export_url, export_params, self.module_display_name,
+                                       download_url, file_path)
                 logger.info(f"✅ [{warehouse_name}] 采集成功: {file_path}")
-                success_count += 1
-                last_success_file = file_path
             else:
                 logger.error(f"❌ [{warehouse_name}] 采集失败")
-                failed_count += 1
-            
-            print()  # 空行分隔
         
-        # 打印总结
+        # 3. 打印各仓库结果（按配置顺序）
+        success_files = [path for path in results.values() if path]
         logger.info("=" * 60)
-        logger.info(f"库存统计采集完成: 成功 {success_count}/{len(warehouses)}, 失败 {failed_count}")
+        for warehouse_name, file_path in results.items():
+            logger.info(f"  {'[成功]' if file_path else '[失败]'} {warehouse_name}")
+        logger.info(f"库存统计采集完成: 成功 {len(success_files)}/{len(warehouses)}, "
+                    f"失败 {len(warehouses) - len(success_files)}")
         logger.info("=" * 60)
         
-        return last_success_file
+        if not success_files:
+            return None
+        
+        if consolidate:
+            consolidated_file = self._consolidate_files(results)
+            if consolidated_file:
+                return consolidated_file
+        
+        return success_files[-1]
     
-    def _export_single_warehouse(self, warehouse_name: str, export_params: Dict[str, Any]) -> Optional[Path]:
+    def _download_warehouse(self, warehouse_name: str, download_url: Optional[str]) -> Optional[Path]:
         """
-        执行单个仓库的导出和下载
+        下载单个仓库的导出文件
         
         Args:
             warehouse_name: 仓库名称
-            export_params: 导出参数
+            download_url: 导出任务返回的下载URL
         
         Returns:
             下载的文件路径，失败返回None
         """
         try:
-            # 1. 提交导出任务并获取下载URL
-            download_url = self.export_handler.export_and_get_url(
-                export_url=self.export_url,
-                export_params=export_params,
-                module_name=self.module_display_name
-            )
-            
             if not download_url:
                 logger.error(f"[{warehouse_name}] 导出任务失败，未获取到下载URL")
                 return None
             
             logger.info(f"[{warehouse_name}] 获取到下载URL: {download_url}")
             
-            # 2. 下载文件（使用仓库名称作为文件名前缀）
-            file_name_prefix = f"库存库位明细_{warehouse_name}"
-            file_path = self.download_handler.download_from_export(
+            # 下载文件（使用仓库名称作为文件名前缀）
+            file_name_prefix = f"{self.module_display_name}_{warehouse_name}"
+            return self.download_handler.download_from_export(
                 download_url=download_url,
                 module_name=self.module_display_name,
                 file_name_prefix=file_name_prefix,
             )
             
-            return file_path
+        except Exception as e:
+            logger.error(f"[{warehouse_name}] 下载异常: {str(e)}")
+            return None
+    
+    def _consolidate_files(self, results: Dict[str, Optional[Path]]) -> Optional[Path]:
+        """
+        将各仓库文件合并为一个汇总文件，并增加 SOURCE_WAREHOUSE_COLUMN 列区分来源（导出中原有的列保持不变）
+        
+        Args:
+            results: 仓库名称 -> 下载文件路径
+        
+        Returns:
+            汇总文件路径，失败返回None
+        """
+        try:
+            frames = []
+            for warehouse_name, file_path in results.items():
+                if not file_path:
+                    continue
+                df = read_xlsx(file_path)
+                if SOURCE_WAREHOUSE_COLUMN in df.columns:
+                    df = df.drop(columns=SOURCE_WAREHOUSE_COLUMN)
+                df.insert(0, SOURCE_WAREHOUSE_COLUMN, warehouse_name)
+                frames.append(df)
+            
+            consolidated_df = pd.concat(frames, ignore_index=True)
+            
+            file_name_prefix = f"{self.module_display_name}_汇总"
+            cleanup_module_files(DOWNLOADS_DIR, file_name_prefix, keep_latest=0)
+            save_path = DOWNLOADS_DIR / generate_timestamped_filename(file_name_prefix)
+            consolidated_df.to_excel(save_path, index=False)
+            
+            logger.info(f"合并 {len(frames)} 个仓库文件: {save_path} ({len(consolidated_df)} 行)")
+            print(f"[完成] 多仓库汇总文件: {save_path.name} ({len(consolidated_df)} 行)")
+            return save_path
             
         except Exception as e:
-            logger.error(f"[{warehouse_name}] 采集异常: {str(e)}")
+            logger.error(f"合并仓库文件失败: {str(e)}")
             return None
 
 
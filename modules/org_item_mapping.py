@@ -1,19 +1,25 @@
 """
 组织档案映射清单模块
 通过分页API采集商品基础信息（code, item_id, name）
+支持增量同步：本地保存快照，只查询上次同步以来更新过的商品并合并
 """
 
+import json
 import pandas as pd
 from pathlib import Path
-from typing import Optional, Any
-from datetime import datetime
+from typing import Optional, Any, Dict
+from datetime import datetime, timedelta
 
 from core.base_module import ApiBasedModule
+from core.columnar_json import columns_to_frame
 from config.api_config import API_ENDPOINTS
 from config.params_config import ORG_ITEM_MAPPING_QUERY_PARAMS
 from utils.logger import get_logger
-from utils.file_utils import cleanup_module_files
-from config.settings import DOWNLOADS_DIR
+from utils.file_utils import cleanup_module_files, find_latest_file
+from config.settings import (
+    DOWNLOADS_DIR, ORG_ITEM_MAPPING_DELTA_SYNC_ENABLED,
+    ORG_ITEM_MAPPING_SNAPSHOT_FILE, ORG_ITEM_MAPPING_FULL_SYNC_DAYS,
+)
 
 logger = get_logger(__name__)
 
@@ -21,85 +27,147 @@ logger = get_logger(__name__)
 class OrgItemMappingModule(ApiBasedModule):
     """组织档案映射清单数据采集模块"""
 
+    # 采集的字段及其类型（分页数据按列投影后直接构建 DataFrame）
+    FIELDS = ["code", "item_id", "name"]
+    FIELD_DTYPES = {"code": "string", "name": "string"}
+
     def __init__(self) -> None:
         super().__init__()
         self.api_url = API_ENDPOINTS["org_item_mapping"]
         self.module_display_name = "组织档案映射清单"
+        self.snapshot_file = ORG_ITEM_MAPPING_SNAPSHOT_FILE
+        # 本次采集得到、待保存成功后再落盘的快照；变动条数（全量同步为None）
+        self._pending_snapshot: Optional[Dict[str, Any]] = None
+        self._changed_count: Optional[int] = None
+
+    def _load_snapshot(self) -> Optional[Dict[str, Any]]:
+        """
+        读取本地快照
+        
+        Returns:
+            {"watermark": 上次同步日期, "full_synced_at": 上次全量同步时间, "columns": {字段: 值数组}}，
+            不存在或损坏返回None
+        """
+        try:
+            if self.snapshot_file.exists():
+                with open(self.snapshot_file, "r", encoding="utf-8") as f:
+                    snapshot = json.load(f)
+                if snapshot.get("watermark") and isinstance(snapshot.get("columns"), dict):
+                    return snapshot
+        except Exception as e:
+            logger.warning(f"读取{self.module_display_name}快照失败，将全量同步: {str(e)}")
+        return None
+
+    def _save_snapshot(self, snapshot: Dict[str, Any]):
+        """保存本地快照（先写临时文件再替换，避免中断时损坏）"""
+        temp_file = self.snapshot_file.with_suffix(".tmp")
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+        temp_file.replace(self.snapshot_file)
+
+    def _needs_full_sync(self, snapshot: Optional[Dict[str, Any]], full_sync: bool) -> bool:
+        """
+        判断本次是否需要全量同步
+        
+        Args:
+            snapshot: 本地快照
+            full_sync: 调用方是否要求全量
+            
+        Returns:
+            bool: 需要全量同步返回True
+        """
+        if full_sync or not ORG_ITEM_MAPPING_DELTA_SYNC_ENABLED or snapshot is None:
+            return True
+        if find_latest_file(DOWNLOADS_DIR, f"{self.module_display_name}_*.xlsx") is None:
+            return True
+        
+        full_synced_at = datetime.strptime(snapshot["full_synced_at"], "%Y-%m-%d %H:%M:%S")
+        if datetime.now() - full_synced_at >= timedelta(days=ORG_ITEM_MAPPING_FULL_SYNC_DAYS):
+            logger.info(f"距上次全量同步已超过 {ORG_ITEM_MAPPING_FULL_SYNC_DAYS} 天，本次全量同步")
+            return True
+        return False
+
+    @staticmethod
+    def _frame_to_columns(df: pd.DataFrame) -> Dict[str, list]:
+        """DataFrame 转为可写入JSON的按列数组（空值为None）"""
+        return {column: df[column].astype(object).where(df[column].notna(), None).tolist()
+                for column in df.columns}
 
-    def fetch_data(self, **kwargs) -> Optional[list]:
+    def fetch_data(self, **kwargs) -> Optional[pd.DataFrame]:
         """
-        分页获取所有商品数据
+        获取商品数据：有可用快照时只查询上次同步以来更新过的商品并合并，否则分页全量获取
+        
+        Args:
+            **kwargs: 可选参数
+                - full_sync: 是否忽略快照强制全量同步
         
         Returns:
-            Optional[list]: 商品数据列表
+            Optional[pd.DataFrame]: 合并后的全部商品数据（code, item_id, name）
         """
         logger.info(f"开始采集{self.module_display_name}数据")
         
-        # 使用配置文件中的请求参数
+        # 水位取本次查询开始的日期：查询期间更新的商品下次仍会被查到（重复合并无影响）
+        sync_started_at = datetime.now()
+        snapshot = self._load_snapshot()
+        full_sync = self._needs_full_sync(snapshot, kwargs.get('full_sync', False))
+        
+        # 使用配置文件中的请求参数（orders 固定按 code 排序，保证分页稳定）
         base_params = ORG_ITEM_MAPPING_QUERY_PARAMS.copy()
+        if not full_sync:
+            base_params["update_date"] = [snapshot["watermark"], sync_started_at.strftime("%Y-%m-%d")]
+            logger.info(f"增量同步: 查询 {snapshot['watermark']} 以来更新的商品"
+                        f"（快照 {len(snapshot['columns']['code'])} 条）")
         
-        all_items = []
-        page_number = 0
-        total_pages = None
+        # 每页只保留需要的字段，按列存放
+        columns = self.fetch_all_columns(self.api_url, base_params, self.FIELDS, key_field="code")
+        if columns is None:
+            return None
         
-        while True:
-            # 更新页码
-            base_params["page_number"] = page_number
-            
-            logger.info(f"正在获取第 {page_number + 1} 页数据...")
-            
-            # 发送请求
-            response = self.request_handler.post(
-                url=self.api_url,
-                json_data=base_params
-            )
-            
-            if not response or response.get("code") != 0:
-                logger.error(f"获取第 {page_number + 1} 页失败")
-                break
-            
-            # 解析数据
-            data = response.get("data", {})
-            content = data.get("content", [])
-            
-            if total_pages is None:
-                total_pages = data.get("total_pages", 0)
-                total_elements = data.get("total_elements", 0)
-                logger.info(f"总页数: {total_pages}, 总记录数: {total_elements}")
-            
-            # 提取关键字段
-            for item in content:
-                all_items.append({
-                    "code": item.get("code"),
-                    "item_id": item.get("item_id"),
-                    "name": item.get("name")
-                })
-            
-            logger.info(f"第 {page_number + 1} 页完成，获取 {len(content)} 条数据")
-            
-            # 判断是否最后一页
-            if data.get("last", True):
-                logger.info("已到达最后一页")
-                break
-            
-            page_number += 1
+        updates = columns_to_frame(columns, self.FIELD_DTYPES)
+        updates = updates[updates["code"].notna()]
+        if full_sync:
+            df = updates.reset_index(drop=True)
+            full_synced_at = sync_started_at.strftime("%Y-%m-%d %H:%M:%S")
+            self._changed_count = None
+        else:
+            previous = columns_to_frame(snapshot["columns"], self.FIELD_DTYPES)
+            # 与快照完全相同的行不算变动
+            unchanged = len(updates.merge(previous, on=self.FIELDS, how="inner"))
+            self._changed_count = len(updates) - unchanged
+            df = pd.concat([previous[~previous["code"].isin(updates["code"])], updates], ignore_index=True)
+            full_synced_at = snapshot["full_synced_at"]
+            logger.info(f"增量获取 {len(updates)} 条，其中新增或变动 {self._changed_count} 条")
+        
+        self._pending_snapshot = {
+            "watermark": sync_started_at.strftime("%Y-%m-%d"),
+            "full_synced_at": full_synced_at,
+            "columns": self._frame_to_columns(df),
+        }
         
-        logger.info(f"总共采集 {len(all_items)} 条数据")
-        return all_items if all_items else None
+        logger.info(f"总共 {len(df)} 条数据")
+        return df if not df.empty else None
 
     def save_data(self, data: Any) -> Optional[Path]:
         """
         保存数据到Excel文件
         
         Args:
-            data: 商品数据列表
+            data: 商品数据（DataFrame 或记录列表）
             
         Returns:
             Optional[Path]: 保存的文件路径
         """
         try:
+            # 增量同步没有任何变动时沿用已有文件，只推进同步水位
+            if self._changed_count == 0:
+                existing = find_latest_file(DOWNLOADS_DIR, f"{self.module_display_name}_*.xlsx")
+                if existing:
+                    self._commit_snapshot()
+                    logger.info(f"商品档案无变动，沿用已有文件: {existing}")
+                    return existing
+            
             # 转换为DataFrame
-            df = pd.DataFrame(data)
+            df = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
             
             # 🔧 关键修复：去重处理（双重保障）
             original_count = len(df)
@@ -131,12 +199,23 @@ class OrgItemMappingModule(ApiBasedModule):
             logger.info(f"文件大小: {filepath.stat().st_size / 1024:.2f} KB")
             logger.info(f"数据行数: {len(df)}")
             
+            self._commit_snapshot()
             return filepath
             
         except Exception as e:
             logger.error(f"保存数据失败: {str(e)}")
             return None
 
+    def _commit_snapshot(self):
+        """文件保存成功后再落盘快照（推进水位），保存失败时下次仍从旧水位同步"""
+        if self._pending_snapshot is None:
+            return
+        try:
+            self._save_snapshot(self._pending_snapshot)
+        except Exception as e:
+            logger.warning(f"保存{self.module_display_name}快照失败，下次将重新同步: {str(e)}")
+        self._pending_snapshot = None
+
     def execute(self, **kwargs) -> Optional[Path]:
         """执行数据采集任务"""
         return super().execute(**kwargs)
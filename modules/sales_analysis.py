@@ -3,15 +3,27 @@
 用于查询和采集商品销售分析数据，支持多种参数模板
 """
 
+import asyncio
 import requests
 import json
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
+import pandas as pd
 from core.base_module import ExportBasedModule
+from core.partition_store import get_partition_store
+from utils.file_utils import generate_timestamped_filename, cleanup_module_files, get_module_files
 from utils.logger import get_logger
+from utils.xlsx_reader import read_xlsx
 from config.api_config import EXPORT_ENDPOINTS
-from config.params_config import get_sales_analysis_params
+from config.params_config import (
+    get_sales_analysis_params, is_sales_params_partitionable, SALES_ANALYSIS_PARTITION_TEMPLATES,
+    SALES_ANALYSIS_PARTITION_MEASURE_COLUMNS, SALES_ANALYSIS_PARTITION_NUMERIC_KEY_COLUMNS,
+)
+from config.settings import (
+    DOWNLOADS_DIR, SALES_PARTITION_ENABLED, SALES_PARTITION_REFRESH_DAYS, SALES_PARTITION_MAX_MISSING_DAYS,
+    SALES_PARTITION_BACKFILL_DAYS,
+)
 
 logger = get_logger(__name__)
 
@@ -25,6 +37,9 @@ TEMPLATE_FILE_LABELS = {
     "store_adjustment_frozen": "调改店-冷冻",
 }
 
+# 规划分区前检查导出列时读取的行数
+PARTITION_SAMPLE_ROWS = 100
+
 
 class SalesAnalysisModule(ExportBasedModule):
     """商品销售分析数据采集模块（支持灵活参数配置）"""
@@ -101,6 +116,273 @@ class SalesAnalysisModule(ExportBasedModule):
             'file_name_prefix': file_name_prefix,
         }
 
+    def execute(self, **kwargs) -> Optional[Path]:
+        """执行导出任务（可按天分区的模板只导出缺失的日期）"""
+        return self.execute_batch([kwargs])[0]
+    
+    async def execute_async(self, **kwargs) -> Optional[Path]:
+        """异步执行：不按天分区时走异步导出流程；分区采集流程为同步批量流程，在线程中运行"""
+        if not self._may_use_partitions(kwargs):
+            return await super().execute_async(**kwargs)
+        return await asyncio.to_thread(self.execute, **kwargs)
+    
+    @staticmethod
+    def _may_use_partitions(kwargs: Dict[str, Any]) -> bool:
+        """导出参数是否可能按天分区采集（最终是否分区由 _plan_partitions 决定）"""
+        if not SALES_PARTITION_ENABLED or kwargs.get('custom_params'):
+            return False
+        return kwargs.get('template_name', 'dairy_cold_drinks') in SALES_ANALYSIS_PARTITION_TEMPLATES
+    
+    def execute_batch(self, kwargs_list: List[Dict[str, Any]]) -> List[Optional[Path]]:
+        """
+        批量执行导出任务，可按天分区的模板改为增量采集
+        
+        可分区模板的日期范围拆成逐日分区：已保存的日期直接复用，只导出缺失（及最近几天）的日期，
+        所有导出（整段导出和逐日导出）一起提交、统一等待，最后由分区汇总出请求的日期范围；
+        汇总失败时该导出记为失败（缺失的分区下次运行时重新导出），不再追加整段导出
+        
+        Args:
+            kwargs_list: 每个导出任务的模块参数列表
+            
+        Returns:
+            List[Optional[Path]]: 与 kwargs_list 顺序一致的文件路径，失败为None
+        """
+        configs: List[Optional[Dict[str, Any]]] = []
+        force_refresh_flags: List[bool] = []
+        plans: Dict[int, Dict[str, Any]] = {}
+        day_configs: List[Dict[str, Any]] = []
+        
+        logger.info(f"开始批量执行{self.module_name}导出流程，共 {len(kwargs_list)} 个导出")
+        
+        for index, kwargs in enumerate(kwargs_list):
+            kwargs = dict(kwargs)
+            force_refresh = kwargs.pop('force_refresh', False)
+            template_name = kwargs.get('template_name', 'dairy_cold_drinks')
+            
+            try:
+                config = self.get_export_config(**kwargs)
+            except Exception as e:
+                logger.error(f"{self.module_name}获取导出配置异常: {str(e)}")
+                configs.append(None)
+                force_refresh_flags.append(force_refresh)
+                continue
+            
+            plan = None
+            if SALES_PARTITION_ENABLED and not kwargs.get('custom_params'):
+                plan = self._plan_partitions(template_name, config)
+            
+            if plan is None or plan['full_export']:
+                configs.append(config)
+                force_refresh_flags.append(force_refresh)
+            else:
+                # 由分区汇总得到，不需要整段导出
+                configs.append(None)
+                force_refresh_flags.append(False)
+                plans[index] = plan
+            
+            if plan is not None:
+                day_configs.extend(plan['day_configs'])
+        
+        # 整段导出和逐日导出一起提交
+        results = self.run_export_configs(configs + day_configs, force_refresh_flags + [True] * len(day_configs))
+        day_results = results[len(configs):]
+        results = results[:len(configs)]
+        
+        if day_configs:
+            logger.info(f"逐日分区导出完成: 成功 {sum(1 for path in day_results if path)}/{len(day_configs)}")
+        
+        # 由分区汇总请求的日期范围
+        for index, plan in plans.items():
+            results[index] = self._build_from_partitions(plan)
+            if results[index] is None:
+                logger.error(f"[{plan['config']['file_name_prefix']}] 分区汇总失败")
+        
+        success_count = sum(1 for path in results if path)
+        logger.info(f"{self.module_name}批量导出完成: 成功 {success_count}/{len(kwargs_list)}")
+        return results
+    
+    def _plan_partitions(self, template_name: str, config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        为可分区的导出生成逐日导出计划
+        
+        规划前先用已有的分区或下载文件检查导出列能否按天相加，无法确认时不分区；
+        缺失过多时本次整段导出，每次只顺带补齐 SALES_PARTITION_BACKFILL_DAYS 天的分区
+        
+        Args:
+            template_name: 模板名称
+            config: get_export_config 返回的导出配置
+            
+        Returns:
+            计划字典（key / days / day_configs / full_export / config / template_name），不可分区返回None
+        """
+        export_params = config['export_params']
+        bizday = export_params.get('bizday')
+        if not bizday or len(bizday) != 2 or not is_sales_params_partitionable(template_name, export_params):
+            return None
+        
+        store = get_partition_store()
+        key = store.make_key(config['export_url'], export_params)
+        days = store.expand_days(bizday)
+        if len(days) < 2:
+            return None
+        
+        file_name_prefix = config['file_name_prefix']
+        sample_df = self._load_column_sample(key, file_name_prefix)
+        if sample_df is None:
+            logger.info(f"[{file_name_prefix}] 尚无可检查导出列的文件，本次整段导出")
+            return None
+        if self._get_measure_columns(template_name, sample_df) is None:
+            logger.warning(f"[{file_name_prefix}] 导出列不能按天相加，整段导出")
+            return None
+        
+        missing_days = store.get_missing_days(key, days, SALES_PARTITION_REFRESH_DAYS)
+        full_export = len(missing_days) > SALES_PARTITION_MAX_MISSING_DAYS
+        if full_export:
+            # 首次运行等缺失过多时整段导出，同时补齐少量尚未保存的分区
+            absent_days = [day for day in missing_days if not store.get_partition_path(key, day).is_file()]
+            export_days = absent_days[:SALES_PARTITION_BACKFILL_DAYS]
+        else:
+            export_days = missing_days
+        
+        logger.info(f"[{file_name_prefix}] 分区 {key}: 共 {len(days)} 天，需导出 {len(missing_days)} 天"
+                    f"{'（缺失过多，本次整段导出并补齐 ' + str(len(export_days)) + ' 天）' if full_export else ''}")
+        
+        day_configs = []
+        for day in export_days:
+            day_config = dict(config)
+            day_config['export_params'] = {**export_params, 'bizday': [day, day]}
+            day_config['file_name_prefix'] = f"{file_name_prefix}_{day}"
+            day_config['save_path'] = store.get_partition_path(key, day)
+            day_configs.append(day_config)
+        
+        return {
+            'key': key,
+            'days': days,
+            'day_configs': day_configs,
+            'full_export': full_export,
+            'config': config,
+            'template_name': template_name,
+        }
+    
+    @staticmethod
+    def _load_column_sample(key: str, file_name_prefix: str) -> Optional[pd.DataFrame]:
+        """
+        读取已有文件的前几行，用于规划分区前检查导出列
+        
+        优先使用同一分区键的分区文件，其次使用下载目录中同一前缀的最新文件
+        
+        Args:
+            key: 分区键
+            file_name_prefix: 文件名前缀
+            
+        Returns:
+            非空的样本数据，没有可用文件时返回None
+        """
+        candidates = get_partition_store().list_partitions(key) + get_module_files(DOWNLOADS_DIR, file_name_prefix)[:1]
+        for path in candidates:
+            try:
+                sample_df = read_xlsx(path, nrows=PARTITION_SAMPLE_ROWS)
+            except Exception as e:
+                logger.warning(f"读取样本数据失败: {path.name} ({str(e)})")
+                continue
+            if not sample_df.empty:
+                return sample_df
+        return None
+    
+    def _build_from_partitions(self, plan: Dict[str, Any]) -> Optional[Path]:
+        """
+        汇总分区数据为请求日期范围的文件（保存到下载目录，命名与整段导出一致）
+        
+        Args:
+            plan: _plan_partitions 生成的计划
+            
+        Returns:
+            汇总文件路径，失败返回None
+        """
+        file_name_prefix = plan['config']['file_name_prefix']
+        try:
+            frames = get_partition_store().load_days(plan['key'], plan['days'])
+            if frames is None:
+                return None
+            
+            combined_df = self._sum_partitions(plan['template_name'], frames)
+            if combined_df is None:
+                return None
+            
+            cleanup_module_files(DOWNLOADS_DIR, file_name_prefix, keep_latest=0)
+            save_path = DOWNLOADS_DIR / generate_timestamped_filename(file_name_prefix)
+            combined_df.to_excel(save_path, index=False)
+            
+            logger.info(f"[{file_name_prefix}] 由 {len(frames)} 个日分区汇总: {save_path} ({len(combined_df)} 行)")
+            print(f"[完成] 分区汇总文件: {save_path.name} ({len(combined_df)} 行)")
+            return save_path
+            
+        except Exception as e:
+            logger.error(f"[{file_name_prefix}] 分区汇总异常: {str(e)}")
+            return None
+    
+    @staticmethod
+    def _get_measure_columns(template_name: str, df: pd.DataFrame) -> Optional[List[str]]:
+        """
+        获取按天汇总时相加的列（模板配置的可加列）
+        
+        数值列必须全部是配置的可加列或数值型维度列，出现未配置的数值列时不能按天汇总
+        
+        Args:
+            template_name: 模板名称
+            df: 导出数据（分区或样本）
+            
+        Returns:
+            List[str]: 相加的列（按数据中的列顺序），不能按天汇总时返回None
+        """
+        allowed = SALES_ANALYSIS_PARTITION_MEASURE_COLUMNS.get(template_name, [])
+        numeric_columns = set(df.select_dtypes("number").columns)
+        
+        unknown = [col for col in df.columns
+                   if col in numeric_columns and col not in allowed
+                   and col not in SALES_ANALYSIS_PARTITION_NUMERIC_KEY_COLUMNS]
+        if unknown:
+            logger.error(f"存在未配置为可加列的数值列: {unknown}")
+            return None
+        
+        measure_columns = [col for col in df.columns if col in allowed]
+        non_numeric = [col for col in measure_columns if col not in numeric_columns]
+        if non_numeric:
+            logger.error(f"可加列不是数值类型: {non_numeric}")
+            return None
+        if not measure_columns:
+            logger.error("未找到配置的可加列")
+            return None
+        return measure_columns
+    
+    @classmethod
+    def _sum_partitions(cls, template_name: str, frames: List[pd.DataFrame]) -> Optional[pd.DataFrame]:
+        """
+        按维度列分组，将各日的可加列相加
+        
+        Args:
+            template_name: 模板名称（决定相加的列）
+            frames: 各日分区数据
+            
+        Returns:
+            汇总后的 DataFrame（列顺序与分区一致），存在不可相加的数值列时返回None
+        """
+        non_empty = [df for df in frames if not df.empty]
+        if not non_empty:
+            return frames[0].copy() if frames else None
+        combined_df = pd.concat(non_empty, ignore_index=True)
+        
+        measure_columns = cls._get_measure_columns(template_name, combined_df)
+        if measure_columns is None:
+            return None
+        
+        key_columns = [col for col in combined_df.columns if col not in measure_columns]
+        if not key_columns:
+            return combined_df[measure_columns].sum().to_frame().T
+        
+        summed_df = combined_df.groupby(key_columns, dropna=False, sort=False)[measure_columns].sum().reset_index()
+        return summed_df[list(combined_df.columns)]
+
 
 def run(template_name: str = "dairy_cold_drinks") -> Optional[Path]:
     """
@@ -137,7 +419,7 @@ def get_description() -> str:
 
 # 模块信息
 MODULE_NAME = "sales_analysis"
-DEPENDENCIES = []  # 销售分析模块不依赖其他模块的数据
+DEPENDENCIES = ["store_management", "org_item_mapping"]  # 生成参数时读取门店管理和组织档案映射清单文件（见 AppRunner.MODULE_DEPENDENCIES）
 
 if __name__ == "__main__":
     # 测试运行
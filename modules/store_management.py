@@ -7,8 +7,9 @@
 import json
 import pandas as pd
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional
 from core.base_module import ApiBasedModule
+from core.columnar_json import ColumnCollector, columns_to_frame
 from utils.logger import get_logger
 from utils.file_utils import generate_timestamped_filename, cleanup_module_files
 from config.api_config import EXPORT_ENDPOINTS
@@ -21,40 +22,55 @@ logger = get_logger(__name__)
 class StoreManagementModule(ApiBasedModule):
     """门店管理数据采集模块（使用直接API调用方式）"""
     
+    # 保存的门店字段
+    STORE_FIELDS = ["id", "store_number", "store_name", "opening_time", "create_time", "status"]
+    # 门店字段类型（与组织档案映射的 FIELD_DTYPES 一致，按列构建时直接转换）
+    STORE_FIELD_DTYPES = {
+        "id": "Int64",
+        "store_number": "string",
+        "store_name": "string",
+        "opening_time": "string",
+        "create_time": "string",
+        "status": "boolean",
+    }
+    
     def __init__(self):
         super().__init__()
         self.base_url = EXPORT_ENDPOINTS["store_management"]
         self.default_params = STORE_MANAGEMENT_QUERY_PARAMS.copy()
         self.module_display_name = "门店管理"
     
-    def fetch_data(self, **kwargs) -> Optional[List[Dict[str, Any]]]:
+    def fetch_data(self, **kwargs) -> Optional[pd.DataFrame]:
         """
         获取门店数据（实现ApiBasedModule抽象方法）
         
+        分页数据只保留 STORE_FIELDS 字段，按列存放后直接构建 DataFrame
+        
         Returns:
-            门店数据列表
+            门店数据（STORE_FIELDS 列）
         """
-        result = self.get_all_stores()
-        if "error" in result:
+        params = self.default_params.copy()
+        params["page_size"] = 200
+        
+        columns = self.fetch_all_columns(self.base_url, params, self.STORE_FIELDS, key_field="id")
+        if columns is None:
+            logger.error("获取门店数据失败")
             return None
-        return result.get("data", [])
+        return columns_to_frame(columns, self.STORE_FIELD_DTYPES)
     
-    def save_data(self, data: List[Dict[str, Any]]) -> Optional[Path]:
+    def save_data(self, data: Any) -> Optional[Path]:
         """
         保存门店数据到Excel（实现ApiBasedModule抽象方法）
         
         Args:
-            data: 门店数据列表
+            data: 门店数据（fetch_data 返回的 DataFrame，或原始门店记录列表）
             
         Returns:
             保存的文件路径
         """
         try:
             # 提取关键字段
-            extracted_data = self.extract_store_data(data)
-            
-            # 转换为DataFrame
-            df = pd.DataFrame(extracted_data)
+            df = data if isinstance(data, pd.DataFrame) else self.extract_store_data(data)
             
             # 🗑️ 删除旧文件（确保文件夹中每个类型只有一个文件）
             deleted = cleanup_module_files(DOWNLOADS_DIR, self.module_display_name, keep_latest=0)
@@ -72,7 +88,7 @@ class StoreManagementModule(ApiBasedModule):
             df.to_excel(file_path, index=False, engine='openpyxl')
             
             logger.info(f"门店数据已保存到: {file_path}")
-            logger.info(f"保存门店数量: {len(extracted_data)}")
+            logger.info(f"保存门店数量: {len(df)}")
             
             return file_path
             
@@ -196,56 +212,19 @@ class StoreManagementModule(ApiBasedModule):
     
     def get_all_stores(self) -> Dict[str, Any]:
         """
-        获取所有门店信息（自动分页）
+        获取所有门店信息（自动分页，剩余页并发获取）
         
         Returns:
             包含所有门店的结果字典
         """
-        all_stores = []
-        page_number = 0
-        page_size = 200
-        
         try:
-            while True:
-                logger.info(f"正在获取第 {page_number + 1} 页门店数据...")
-                
-                result = self.query_stores_with_pagination(page_number, page_size)
-                
-                if "error" in result:
-                    logger.error(f"获取门店数据失败: {result['error']}")
-                    break
-                
-                # 解析API返回的标准格式
-                if result.get('code') == 0 and 'data' in result:
-                    data = result['data']
-                    if isinstance(data, dict) and 'content' in data:
-                        # 标准分页格式: {code: 0, data: {content: [...], total_elements: N}}
-                        current_stores = data.get('content', [])
-                        total_elements = data.get('total_elements', 0)
-                        total_pages = data.get('total_pages', 1)
-                        current_page = data.get('number', 0)
-                        
-                        logger.info(f"第{current_page + 1}页: {len(current_stores)}个门店，总计{total_elements}个，共{total_pages}页")
-                        
-                        if not current_stores:
-                            logger.info(f"第{current_page + 1}页没有数据，停止分页")
-                            break
-                        
-                        all_stores.extend(current_stores)
-                        logger.info(f"累计获取: {len(all_stores)}个门店")
-                        
-                        # 检查是否还有更多页
-                        if current_page + 1 >= total_pages:
-                            logger.info(f"已获取所有{total_pages}页数据")
-                            break
-                            
-                        page_number += 1
-                    else:
-                        logger.warning(f"数据格式异常: data字段不包含content")
-                        break
-                else:
-                    logger.error(f"API返回错误: code={result.get('code')}, msg={result.get('msg')}")
-                    break
+            params = self.default_params.copy()
+            params["page_size"] = 200
+            
+            all_stores = self.fetch_all_pages(self.base_url, params, key_field="id")
+            if all_stores is None:
+                logger.error("获取门店数据失败")
+                return {"error": "获取门店数据失败"}
             
             logger.info(f"总共获取到 {len(all_stores)} 个门店")
             
@@ -259,7 +238,7 @@ class StoreManagementModule(ApiBasedModule):
             logger.error(f"获取所有门店数据时发生错误: {str(e)}")
             return {"error": f"获取所有门店失败: {str(e)}"}
     
-    def extract_store_data(self, stores_data: list) -> list:
+    def extract_store_data(self, stores_data: list) -> pd.DataFrame:
         """
         提取门店关键信息
         
@@ -267,27 +246,11 @@ class StoreManagementModule(ApiBasedModule):
             stores_data: 原始门店数据列表
             
         Returns:
-            提取后的门店信息列表
+            只包含 STORE_FIELDS 字段的 DataFrame
         """
-        extracted_stores = []
-        
-        for store in stores_data:
-            if not isinstance(store, dict):
-                continue
-                
-            # 只提取需要的6个字段
-            extracted_store = {
-                "id": store.get("id"),
-                "store_number": store.get("store_number"),
-                "store_name": store.get("store_name"),
-                "opening_time": store.get("opening_time"),
-                "create_time": store.get("create_time"),
-                "status": store.get("status")
-            }
-            
-            extracted_stores.append(extracted_store)
-        
-        return extracted_stores
+        collector = ColumnCollector(self.STORE_FIELDS)
+        return columns_to_frame(collector.project([store for store in stores_data if isinstance(store, dict)]),
+                                self.STORE_FIELD_DTYPES)
     
     def _determine_store_enabled_status(self, store: dict) -> bool:
         """
@@ -13,6 +13,7 @@ from config.settings import PROCESSED_DIR
 from utils.data_loader import get_data_loader
 from utils.data_parser import get_data_parser
 from utils.file_utils import generate_timestamped_filename
+from utils.frame_schema import apply_schema, fill_blank
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -45,6 +46,20 @@ DELIVERY_CATEGORY_CANDIDATES = [
 DELIVERY_QTY_CANDIDATES = ["配送数量", "配送合计数量", "数量"]
 DELIVERY_AMOUNT_CANDIDATES = ["配送金额", "配送合计金额", "金额"]
 
+# 各依赖模块需要读取的列（列名或候选列名列表），其余列不读取
+# 配送分析导出的表头在第一行数据中（见 clean_delivery_header），无法按列名读取，仍读取全部列
+COLUMNS = {
+    "inventory_query": [
+        WAREHOUSE_CANDIDATES,
+        STORE_CANDIDATES,
+        CATEGORY_CANDIDATES,
+        PRODUCT_CODE_CANDIDATES,
+        AVAILABLE_QTY_CANDIDATES,
+        AVAILABLE_AMOUNT_CANDIDATES,
+    ],
+    "product_archive": ["商品代码", "一级分类"],
+}
+
 
 def run() -> Optional[Path]:
     """生成库存门店分类透视报表"""
@@ -54,7 +69,7 @@ def run() -> Optional[Path]:
         data_loader = get_data_loader()
         data_parser = get_data_parser()
 
-        inventory_df = data_loader.load_latest_module_data("inventory_query")
+        inventory_df = data_loader.load_latest_module_data("inventory_query", columns=COLUMNS["inventory_query"])
         if inventory_df is None or inventory_df.empty:
             logger.error("库存数据加载失败或为空")
             return None
@@ -93,7 +108,7 @@ def run() -> Optional[Path]:
         # 汇总透视（仅保留门店与分类）
         summary_df = (
             filtered_df
-            .groupby([store_col, category_col], dropna=False)[[quantity_col, amount_col]]
+            .groupby([store_col, category_col], dropna=False, observed=True)[[quantity_col, amount_col]]
             .sum(min_count=1)
             .reset_index()
         )
@@ -107,6 +122,9 @@ def run() -> Optional[Path]:
             }
         )
 
+        # 汇总结果较小，门店转回普通文本，便于后续合并、排序和追加合计行
+        summary_df["门店"] = summary_df["门店"].astype(object)
+
         # 清理无效分类
         summary_df["一级分类"] = summary_df["一级分类"].astype(str).str.strip()
         summary_df = summary_df[summary_df["一级分类"] != ""]
@@ -297,6 +315,7 @@ def build_delivery_summary(data_loader, data_parser) -> Optional[pd.DataFrame]:
         if cleaned_df is None or cleaned_df.empty:
             logger.warning("配送分析数据清洗后为空，跳过配送汇总")
             return None
+        cleaned_df = apply_schema(cleaned_df, "配送分析")
 
         store_col = data_parser.find_column(cleaned_df, DELIVERY_STORE_CANDIDATES)
         category_col = data_parser.find_column(cleaned_df, DELIVERY_CATEGORY_CANDIDATES)
@@ -332,10 +351,11 @@ def build_delivery_summary(data_loader, data_parser) -> Optional[pd.DataFrame]:
 
         summary_df = (
             working_df
-            .groupby([store_col, category_col], dropna=False)[[qty_col, amount_col]]
+            .groupby([store_col, category_col], dropna=False, observed=True)[[qty_col, amount_col]]
             .sum(min_count=1)
             .reset_index()
         )
+        summary_df[store_col] = summary_df[store_col].astype(object)
 
         summary_df = summary_df.rename(
             columns={
@@ -357,7 +377,7 @@ def build_delivery_summary(data_loader, data_parser) -> Optional[pd.DataFrame]:
 def load_product_categories(data_loader) -> Optional[pd.DataFrame]:
     """加载商品分类数据"""
     try:
-        category_df = data_loader.load_latest_module_data("product_archive")
+        category_df = data_loader.load_latest_module_data("product_archive", columns=COLUMNS["product_archive"])
         if category_df is None or category_df.empty:
             logger.warning("未获取到商品分类数据，后续分类列可能缺失")
             return None
@@ -393,7 +413,7 @@ def add_product_categories(inventory_df: pd.DataFrame, category_df: pd.DataFrame
         how="left",
     )
 
-    merged["一级分类"] = merged["一级分类"].fillna("")
+    merged["一级分类"] = fill_blank(merged["一级分类"])
     return merged.drop(columns=["商品代码"], errors="ignore")
 
 
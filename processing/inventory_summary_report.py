@@ -13,13 +13,15 @@ from openpyxl.styles import Border, Font, Side
 
 from config.settings import PROCESSED_DIR
 from utils.data_loader import get_data_loader
+from utils.xlsx_reader import read_xlsx
 from utils.data_parser import get_data_parser
+from utils.frame_schema import fill_blank
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 # 声明依赖的原始数据模块
-DEPENDENCIES = ["inventory_query", "product_archive"]
+DEPENDENCIES = ["inventory_query", "product_archive", "store_product_attributes"]
 
 # 需要剔除的仓库列表
 EXCLUDED_WAREHOUSES = [
@@ -28,6 +30,20 @@ EXCLUDED_WAREHOUSES = [
     "东莞中转仓"
 ]
 
+# 仓库字段（可能的字段名）
+WAREHOUSE_CANDIDATES = ['仓库', '仓库名称', '仓库名', 'warehouse', 'warehouse_name', '仓库编码']
+
+# 各依赖模块需要读取的列（列名或候选列名列表），其余列不读取
+COLUMNS = {
+    "inventory_query": [
+        WAREHOUSE_CANDIDATES, '商品代码', '商品条码', '商品名称', '门店', '数量', '可用数量',
+        # 库存导出中如已带有以下字段，关联时会被覆盖或清除，需要一并读取以保持原有处理逻辑
+        '一级分类', '二级分类', '采购责任人', '停购', '停止要货',
+    ],
+    "product_archive": ['商品代码', '一级分类', '二级分类'],
+    "store_product_attributes": ['门店', '商品代码', '停购', '停止要货'],
+}
+
 def run() -> Optional[Path]:
     """
     执行库存汇总报表生成
@@ -40,7 +56,7 @@ def run() -> Optional[Path]:
     try:
         # 1. 加载库存数据
         data_loader = get_data_loader()
-        inventory_df = data_loader.load_latest_module_data("inventory_query")
+        inventory_df = data_loader.load_latest_module_data("inventory_query", columns=COLUMNS["inventory_query"])
         
         if inventory_df is None or inventory_df.empty:
             logger.error("库存数据加载失败或为空")
@@ -96,13 +112,13 @@ def run() -> Optional[Path]:
         special_columns = ['一级分类', '二级分类', '采购责任人']
         for col in special_columns:
             if col in final_df.columns:
-                final_df[col] = final_df[col].fillna('').astype(str).replace('nan', '')
+                final_df[col] = fill_blank(final_df[col]).astype(str).replace('nan', '')
         
         # 处理门店属性列
         store_attr_columns = [col for col in final_df.columns if '_停购' in col or '_停止要货' in col]
         for col in store_attr_columns:
             if col in final_df.columns:
-                final_df[col] = final_df[col].fillna('').astype(str).replace('nan', '')
+                final_df[col] = fill_blank(final_df[col]).astype(str).replace('nan', '')
         
         final_df.to_excel(output_path, index=False, engine='openpyxl')
         apply_inventory_report_style(output_path)
@@ -150,10 +166,9 @@ def filter_excluded_warehouses(inventory_df: pd.DataFrame) -> pd.DataFrame:
         logger.warning("库存数据为空，跳过仓库过滤")
         return inventory_df
     
-    # 尝试找到仓库字段（可能的字段名）
-    warehouse_columns = ['仓库', '仓库名称', '仓库名', 'warehouse', 'warehouse_name', '仓库编码']
+    # 尝试找到仓库字段
     data_parser = get_data_parser()
-    warehouse_col = data_parser.find_column(inventory_df, warehouse_columns)
+    warehouse_col = data_parser.find_column(inventory_df, WAREHOUSE_CANDIDATES)
     
     if warehouse_col is None:
         logger.warning(f"未找到仓库字段，可用字段: {list(inventory_df.columns)}")
@@ -174,6 +189,7 @@ def filter_excluded_warehouses(inventory_df: pd.DataFrame) -> pd.DataFrame:
         # 显示被剔除的仓库统计
         excluded_data = inventory_df[inventory_df[warehouse_col].isin(EXCLUDED_WAREHOUSES)]
         warehouse_counts = excluded_data[warehouse_col].value_counts()
+        warehouse_counts = warehouse_counts[warehouse_counts > 0]  # 分类类型的列会包含未出现的类别
         for warehouse, count in warehouse_counts.items():
             print(f"   - {warehouse}: {count} 条")
     else:
@@ -222,6 +238,7 @@ def filter_excluded_categories(inventory_df: pd.DataFrame) -> pd.DataFrame:
         # 显示被剔除的分类统计
         excluded_data = inventory_df[inventory_df[category_col].isin(EXCLUDED_CATEGORIES)]
         category_counts = excluded_data[category_col].value_counts()
+        category_counts = category_counts[category_counts > 0]  # 分类类型的列会包含未出现的类别
         for category, count in category_counts.items():
             print(f"   - {category}: {count} 条")
     else:
@@ -242,7 +259,7 @@ def load_product_categories(data_loader) -> Optional[pd.DataFrame]:
     """
     try:
         # 尝试从组织商品档案加载分类数据
-        category_df = data_loader.load_latest_module_data("product_archive")
+        category_df = data_loader.load_latest_module_data("product_archive", columns=COLUMNS["product_archive"])
         
         if category_df is None or category_df.empty:
             logger.error("无法加载商品分类数据")
@@ -297,8 +314,8 @@ def add_product_categories(inventory_df: pd.DataFrame, category_df: pd.DataFrame
         )
         
         # 立即处理合并后的空值，避免后续转换为字符串'nan'
-        merged_df['一级分类'] = merged_df['一级分类'].fillna('')
-        merged_df['二级分类'] = merged_df['二级分类'].fillna('')
+        merged_df['一级分类'] = fill_blank(merged_df['一级分类'])
+        merged_df['二级分类'] = fill_blank(merged_df['二级分类'])
         
         # 统计关联结果
         total_count = len(inventory_df)
@@ -332,7 +349,7 @@ def load_staff_structure() -> Optional[pd.DataFrame]:
             logger.warning(f"商品人员架构文件不存在: {staff_file}")
             return None
             
-        staff_df = pd.read_excel(staff_file)
+        staff_df = read_xlsx(staff_file)
         
         if staff_df.empty:
             logger.error("商品人员架构表数据为空")
@@ -388,7 +405,7 @@ def add_purchase_manager(inventory_df: pd.DataFrame, staff_df: pd.DataFrame) ->
         )
         
         # 立即处理合并后的空值
-        merged_df['采购责任人'] = merged_df['采购责任人'].fillna('')
+        merged_df['采购责任人'] = fill_blank(merged_df['采购责任人'])
         
         # 统计关联结果
         total_count = len(inventory_df)
@@ -417,7 +434,9 @@ def load_store_product_attributes(data_loader) -> Optional[pd.DataFrame]:
     """
     try:
         # 尝试从模块加载门店商品属性数据
-        attr_df = data_loader.load_latest_module_data("store_product_attributes")
+        attr_df = data_loader.load_latest_module_data(
+            "store_product_attributes", columns=COLUMNS["store_product_attributes"]
+        )
         
         if attr_df is None or attr_df.empty:
             logger.error("无法加载门店商品属性数据")
@@ -592,8 +611,8 @@ def add_store_product_attributes(inventory_df: pd.DataFrame, attr_df: pd.DataFra
         
         # 处理合并后的空值：只有完全匹配不上的才设为空，匹配上但值为null的保持原样
         # 注意：merge后，匹配不上的记录这两个字段会是NaN，匹配上但原值为空的会保持原来的空值
-        merged_df['停购'] = merged_df['停购'].fillna('')
-        merged_df['停止要货'] = merged_df['停止要货'].fillna('')
+        merged_df['停购'] = fill_blank(merged_df['停购'])
+        merged_df['停止要货'] = fill_blank(merged_df['停止要货'])
         
         # 统计关联结果
         total_count = len(inventory_df)
@@ -684,7 +703,7 @@ def pivot_stores_to_columns(inventory_df: pd.DataFrame, attr_df: pd.DataFrame =
         
         # 处理分类字段、人员字段和属性字段的空值，将NaN替换为空字符串，避免groupby时被排除
         for field in available_category_fields + available_staff_fields + available_attribute_fields:
-            selected_df[field] = selected_df[field].fillna('').astype(str)
+            selected_df[field] = fill_blank(selected_df[field]).astype(str)
             # 处理字符串形式的'nan'
             selected_df[field] = selected_df[field].replace('nan', '')
         
@@ -697,7 +716,8 @@ def pivot_stores_to_columns(inventory_df: pd.DataFrame, attr_df: pd.DataFrame =
         for field in available_attribute_fields:
             agg_dict[field] = 'first'
         
-        grouped_df = selected_df.groupby(group_fields, dropna=False).agg(agg_dict).reset_index()
+        # 门店、商品名称等为分类类型，observed=True 只保留实际出现的组合
+        grouped_df = selected_df.groupby(group_fields, dropna=False, observed=True).agg(agg_dict).reset_index()
         
         # 执行透视转换：门店作为列，商品信息、分类、人员作为行索引（不包含属性字段，因为它们要按门店展开）
         index_fields = ['商品代码', '商品条码', '商品名称'] + available_category_fields + available_staff_fields
@@ -708,7 +728,8 @@ def pivot_stores_to_columns(inventory_df: pd.DataFrame, attr_df: pd.DataFrame =
             columns='门店',
             values='数量',
             fill_value=0,
-            aggfunc='sum'
+            aggfunc='sum',
+            observed=True
         )
         
         pivoted_available = grouped_df.pivot_table(
@@ -716,7 +737,8 @@ def pivot_stores_to_columns(inventory_df: pd.DataFrame, attr_df: pd.DataFrame =
             columns='门店',
             values='可用数量',
             fill_value=0,
-            aggfunc='sum'
+            aggfunc='sum',
+            observed=True
         )
         
         # 调试：检查分组后的停购/停止要货数据
@@ -733,7 +755,8 @@ def pivot_stores_to_columns(inventory_df: pd.DataFrame, attr_df: pd.DataFrame =
             columns='门店',
             values='停购',
             fill_value='',
-            aggfunc='first'
+            aggfunc='first',
+            observed=True
         )
         
         pivoted_stop_order = grouped_df.pivot_table(
@@ -741,7 +764,8 @@ def pivot_stores_to_columns(inventory_df: pd.DataFrame, attr_df: pd.DataFrame =
             columns='门店',
             values='停止要货',
             fill_value='',
-            aggfunc='first'
+            aggfunc='first',
+            observed=True
         )
         
         # 关键修复：对于空值，直接从原始属性表中查找
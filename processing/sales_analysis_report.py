@@ -34,6 +34,11 @@ TARGET_COLUMNS: List[str] = [
 
 EXCLUDE_KEYWORDS: List[str] = ["益力多"]
 
+# 各依赖模块需要读取的列，其余列不读取
+COLUMNS = {
+    "商品销售数据": TARGET_COLUMNS,
+}
+
 
 def run() -> Optional[Path]:
     """
@@ -47,7 +52,7 @@ def run() -> Optional[Path]:
     try:
         # 1. 加载销售分析数据
         data_loader = get_data_loader()
-        sales_df = data_loader.load_latest_module_data("商品销售数据")
+        sales_df = data_loader.load_latest_module_data("商品销售数据", columns=COLUMNS["商品销售数据"])
 
         if sales_df is None or sales_df.empty:
             logger.error("销售分析数据加载失败或为空")
@@ -0,0 +1,101 @@
+"""
+测试公共夹具
+HTTP 请求通过替换当前线程的 Session 模拟，不访问真实后端；
+限流器、熔断器每个测试单独创建，重试退避不等待
+"""
+
+import json
+import threading
+from typing import Callable, Dict, Any, List, Optional
+
+import pytest
+import requests
+from requests.structures import CaseInsensitiveDict
+
+import core.request_handler as request_handler_module
+from core.circuit_breaker import CircuitBreakerRegistry
+from core.rate_limiter import RateLimiter
+
+
+class FakeResponse:
+    """模拟 requests.Response（只实现被调用到的部分）"""
+
+    def __init__(self, status_code: int = 200, body: bytes = b"",
+                 headers: Optional[Dict[str, str]] = None, fail_after: Optional[int] = None):
+        self.status_code = status_code
+        self.content = body
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.fail_after = fail_after
+        self.closed = False
+
+    @classmethod
+    def json_body(cls, payload: Dict[str, Any], status_code: int = 200, **kwargs) -> "FakeResponse":
+        return cls(status_code, json.dumps(payload).encode("utf-8"), **kwargs)
+
+    def iter_content(self, chunk_size: int = 8192):
+        """按块返回内容；设置 fail_after 时发送该字节数后模拟连接中断"""
+        sent = 0
+        for start in range(0, len(self.content), chunk_size):
+            chunk = self.content[start:start + chunk_size]
+            if self.fail_after is not None and sent + len(chunk) > self.fail_after:
+                yield chunk[:self.fail_after - sent]
+                raise requests.exceptions.ChunkedEncodingError("connection broken")
+            sent += len(chunk)
+            yield chunk
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"HTTP {self.status_code}", response=self)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSession:
+    """模拟 Session：按 handler(method, url, headers, json) 返回响应或抛出异常，并记录每次请求"""
+
+    def __init__(self, handler: Callable[..., FakeResponse]):
+        self.handler = handler
+        self.calls: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def _request(self, method: str, url: str, headers=None, json=None) -> FakeResponse:
+        with self._lock:
+            self.calls.append({"method": method, "url": url, "headers": dict(headers or {}), "json": json})
+        return self.handler(method, url, dict(headers or {}), json)
+
+    def get(self, url, params=None, headers=None, timeout=None, stream=False):
+        return self._request("GET", url, headers=headers)
+
+    def post(self, url, json=None, timeout=None, headers=None):
+        return self._request("POST", url, headers=headers, json=json)
+
+    def head(self, url, timeout=None, allow_redirects=False):
+        return self._request("HEAD", url)
+
+
+class FakeTransport:
+    def __init__(self, session: FakeSession):
+        self.session = session
+
+
+@pytest.fixture
+def fake_http(monkeypatch):
+    """
+    安装模拟 HTTP 后端
+
+    返回 install(handler) -> FakeSession；同时为本测试使用独立的限流器（不限流）和熔断器，
+    重试退避不等待
+    """
+    breakers = CircuitBreakerRegistry()
+    monkeypatch.setattr(request_handler_module, "get_rate_limiter", lambda: RateLimiter({}))
+    monkeypatch.setattr(request_handler_module, "get_circuit_breakers", lambda: breakers)
+    monkeypatch.setattr(request_handler_module, "compute_backoff", lambda attempt, retry_after=None: 0.0)
+
+    def install(handler: Callable[..., FakeResponse]) -> FakeSession:
+        session = FakeSession(handler)
+        monkeypatch.setattr(request_handler_module, "get_transport", lambda: FakeTransport(session))
+        return session
+
+    install.breakers = breakers
+    return install
@@ -0,0 +1,145 @@
+"""熔断器"""
+
+import requests
+
+import core.circuit_breaker as circuit_breaker_module
+import core.request_handler as request_handler_module
+from core.circuit_breaker import CircuitBreaker, CircuitBreakerRegistry, STATE_CLOSED, STATE_OPEN, STATE_HALF_OPEN
+from tests.conftest import FakeResponse
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _tripped_breaker(monkeypatch, threshold=3, reset_timeout=30):
+    clock = FakeClock()
+    monkeypatch.setattr(circuit_breaker_module.time, "monotonic", clock)
+    breaker = CircuitBreaker("https://api.example.com", failure_threshold=threshold, reset_timeout=reset_timeout)
+    for _ in range(threshold):
+        assert breaker.allow_request()
+        breaker.record_failure()
+    return breaker, clock
+
+
+def test_trips_after_consecutive_failures(monkeypatch):
+    breaker, _ = _tripped_breaker(monkeypatch)
+
+    assert breaker.get_status()["state"] == STATE_OPEN
+    assert breaker.is_open()
+    assert not breaker.allow_request()
+    assert breaker.get_status()["trips"] == 1
+    assert breaker.get_status()["rejected"] == 1
+
+
+def test_success_resets_failure_count():
+    breaker = CircuitBreaker("https://api.example.com", failure_threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.get_status()["state"] == STATE_CLOSED
+
+
+def test_half_open_admits_single_probe_and_recovers(monkeypatch):
+    breaker, clock = _tripped_breaker(monkeypatch)
+    clock.now += 30
+
+    assert not breaker.is_open()
+    assert breaker.allow_request()
+    assert breaker.get_status()["state"] == STATE_HALF_OPEN
+    # 探测请求未结束前，其他请求仍被拒绝
+    assert not breaker.allow_request()
+
+    breaker.record_success()
+    assert breaker.get_status()["state"] == STATE_CLOSED
+    assert breaker.allow_request()
+
+
+def test_failed_probe_reopens(monkeypatch):
+    breaker, clock = _tripped_breaker(monkeypatch)
+    clock.now += 30
+    assert breaker.allow_request()
+
+    breaker.record_failure()
+    assert breaker.get_status()["state"] == STATE_OPEN
+    assert not breaker.allow_request()
+    # 探测失败不计为新的熔断
+    assert breaker.get_status()["trips"] == 1
+
+
+def test_release_probe_lets_next_request_probe(monkeypatch):
+    breaker, clock = _tripped_breaker(monkeypatch)
+    clock.now += 30
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+    breaker.release_probe()
+    assert breaker.allow_request()
+
+
+def test_registry_keys_breakers_by_host_and_maps_status():
+    registry = CircuitBreakerRegistry()
+    assert registry.get_breaker("https://a.example.com/x?y=1") is registry.get_breaker("https://a.example.com/z")
+    assert registry.get_breaker("https://a.example.com/x") is not registry.get_breaker("https://b.example.com/x")
+
+    for _ in range(circuit_breaker_module.CIRCUIT_FAILURE_THRESHOLD):
+        registry.record_response("https://a.example.com/x", 503)
+    assert registry.is_open("https://a.example.com/other")
+    assert not registry.is_open("https://b.example.com/x")
+    assert "https://a.example.com" in registry.get_summary()
+
+    registry.record_response("https://b.example.com/x", 404)
+    assert registry.get_breaker("https://b.example.com/x").get_status()["failures"] == 0
+
+
+def test_request_handler_fails_fast_once_backend_is_down(fake_http):
+    def handler(method, url, headers, json):
+        raise requests.exceptions.ConnectionError("connection refused")
+
+    session = fake_http(handler)
+    request_handler = request_handler_module.RequestHandler()
+    url = "https://api.example.com/list"
+    threshold = circuit_breaker_module.CIRCUIT_FAILURE_THRESHOLD
+
+    attempts = 0
+    while not fake_http.breakers.is_open(url):
+        assert request_handler.post(url, {}) is None
+        attempts += 1
+        assert attempts <= threshold
+    assert len(session.calls) == threshold
+
+    # 熔断后不再发出请求
+    assert request_handler.post(url, {}) is None
+    assert request_handler.get(url) is None
+    assert len(session.calls) == threshold
+
+
+def test_request_handler_records_5xx_and_recovers(fake_http):
+    url = "https://api.example.com/list"
+    responses = [FakeResponse(500), FakeResponse.json_body({"code": 0})]
+    fake_http(lambda method, url, headers, json: responses.pop(0))
+
+    assert request_handler_module.RequestHandler().post(url, {}) == {"code": 0}
+    assert fake_http.breakers.get_breaker(url).get_status()["failures"] == 0
+
+
+def test_request_handler_releases_probe_on_unexpected_error(fake_http, monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(circuit_breaker_module.time, "monotonic", clock)
+    url = "https://api.example.com/list"
+    breaker = fake_http.breakers.get_breaker(url)
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    clock.now += breaker.reset_timeout
+
+    def handler(method, url, headers, json):
+        raise ValueError("unexpected")
+
+    fake_http(handler)
+    assert request_handler_module.RequestHandler().post(url, {}) is None
+    # 探测请求因程序异常结束，探测名额已释放
+    assert breaker.allow_request()
@@ -0,0 +1,186 @@
+"""文件下载：断点续传与分段下载"""
+
+import json
+import os
+import threading
+
+import pytest
+
+import core.download_handler as download_handler_module
+from core.download_handler import DownloadHandler
+from tests.conftest import FakeResponse
+
+URL = "https://oss.example.com/exports/report.xlsx?Signature=abc"
+PAYLOAD = bytes(range(256)) * 400  # 102400 字节
+
+
+class FakeFileServer:
+    """
+    模拟 OSS 文件下载：支持 Range / If-Range
+
+    - supports_range=False 时忽略 Range，总是返回完整内容
+    - etag 与请求的 If-Range 不一致时返回完整内容（文件已变化）
+    - fail_next 中的字节数依次用于让后续响应在发送该字节数后中断
+    """
+
+    def __init__(self, payload=PAYLOAD, etag='"v1"', supports_range=True):
+        self.payload = payload
+        self.etag = etag
+        self.supports_range = supports_range
+        self.fail_next = []
+        self.fail_ranges = set()
+        self._lock = threading.Lock()
+
+    def __call__(self, method, url, headers, json):
+        assert method == "GET"
+        total = len(self.payload)
+        range_header = headers.get("Range")
+        if_range = headers.get("If-Range")
+        with self._lock:
+            fail_after = self.fail_next.pop(0) if self.fail_next else None
+
+        if range_header and self.supports_range and (if_range is None or if_range == self.etag):
+            start, _, end = range_header[len("bytes="):].partition("-")
+            start, end = int(start), int(end) if end else total - 1
+            if (start, end) in self.fail_ranges:
+                return FakeResponse(500)
+            body = self.payload[start:end + 1]
+            return FakeResponse(206, body, {
+                "Content-Range": f"bytes {start}-{end}/{total}",
+                "Content-Length": str(len(body)),
+                "ETag": self.etag,
+            }, fail_after=fail_after)
+
+        headers = {"Content-Length": str(total), "ETag": self.etag}
+        if self.supports_range:
+            headers["Accept-Ranges"] = "bytes"
+        return FakeResponse(200, self.payload, headers, fail_after=fail_after)
+
+
+@pytest.fixture
+def no_wait(monkeypatch):
+    monkeypatch.setattr(download_handler_module, "compute_backoff", lambda attempt: 0.0)
+    monkeypatch.setattr(download_handler_module, "SEGMENTED_DOWNLOAD_ENABLED", False)
+
+
+def _part_paths(tmp_path):
+    part_path = DownloadHandler.get_part_path(URL, "库存查询", tmp_path)
+    return part_path, part_path.with_name(part_path.name + ".json")
+
+
+def test_full_download_collects_content(fake_http, no_wait, tmp_path):
+    session = fake_http(FakeFileServer())
+    content = bytearray()
+
+    path = DownloadHandler().download_file(URL, "库存查询", save_dir=tmp_path, content=content)
+
+    assert path is not None and path.read_bytes() == PAYLOAD
+    assert bytes(content) == PAYLOAD
+    assert len(session.calls) == 1
+    # 完成后不留临时文件
+    assert not any(tmp_path.glob("*.part*"))
+
+
+def test_interrupted_download_resumes_with_range(fake_http, no_wait, tmp_path):
+    server = FakeFileServer()
+    server.fail_next = [30000]
+    session = fake_http(server)
+
+    path = DownloadHandler().download_file(URL, "库存查询", save_dir=tmp_path)
+
+    assert path.read_bytes() == PAYLOAD
+    assert len(session.calls) == 2
+    resumed = session.calls[1]["headers"]
+    offset = int(resumed["Range"][len("bytes="):-1])
+    assert 0 < offset <= 30000
+    assert resumed["If-Range"] == server.etag
+
+
+def test_existing_part_file_is_resumed_on_next_run(fake_http, no_wait, tmp_path):
+    part_path, meta_path = _part_paths(tmp_path)
+    part_path.write_bytes(PAYLOAD[:50000])
+    meta_path.write_text(json.dumps({"url": URL.split("?")[0], "total": len(PAYLOAD), "etag": '"v1"'}))
+    session = fake_http(FakeFileServer())
+
+    # 签名参数变化不影响续传
+    path = DownloadHandler().download_file(URL.replace("abc", "xyz"), "库存查询", save_dir=tmp_path)
+
+    assert path.read_bytes() == PAYLOAD
+    assert session.calls[0]["headers"]["Range"] == "bytes=50000-"
+
+
+def test_changed_file_restarts_from_scratch(fake_http, no_wait, tmp_path):
+    part_path, meta_path = _part_paths(tmp_path)
+    part_path.write_bytes(b"x" * 50000)
+    meta_path.write_text(json.dumps({"url": URL.split("?")[0], "total": len(PAYLOAD), "etag": '"old"'}))
+    fake_http(FakeFileServer(etag='"v2"'))
+
+    path = DownloadHandler().download_file(URL, "库存查询", save_dir=tmp_path)
+
+    assert path.read_bytes() == PAYLOAD
+
+
+def test_server_without_range_support_restarts_from_scratch(fake_http, no_wait, tmp_path):
+    part_path, meta_path = _part_paths(tmp_path)
+    part_path.write_bytes(PAYLOAD[:50000])
+    meta_path.write_text(json.dumps({"url": URL.split("?")[0], "total": len(PAYLOAD), "etag": None}))
+    fake_http(FakeFileServer(supports_range=False))
+
+    path = DownloadHandler().download_file(URL, "库存查询", save_dir=tmp_path)
+
+    assert path.read_bytes() == PAYLOAD
+
+
+def test_gives_up_after_max_attempts_and_keeps_part(fake_http, no_wait, tmp_path, monkeypatch):
+    monkeypatch.setattr(download_handler_module, "DOWNLOAD_MAX_ATTEMPTS", 2)
+    server = FakeFileServer()
+    server.fail_next = [10000, 10000]
+    fake_http(server)
+
+    assert DownloadHandler().download_file(URL, "库存查询", save_dir=tmp_path) is None
+
+    part_path, meta_path = _part_paths(tmp_path)
+    assert part_path.exists() and meta_path.exists()
+    assert PAYLOAD.startswith(part_path.read_bytes())
+
+
+@pytest.fixture
+def segmented(monkeypatch):
+    monkeypatch.setattr(download_handler_module, "compute_backoff", lambda attempt: 0.0)
+    monkeypatch.setattr(download_handler_module, "SEGMENTED_DOWNLOAD_ENABLED", True)
+    monkeypatch.setattr(download_handler_module, "SEGMENTED_DOWNLOAD_MIN_SIZE", 1024)
+    monkeypatch.setattr(download_handler_module, "SEGMENTED_DOWNLOAD_PART_SIZE", 30000)
+    monkeypatch.setattr(download_handler_module, "SEGMENTED_DOWNLOAD_CONNECTIONS", 3)
+
+
+def test_large_file_downloads_in_segments(fake_http, segmented, tmp_path):
+    session = fake_http(FakeFileServer())
+
+    path = DownloadHandler().download_file(URL, "库存查询", save_dir=tmp_path)
+
+    assert path.read_bytes() == PAYLOAD
+    ranges = sorted(call["headers"]["Range"] for call in session.calls[1:])
+    assert ranges == sorted(["bytes=0-29999", "bytes=30000-59999", "bytes=60000-89999", "bytes=90000-102399"])
+    assert all(call["headers"]["If-Range"] == '"v1"' for call in session.calls[1:])
+
+
+def test_failed_segment_is_retried_without_refetching_finished_ones(fake_http, segmented, tmp_path, monkeypatch):
+    monkeypatch.setattr(download_handler_module, "DOWNLOAD_MAX_ATTEMPTS", 1)
+    server = FakeFileServer()
+    server.fail_ranges = {(30000, 59999)}
+    fake_http(server)
+
+    # 第一次运行：有分段失败，保留临时文件和分段进度
+    assert DownloadHandler().download_file(URL, "库存查询", save_dir=tmp_path) is None
+    part_path, meta_path = _part_paths(tmp_path)
+    segments = json.loads(meta_path.read_text())["segments"]
+    assert [done for _, _, done in segments] == [True, False, True, True]
+    assert os.path.getsize(part_path) == len(PAYLOAD)
+
+    # 第二次运行：只下载剩余分段
+    server.fail_ranges = set()
+    session = fake_http(server)
+    path = DownloadHandler().download_file(URL, "库存查询", save_dir=tmp_path)
+
+    assert path.read_bytes() == PAYLOAD
+    assert [call["headers"]["Range"] for call in session.calls] == ["bytes=30000-59999"]
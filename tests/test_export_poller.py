@@ -0,0 +1,188 @@
+"""导出历史轮询：任务绑定、超时与 iter_completed"""
+
+import datetime
+import threading
+import time
+from concurrent.futures import Future
+
+import pytest
+
+import core.export_handler as export_handler_module
+import core.export_poller as export_poller_module
+import core.poll_scheduler as poll_scheduler_module
+from config.api_config import DOWNLOAD_ENDPOINT
+from core.export_handler import ExportHandler
+from core.export_poller import ExportHistoryPoller, iter_completed
+from core.poll_scheduler import ExportDurationStats
+from tests.conftest import FakeResponse
+
+EXPORT_URL = "https://export.example.com/export/submit"
+
+
+def _format(moment):
+    return moment.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _task(task_id, name, created_at, done=True):
+    return {
+        "id": task_id,
+        "name": name,
+        "create_time": _format(created_at),
+        "state": 1 if done else 0,
+        "schedule": 100 if done else 40,
+        "url": f"https://oss.example.com/{task_id}.xlsx" if done else "",
+    }
+
+
+class FakeExportBackend:
+    """模拟导出提交接口和导出历史接口"""
+
+    def __init__(self, history=None, submit_data=None):
+        self.history = list(history or [])
+        self.submit_data = submit_data
+        self.history_requests = 0
+
+    def __call__(self, method, url, headers, json):
+        if url == DOWNLOAD_ENDPOINT:
+            self.history_requests += 1
+            return FakeResponse.json_body({"code": 0, "data": {"content": self.history}})
+        if url == EXPORT_URL:
+            return FakeResponse.json_body({"code": 0, "data": self.submit_data})
+        raise AssertionError(f"unexpected request: {url}")
+
+
+@pytest.fixture
+def poller(fake_http, tmp_path, monkeypatch):
+    stats = ExportDurationStats(stats_file=tmp_path / "durations.json")
+    monkeypatch.setattr(export_poller_module, "get_duration_stats", lambda: stats)
+
+    def create(backend):
+        fake_http(backend)
+        return ExportHistoryPoller()
+
+    return create
+
+
+def test_finished_task_resolves_with_download_url(poller):
+    start = datetime.datetime.now()
+    backend = FakeExportBackend([_task(1, "库存查询", start + datetime.timedelta(seconds=1))])
+
+    future = poller(backend).register("库存查询", start, initial_wait=0)
+
+    assert future.result(timeout=5) == "https://oss.example.com/1.xlsx"
+
+
+def test_concurrent_exports_of_one_module_bind_in_submission_order(poller):
+    start = datetime.datetime.now().replace(microsecond=0)
+    backend = FakeExportBackend([
+        _task(2, "商品销售数据", start + datetime.timedelta(seconds=12)),
+        _task(1, "商品销售数据", start + datetime.timedelta(seconds=2)),
+    ])
+    export_poller = poller(backend)
+
+    first = export_poller.register("商品销售数据", start, initial_wait=0.2)
+    second = export_poller.register("商品销售数据", start + datetime.timedelta(seconds=10), initial_wait=0.2)
+
+    assert first.result(timeout=5) == "https://oss.example.com/1.xlsx"
+    assert second.result(timeout=5) == "https://oss.example.com/2.xlsx"
+    # 两个等待任务共用同一轮历史查询
+    assert backend.history_requests == 1
+
+
+def test_submitted_task_id_takes_precedence_over_time_matching(poller, monkeypatch):
+    start = datetime.datetime.now()
+    backend = FakeExportBackend(
+        history=[
+            _task(76, "库存查询", start),
+            _task(77, "库存查询", start + datetime.timedelta(seconds=30)),
+        ],
+        submit_data={"id": 77},
+    )
+    export_poller = poller(backend)
+    monkeypatch.setattr(export_handler_module, "get_export_poller", lambda: export_poller)
+    monkeypatch.setattr(poll_scheduler_module, "EXPORT_FIRST_POLL_DEFAULT", 0.1)
+
+    future = ExportHandler().start_export(EXPORT_URL, {}, "库存查询")
+
+    assert future.result(timeout=5) == "https://oss.example.com/77.xlsx"
+
+
+def test_unknown_submitted_id_falls_back_to_name_binding(poller):
+    start = datetime.datetime.now()
+    backend = FakeExportBackend([_task(5, "库存查询", start)])
+    export_poller = poller(backend)
+    # 首次轮询安排在很久以后，由测试直接驱动轮询
+    future = export_poller.register("库存查询", start, initial_wait=3600, task_id="999")
+
+    export_poller._tick()
+    export_poller._tick()
+    assert not future.done()
+    export_poller._tick()
+
+    assert future.result(timeout=0) == "https://oss.example.com/5.xlsx"
+
+
+def test_unfinished_task_times_out_with_none(poller):
+    start = datetime.datetime.now()
+    backend = FakeExportBackend([_task(1, "库存查询", start, done=False)])
+
+    future = poller(backend).register("库存查询", start, max_wait_time=0, initial_wait=0)
+
+    assert future.result(timeout=5) is None
+
+
+def test_open_breaker_fails_waiters_immediately(poller, fake_http):
+    breaker = fake_http.breakers.get_breaker(DOWNLOAD_ENDPOINT)
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    backend = FakeExportBackend()
+
+    future = poller(backend).register("库存查询", datetime.datetime.now(), initial_wait=0)
+
+    assert future.result(timeout=5) is None
+    assert backend.history_requests == 0
+
+
+def test_cancelled_waiter_is_dropped(poller):
+    start = datetime.datetime.now()
+    export_poller = poller(FakeExportBackend([_task(1, "库存查询", start, done=False)]))
+    future = export_poller.register("库存查询", start, initial_wait=3600)
+
+    future.cancel()
+    export_poller._tick()
+
+    assert export_poller.pending_count() == 0
+
+
+def _resolve_later(future, value, delay):
+    timer = threading.Timer(delay, future.set_result, args=(value,))
+    timer.start()
+    return timer
+
+
+def test_iter_completed_excludes_consumer_time_from_timeout(monkeypatch):
+    monkeypatch.setattr(export_poller_module, "get_result_timeout", lambda max_wait_time: 0.5)
+    futures = [Future() for _ in range(3)]
+    for index, future in enumerate(futures):
+        _resolve_later(future, index, 0.05 * (index + 1))
+
+    results = []
+    for future in iter_completed(futures):
+        results.append(future.result())
+        # 调用方处理每个结果（如下载文件）的时间不计入等待超时
+        time.sleep(0.3)
+
+    assert sorted(results) == [0, 1, 2]
+
+
+def test_iter_completed_yields_finished_futures_and_cancels_the_rest(monkeypatch):
+    monkeypatch.setattr(export_poller_module, "get_result_timeout", lambda max_wait_time: 0.2)
+    finished, late, never = Future(), Future(), Future()
+    finished.set_result("a")
+    timer = _resolve_later(late, "b", 0.05)
+
+    yielded = [future.result() for future in iter_completed([finished, late, never])]
+    timer.join()
+
+    assert sorted(yielded) == ["a", "b"]
+    assert never.cancelled()
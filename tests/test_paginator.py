@@ -0,0 +1,112 @@
+"""分页接口并发获取：拼接顺序、去重与补拉"""
+
+from core.base_module import ApiBasedModule
+from tests.conftest import FakeResponse
+
+URL = "https://api.example.com/store/list"
+
+
+class PagedModule(ApiBasedModule):
+    def fetch_data(self, **kwargs):
+        return None
+
+    def save_data(self, data):
+        return None
+
+
+def _records(count):
+    return [{"id": index, "name": f"门店{index}", "extra": "x" * 10} for index in range(count)]
+
+
+class FakePagedApi:
+    """
+    模拟分页接口
+
+    pages_by_round 为每轮（同一页第几次被请求）各页返回的记录；
+    failing_pages 中的页码返回业务错误
+    """
+
+    def __init__(self, records, page_size, pages_by_round=None, failing_pages=()):
+        self.records = records
+        self.page_size = page_size
+        self.pages_by_round = pages_by_round or []
+        self.failing_pages = set(failing_pages)
+        self.requested_pages = []
+
+    def page(self, page_number, round_index):
+        if round_index < len(self.pages_by_round) and page_number in self.pages_by_round[round_index]:
+            return self.pages_by_round[round_index][page_number]
+        start = page_number * self.page_size
+        return self.records[start:start + self.page_size]
+
+    def __call__(self, method, url, headers, json):
+        page_number = json["page_number"]
+        round_index = self.requested_pages.count(page_number)
+        self.requested_pages.append(page_number)
+        if page_number in self.failing_pages:
+            return FakeResponse.json_body({"code": 1, "msg": "参数错误"})
+        total = len(self.records)
+        return FakeResponse.json_body({"code": 0, "data": {
+            "content": self.page(page_number, round_index),
+            "total_elements": total,
+            "total_pages": -(-total // self.page_size),
+        }})
+
+
+def test_fetches_all_pages_in_page_order(fake_http):
+    records = _records(25)
+    api = FakePagedApi(records, page_size=10)
+    fake_http(api)
+
+    result = PagedModule().fetch_all_pages(URL, {"page_size": 10}, key_field="id", max_workers=3)
+
+    assert result == records
+    assert sorted(api.requested_pages) == [0, 1, 2]
+
+
+def test_unstable_order_is_deduplicated_and_refetched(fake_http):
+    records = _records(20)
+    # 第一轮排序不稳定：第2页重复了第1页的记录 9，缺少记录 10
+    api = FakePagedApi(records, page_size=10, pages_by_round=[{1: [records[9]] + records[11:20]}])
+    fake_http(api)
+
+    result = PagedModule().fetch_all_pages(URL, {"page_size": 10}, key_field="id")
+
+    assert sorted(record["id"] for record in result) == list(range(20))
+    assert len(result) == 20
+    # 不完整时补拉全部页一轮
+    assert sorted(api.requested_pages) == [0, 0, 1, 1]
+
+
+def test_failed_page_fails_the_whole_fetch(fake_http):
+    api = FakePagedApi(_records(30), page_size=10, failing_pages=[2])
+    fake_http(api)
+
+    assert PagedModule().fetch_all_pages(URL, {"page_size": 10}) is None
+
+
+def test_total_pages_derived_from_total_elements(fake_http):
+    records = _records(15)
+
+    def handler(method, url, headers, json):
+        start = json["page_number"] * 10
+        return FakeResponse.json_body({"code": 0, "data": {
+            "content": records[start:start + 10], "total_elements": len(records),
+        }})
+
+    fake_http(handler)
+
+    assert PagedModule().fetch_all_pages(URL, {"page_size": 10}, key_field="id") == records
+
+
+def test_fetch_all_columns_projects_fields_and_deduplicates(fake_http):
+    records = _records(20)
+    api = FakePagedApi(records, page_size=10, pages_by_round=[{1: [records[9]] + records[11:20]}])
+    fake_http(api)
+
+    columns = PagedModule().fetch_all_columns(URL, {"page_size": 10}, ["name"], key_field="id")
+
+    assert set(columns) == {"name", "id"}
+    assert sorted(columns["id"]) == list(range(20))
+    assert len(columns["name"]) == 20
+    assert dict(zip(columns["id"], columns["name"]))[10] == "门店10"
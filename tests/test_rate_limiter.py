@@ -0,0 +1,108 @@
+"""限流器与重试退避"""
+
+import core.rate_limiter as rate_limiter_module
+import core.request_handler as request_handler_module
+from core.rate_limiter import (
+    TokenBucket, RateLimiter, compute_backoff, parse_retry_after, is_throttle_result,
+)
+from config.settings import RETRY_AFTER_MAX
+from tests.conftest import FakeResponse
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_allows_burst_then_spaces_requests(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter_module.time, "monotonic", clock)
+    bucket = TokenBucket(rate=10, burst=2)
+
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    # 令牌用完后，后续请求按 1/rate 的间隔排队
+    assert abs(bucket.reserve() - 0.1) < 1e-9
+    assert abs(bucket.reserve() - 0.2) < 1e-9
+
+    # 补充时间足够后恢复，但最多积累 burst 个
+    clock.now += 10
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() > 0
+
+
+def test_rate_limiter_uses_longest_prefix_and_records_stats(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter_module.time, "monotonic", clock)
+    limiter = RateLimiter({
+        "https://api.example.com": {"rate": 100, "burst": 100},
+        "https://api.example.com/history": {"rate": 1, "burst": 1},
+    })
+
+    assert limiter.get_group("https://api.example.com/history/list") == "https://api.example.com/history"
+    assert limiter.get_group("https://api.example.com/items") == "https://api.example.com"
+    assert limiter.get_group("https://other.example.com/") is None
+
+    assert limiter.reserve("https://api.example.com/history/list") == 0.0
+    assert limiter.reserve("https://api.example.com/history/list") > 0
+    assert limiter.reserve("https://api.example.com/items") == 0.0
+    assert limiter.reserve("https://other.example.com/") == 0.0
+
+    stats = limiter.get_stats()
+    assert stats["https://api.example.com/history"]["requests"] == 2
+    assert stats["https://api.example.com/history"]["throttled"] == 1
+    assert stats["https://api.example.com"]["throttled"] == 0
+
+
+def test_compute_backoff_honours_retry_after_with_cap():
+    assert compute_backoff(1, retry_after=3) == 3
+    assert compute_backoff(1, retry_after=-5) == 0
+    assert compute_backoff(1, retry_after=RETRY_AFTER_MAX * 10) == RETRY_AFTER_MAX
+    for attempt in range(1, 6):
+        assert 0 <= compute_backoff(attempt) <= rate_limiter_module.RETRY_BACKOFF_MAX
+
+
+def test_parse_retry_after_and_throttle_result():
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after("") is None
+    assert parse_retry_after("not a date") is None
+    assert is_throttle_result({"code": 1, "msg": "请求过于频繁，请稍后再试"})
+    assert not is_throttle_result({"code": 0, "msg": "频繁"})
+    assert not is_throttle_result({"code": 1, "msg": "参数错误"})
+
+
+def test_request_handler_backs_off_on_429_using_retry_after(fake_http, monkeypatch):
+    responses = [
+        FakeResponse(429, headers={"Retry-After": "4"}),
+        FakeResponse.json_body({"code": 0, "data": {"ok": True}}),
+    ]
+    session = fake_http(lambda method, url, headers, json: responses.pop(0))
+    delays = []
+    monkeypatch.setattr(request_handler_module, "compute_backoff",
+                        lambda attempt, retry_after=None: retry_after if retry_after is not None else 0.0)
+    monkeypatch.setattr(request_handler_module.time, "sleep", delays.append)
+
+    handler = request_handler_module.RequestHandler()
+    result = handler.post("https://api.example.com/list", {"page_number": 0})
+
+    assert result == {"code": 0, "data": {"ok": True}}
+    assert len(session.calls) == 2
+    assert delays == [4.0]
+    assert handler.rate_limiter.get_stats()["其他"]["backoff_wait"] == 4.0
+
+
+def test_request_handler_retries_business_throttle(fake_http):
+    responses = [
+        FakeResponse.json_body({"code": 500, "msg": "系统繁忙"}),
+        FakeResponse.json_body({"code": 0, "data": []}),
+    ]
+    session = fake_http(lambda method, url, headers, json: responses.pop(0))
+
+    result = request_handler_module.RequestHandler().post("https://api.example.com/list", {})
+
+    assert result == {"code": 0, "data": []}
+    assert len(session.calls) == 2
@@ -3,22 +3,52 @@
 用于加载原始数据和架构信息表
 """
 
+import threading
 import pandas as pd
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Union
 from config.settings import DOWNLOADS_DIR, REFERENCE_DIR
 from utils.logger import get_logger
 from utils.file_utils import get_module_files
+from utils.frame_cache import get_frame_cache
+from utils.frame_schema import apply_schema
+from utils.frame_registry import get_frame_registry
+from utils.sidecar_cache import get_sidecar_columns, is_sidecar_enabled, load_sidecar, write_sidecar
+from utils.xlsx_reader import read_xlsx
 
 logger = get_logger(__name__)
 
 
+def resolve_columns(columns: List[Union[str, List[str]]], header: List[str]) -> List[str]:
+    """
+    将列声明解析为文件中实际存在的列（按文件中的列顺序）
+    
+    Args:
+        columns: 列声明，每项为列名或候选列名列表（取第一个存在的，与 find_column 一致）
+        header: 文件的列名
+        
+    Returns:
+        文件中存在的列名列表
+    """
+    available = set(header)
+    selected = set()
+    for spec in columns:
+        candidates = [spec] if isinstance(spec, str) else spec
+        for name in candidates:
+            if name in available:
+                selected.add(name)
+                break
+    return [name for name in header if name in selected]
+
+
 class DataLoader:
     """数据加载器"""
     
     def __init__(self):
         self.downloads_dir = DOWNLOADS_DIR
         self.reference_dir = REFERENCE_DIR
+        self._headers: Dict[tuple, List[str]] = {}
+        self._headers_lock = threading.Lock()
         
         # 英文模块名到中文文件名的映射
         self.module_name_mapping = {
@@ -32,12 +62,19 @@ class DataLoader:
             "订单配送": "订单配送",
         }
     
-    def load_latest_module_data(self, module_name: str) -> Optional[pd.DataFrame]:
+    def load_latest_module_data(self, module_name: str,
+                                columns: Optional[List[Union[str, List[str]]]] = None) -> Optional[pd.DataFrame]:
         """
         加载指定模块的最新数据文件
         
+        同一进程内重复加载同一文件时直接使用数据加载缓存，返回的 DataFrame 均为独立副本；
+        指定 columns 时只读取需要的列（列式缓存直接按列读取，xlsx 通过 usecols 读取）；
+        加载后按模块的数据类型表转换为紧凑类型（分类类型等，见 utils/frame_schema.py）
+        
         Args:
             module_name: 模块名称（英文或中文）
+            columns: 需要的列，None 表示全部列；每项为列名或候选列名列表（取文件中第一个存在的），
+                     文件中不存在的列忽略
             
         Returns:
             DataFrame或None
@@ -56,7 +93,39 @@ class DataLoader:
             logger.info(f"加载数据文件: {latest_file}")
             print(f"✅ 找到数据文件: {latest_file.name}")
             
-            df = pd.read_excel(latest_file)
+            if columns is not None:
+                columns = resolve_columns(columns, self._get_header(latest_file))
+            
+            frame_cache = get_frame_cache()
+            df = frame_cache.get(latest_file, columns)
+            if df is not None:
+                logger.info(f"使用已缓存的 {module_name} 数据: {len(df)} 行, {len(df.columns)} 列")
+                print(f"✅ 使用已缓存数据: {len(df)} 行, {len(df.columns)} 列")
+                return df
+            
+            # 下载时已解析过的文件直接使用（内存交接模式），之后由数据加载缓存管理
+            loaded_columns = None
+            df = get_frame_registry().pop(latest_file)
+            if df is not None:
+                logger.info(f"使用下载时已解析的 {module_name} 数据")
+            else:
+                # 已有列式缓存时直接按列读取；没有列式缓存时，启用了列式缓存则解析全部列并生成，
+                # 供之后按列读取，否则只解析需要的列
+                df = load_sidecar(latest_file, columns)
+                if df is not None:
+                    loaded_columns = columns
+                    logger.info(f"使用列式缓存加载 {module_name} 数据")
+                elif columns is not None and not is_sidecar_enabled():
+                    df = read_xlsx(latest_file, usecols=columns)
+                    loaded_columns = columns
+                else:
+                    df = read_xlsx(latest_file)
+                    write_sidecar(latest_file, df)
+            
+            # 转换为紧凑类型后缓存；读取了全部列时缓存全部列，同一文件之后请求任意列都可以直接命中
+            df = frame_cache.put(latest_file, apply_schema(df, file_name_prefix), loaded_columns)
+            if columns is not None and loaded_columns is None:
+                df = df[columns]
             logger.info(f"成功加载 {module_name} 数据: {len(df)} 行, {len(df.columns)} 列")
             print(f"✅ 成功加载数据: {len(df)} 行, {len(df.columns)} 列")
             return df
@@ -66,6 +135,30 @@ class DataLoader:
             print(f"❌ 加载 {module_name} 数据失败: {str(e)}")
             return None
     
+    def _get_header(self, file_path: Path) -> List[str]:
+        """
+        获取数据文件的列名（每个文件版本只读取一次）
+        
+        有列式缓存时读取其结构，否则只读取 xlsx 的表头行
+        
+        Args:
+            file_path: 数据文件路径
+            
+        Returns:
+            列名列表
+        """
+        stat = file_path.stat()
+        key = (str(file_path.resolve()), stat.st_mtime_ns, stat.st_size)
+        with self._headers_lock:
+            header = self._headers.get(key)
+        if header is None:
+            header = get_sidecar_columns(file_path)
+            if header is None:
+                header = list(read_xlsx(file_path, nrows=0).columns)
+            with self._headers_lock:
+                self._headers[key] = header
+        return header
+    
     def load_reference_data(self, reference_name: str) -> Optional[pd.DataFrame]:
         """
         加载架构信息表
@@ -82,7 +175,10 @@ class DataLoader:
                 logger.warning(f"架构信息表不存在: {file_path}")
                 return None
             
-            df = pd.read_excel(file_path)
+            frame_cache = get_frame_cache()
+            df = frame_cache.get(file_path)
+            if df is None:
+                df = frame_cache.put(file_path, read_xlsx(file_path))
             logger.info(f"成功加载架构信息表 {reference_name}: {len(df)} 行, {len(df.columns)} 列")
             return df
             
@@ -113,6 +209,14 @@ class DataLoader:
         return data_dict
 
 
+_data_loader: Optional[DataLoader] = None
+_data_loader_lock = threading.Lock()
+
+
 def get_data_loader() -> DataLoader:
-    """获取数据加载器实例"""
-    return DataLoader()
+    """获取进程级共享的数据加载器实例"""
+    global _data_loader
+    with _data_loader_lock:
+        if _data_loader is None:
+            _data_loader = DataLoader()
+        return _data_loader
@@ -6,6 +6,7 @@ from pathlib import Path
 from typing import Optional, List
 from datetime import datetime
 from config.settings import FILE_NAME_DATE_FORMAT
+from utils.sidecar_cache import remove_sidecar, remove_orphan_sidecars
 
 
 def generate_timestamped_filename(module_name: str, extension: str = "xlsx") -> str:
@@ -90,11 +91,15 @@ def cleanup_module_files(directory: Path, module_name: str, keep_latest: int = 1
     for file_path in files_to_delete:
         try:
             file_path.unlink()
+            remove_sidecar(file_path)
             deleted_count += 1
             print(f"[删除] 删除历史文件: {file_path.name}")
         except Exception as e:
             print(f"[错误] 删除文件失败 {file_path.name}: {str(e)}")
     
+    # 源文件已被其他方式删除的列式缓存一并清理
+    remove_orphan_sidecars(directory, module_name)
+    
     return deleted_count
 
 
@@ -0,0 +1,201 @@
+"""
+进程级数据帧缓存
+按 (文件路径, 修改时间, 大小, 请求的列) 缓存已加载的数据，按内存预算做 LRU 淘汰；
+写时复制开启时（pandas 3 起始终开启）取出浅拷贝，否则取出深拷贝，调用方修改都不会影响缓存
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Dict, Any, Tuple, Iterable
+import pandas as pd
+from config.settings import LOADER_CACHE_ENABLED, LOADER_CACHE_MAX_BYTES
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+# 估算文本列内存时的抽样行数
+_SIZE_SAMPLE_ROWS = 1000
+
+
+def estimate_frame_bytes(df: pd.DataFrame) -> int:
+    """
+    估算数据占用的内存（字节）
+
+    数值、分类等列按实际内存计算；文本列按抽样行的平均字符串大小估算，避免逐个统计全部字符串
+
+    Args:
+        df: 数据
+
+    Returns:
+        int: 估算字节数
+    """
+    size = int(df.memory_usage(index=True, deep=False).sum())
+    rows = len(df)
+    if not rows:
+        return size
+    step = max(1, rows // _SIZE_SAMPLE_ROWS)
+    for position, dtype in enumerate(df.dtypes):
+        # 元素为 Python 对象的列（object 以及 python 存储的字符串类型）浅层统计不含字符串本身
+        if dtype != object and getattr(dtype, "storage", None) != "python":
+            continue
+        sample = df.iloc[::step, position]
+        size += int(sum(sys.getsizeof(value) for value in sample) / len(sample) * rows)
+    return size
+
+
+def _copy_on_write_active() -> bool:
+    """
+    pandas 写时复制是否开启（pandas 3 起始终开启；pandas 2 由调用方通过 pd.options 开启，这里不修改全局选项）
+
+    Returns:
+        bool: 是否开启
+    """
+    if int(pd.__version__.split(".")[0]) >= 3:
+        return True
+    return pd.options.mode.copy_on_write is True
+
+
+class FrameCache:
+    """LRU 数据帧缓存（线程安全）"""
+
+    def __init__(self, max_bytes: int = LOADER_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def make_key(file_path: Path, columns: Optional[Iterable[str]] = None) -> Tuple:
+        """
+        生成缓存键（文件被替换后修改时间或大小变化，旧条目自然失效）
+
+        Args:
+            file_path: 数据文件路径
+            columns: 请求的列，None 表示全部列
+
+        Returns:
+            Tuple: 缓存键
+        """
+        stat = file_path.stat()
+        return (str(file_path.resolve()), stat.st_mtime_ns, stat.st_size,
+                tuple(columns) if columns is not None else None)
+
+    @staticmethod
+    def _hand_out(df: pd.DataFrame) -> pd.DataFrame:
+        """返回可由调用方随意修改的副本（写时复制下为浅拷贝）"""
+        return df.copy(deep=not _copy_on_write_active())
+
+    def get(self, file_path: Path, columns: Optional[Iterable[str]] = None) -> Optional[pd.DataFrame]:
+        """
+        获取缓存的数据
+
+        请求部分列时，缓存中有同一文件的全部列数据也视为命中，直接从中取出所需列
+
+        Args:
+            file_path: 数据文件路径
+            columns: 请求的列，None 表示全部列
+
+        Returns:
+            数据副本，未命中返回None
+        """
+        if not LOADER_CACHE_ENABLED:
+            return None
+
+        key = self.make_key(file_path, columns)
+        full_key = key[:3] + (None,)
+        with self._lock:
+            for candidate in (key, full_key):
+                entry = self._entries.get(candidate)
+                if entry is None:
+                    continue
+                df = entry["frame"]
+                if candidate is full_key and key != full_key:
+                    if not set(key[3]).issubset(df.columns):
+                        continue
+                    df = df[list(key[3])]
+                self._entries.move_to_end(candidate)
+                self._stats["hits"] += 1
+                break
+            else:
+                self._stats["misses"] += 1
+                return None
+        return self._hand_out(df)
+
+    def put(self, file_path: Path, df: pd.DataFrame, columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """
+        缓存数据并返回调用方可修改的副本
+
+        数据大小在加入时估算一次；超过内存预算的单个数据不缓存，加入后超出预算时按最久未使用淘汰
+
+        Args:
+            file_path: 数据文件路径
+            df: 加载得到的数据（之后由缓存持有，调用方不应再修改）
+            columns: df 对应的请求列，None 表示全部列
+
+        Returns:
+            数据副本
+        """
+        if not LOADER_CACHE_ENABLED:
+            return df
+
+        size = estimate_frame_bytes(df)
+        if size > self.max_bytes:
+            logger.info(f"数据大小 {size / 1024 / 1024:.1f} MB 超过缓存预算，不缓存: {file_path.name}")
+            return df
+
+        key = self.make_key(file_path, columns)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous["bytes"]
+            self._entries[key] = {"frame": df, "bytes": size}
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                evicted_key, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted["bytes"]
+                self._stats["evictions"] += 1
+                logger.info(f"数据缓存超出预算，淘汰: {Path(evicted_key[0]).name}")
+        return self._hand_out(df)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取缓存统计
+
+        Returns:
+            Dict: {hits: 命中次数, misses: 未命中次数, evictions: 淘汰次数, entries: 条目数, bytes: 常驻字节数}
+        """
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries), "bytes": self._bytes}
+
+    def log_stats(self):
+        """记录缓存统计"""
+        stats = self.get_stats()
+        if not stats["hits"] and not stats["misses"]:
+            return
+        logger.info(f"数据加载缓存: 命中 {stats['hits']} 次，未命中 {stats['misses']} 次，"
+                    f"淘汰 {stats['evictions']} 次，常驻 {stats['entries']} 个数据 "
+                    f"{stats['bytes'] / 1024 / 1024:.1f} MB")
+
+
+_frame_cache: Optional[FrameCache] = None
+_frame_cache_lock = threading.Lock()
+
+
+def get_frame_cache() -> FrameCache:
+    """获取进程级共享的数据帧缓存"""
+    global _frame_cache
+    with _frame_cache_lock:
+        if _frame_cache is None:
+            _frame_cache = FrameCache()
+        return _frame_cache
@@ -0,0 +1,226 @@
+"""
+已解析数据登记表
+下载完成时直接解析的数据按文件登记，同一进程内的报表加载同一文件时不再重复读取和解析；
+解析在独立的有界线程池中进行，不占用下载线程
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+from typing import Optional, Dict, Any
+import pandas as pd
+from config.settings import IN_MEMORY_HANDOFF_ENABLED, HANDOFF_PARSE_WORKERS, SIDECAR_WRITE_ON_DOWNLOAD
+from utils.logger import get_logger
+from utils.sidecar_cache import is_sidecar_enabled, write_sidecar
+from utils.xlsx_reader import read_xlsx, get_module_prefix
+
+logger = get_logger(__name__)
+
+
+class FrameRegistry:
+    """按文件路径登记已解析的 DataFrame（文件被替换或删除后登记自动失效）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._frames: Dict[str, Dict[str, Any]] = {}
+        self._pending: Dict[str, Future] = {}
+
+    @staticmethod
+    def _file_signature(file_path: Path):
+        """文件签名（修改时间+大小），用于判断登记的数据是否仍与文件一致"""
+        stat = file_path.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def track(self, file_path: Path, future: Future):
+        """
+        登记正在解析的文件，解析结束前 get / pop 等待解析完成，不会重复解析同一文件
+
+        Args:
+            file_path: 文件路径
+            future: 解析任务
+        """
+        key = str(Path(file_path).resolve())
+        with self._lock:
+            self._pending[key] = future
+        future.add_done_callback(lambda _: self._untrack(key, future))
+
+    def _untrack(self, key: str, future: Future):
+        with self._lock:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+
+    def _wait_pending(self, key: str):
+        """等待该文件正在进行的解析（解析失败时由调用方自行读取文件）"""
+        with self._lock:
+            future = self._pending.get(key)
+        if future is not None:
+            try:
+                future.result()
+            except Exception:
+                pass
+
+    def register_bytes(self, file_path: Path, data: bytes) -> Optional[pd.DataFrame]:
+        """
+        从内存中的文件内容解析并登记数据（文件本身已落盘，用于留档）
+
+        Args:
+            file_path: 已保存的文件路径
+            data: 文件内容
+
+        Returns:
+            解析后的 DataFrame，解析失败返回None
+        """
+        try:
+            df = read_xlsx(BytesIO(data), module_name=get_module_prefix(file_path))
+        except Exception as e:
+            logger.warning(f"解析下载内容失败，将在加载时从文件读取: {file_path.name} ({str(e)})")
+            return None
+
+        self.register(file_path, df)
+        return df
+
+    def register(self, file_path: Path, df: pd.DataFrame):
+        """
+        登记文件对应的已解析数据
+
+        Args:
+            file_path: 文件路径
+            df: 该文件解析后的数据
+        """
+        key = str(Path(file_path).resolve())
+        with self._lock:
+            self._frames[key] = {"signature": self._file_signature(Path(file_path)), "frame": df}
+        logger.info(f"登记已解析数据: {Path(file_path).name} ({len(df)} 行, {len(df.columns)} 列)")
+
+    def get(self, file_path: Path) -> Optional[pd.DataFrame]:
+        """
+        获取文件对应的已解析数据
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            DataFrame 副本（调用方可以随意修改），未登记或文件已变化返回None
+        """
+        key = str(Path(file_path).resolve())
+        self._wait_pending(key)
+        with self._lock:
+            entry = self._frames.get(key)
+        if entry is None:
+            return None
+
+        try:
+            if self._file_signature(Path(file_path)) != entry["signature"]:
+                raise FileNotFoundError
+        except FileNotFoundError:
+            with self._lock:
+                self._frames.pop(key, None)
+            return None
+
+        return entry["frame"].copy()
+
+    def pop(self, file_path: Path) -> Optional[pd.DataFrame]:
+        """
+        取出文件对应的已解析数据并移除登记（交由数据加载缓存按内存预算管理）
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            登记的 DataFrame（不复制），未登记或文件已变化返回None
+        """
+        key = str(Path(file_path).resolve())
+        self._wait_pending(key)
+        with self._lock:
+            entry = self._frames.pop(key, None)
+        if entry is None:
+            return None
+
+        try:
+            if self._file_signature(Path(file_path)) != entry["signature"]:
+                return None
+        except FileNotFoundError:
+            return None
+        return entry["frame"]
+
+    def clear(self):
+        """清空登记表"""
+        with self._lock:
+            self._frames.clear()
+
+
+_frame_registry: Optional[FrameRegistry] = None
+_frame_registry_lock = threading.Lock()
+
+
+def get_frame_registry() -> FrameRegistry:
+    """获取进程级共享的已解析数据登记表"""
+    global _frame_registry
+    with _frame_registry_lock:
+        if _frame_registry is None:
+            _frame_registry = FrameRegistry()
+        return _frame_registry
+
+
+def is_handoff_enabled() -> bool:
+    """下载完成后是否需要解析（内存交接，或下载时生成列式缓存）"""
+    return IN_MEMORY_HANDOFF_ENABLED or (SIDECAR_WRITE_ON_DOWNLOAD and is_sidecar_enabled())
+
+
+_parse_executor: Optional[ThreadPoolExecutor] = None
+_parse_executor_lock = threading.Lock()
+
+
+def _get_parse_executor() -> ThreadPoolExecutor:
+    """获取下载后解析使用的线程池（线程数由 HANDOFF_PARSE_WORKERS 限制）"""
+    global _parse_executor
+    with _parse_executor_lock:
+        if _parse_executor is None:
+            _parse_executor = ThreadPoolExecutor(max_workers=max(1, HANDOFF_PARSE_WORKERS),
+                                                 thread_name_prefix="handoff-parse")
+        return _parse_executor
+
+
+def _parse_downloaded_file(file_path: Path, content: Optional[bytes]):
+    """解析下载完成的文件，登记数据和/或写入列式缓存"""
+    try:
+        # 下载时收集的内容不完整（续传、分段下载）时从文件读取
+        data = content if content is not None and len(content) == file_path.stat().st_size \
+            else file_path.read_bytes()
+    except OSError as e:
+        logger.warning(f"读取下载文件失败，跳过下载后解析: {file_path.name} ({str(e)})")
+        return
+
+    if IN_MEMORY_HANDOFF_ENABLED:
+        df = get_frame_registry().register_bytes(file_path, data)
+    else:
+        try:
+            df = read_xlsx(BytesIO(data), module_name=get_module_prefix(file_path))
+        except Exception as e:
+            logger.warning(f"解析下载文件失败，将在加载时生成列式缓存: {file_path.name} ({str(e)})")
+            return
+
+    if df is not None and SIDECAR_WRITE_ON_DOWNLOAD and is_sidecar_enabled():
+        write_sidecar(file_path, df)
+
+
+def handoff_downloaded_file(file_path: Optional[Path], content: Optional[bytes] = None) -> Optional[Future]:
+    """
+    下载完成后的数据交接：
+    内存交接模式下解析并登记；启用下载时生成列式缓存时同时写入列式文件。
+    解析提交到独立线程池后立即返回，加载同一文件时等待解析完成
+
+    Args:
+        file_path: 下载完成的文件路径，None 时忽略
+        content: 下载时收集的文件内容，None 或不完整时从文件读取
+
+    Returns:
+        解析任务，无需解析时返回None
+    """
+    if not file_path or file_path.suffix.lower() not in (".xlsx", ".xls") or not is_handoff_enabled():
+        return None
+
+    future = _get_parse_executor().submit(_parse_downloaded_file, file_path, content)
+    get_frame_registry().track(file_path, future)
+    return future
@@ -0,0 +1,154 @@
+"""
+模块数据类型表
+加载数据时按模块应用紧凑类型：重复度高的文本列转为分类类型，商品代码转为定宽整数，
+数量转为紧凑的整数类型（有空值时使用可空整数），以降低内存占用并加快分组和关联
+"""
+
+from typing import Dict, Optional
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_float_dtype, is_integer_dtype, is_numeric_dtype
+from config.settings import FRAME_SCHEMA_ENABLED
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+KIND_CATEGORY = "category"  # 低基数文本：转为分类类型
+KIND_CODE = "code"          # 数字编码：转为定宽整数（至少 int32）
+KIND_QUANTITY = "quantity"  # 数量：全部为整数值时转为紧凑整数（至少 int32，避免逐行运算溢出）
+
+# 不同值占比超过该比例的文本列不转为分类类型（转换后反而更占内存）
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+# 模块名称（文件名前缀） -> 列名 -> 类型；文件中不存在的列忽略
+MODULE_SCHEMAS: Dict[str, Dict[str, str]] = {
+    "库存查询": {
+        "仓库": KIND_CATEGORY,
+        "门店": KIND_CATEGORY,
+        "一级分类": KIND_CATEGORY,
+        "二级分类": KIND_CATEGORY,
+        "商品名称": KIND_CATEGORY,
+        "商品代码": KIND_CODE,
+        "数量": KIND_QUANTITY,
+        "可用数量": KIND_QUANTITY,
+    },
+    "门店商品属性": {
+        "门店": KIND_CATEGORY,
+        "停购": KIND_CATEGORY,
+        "停止要货": KIND_CATEGORY,
+        "商品代码": KIND_CODE,
+    },
+    "组织商品档案": {
+        "一级分类": KIND_CATEGORY,
+        "二级分类": KIND_CATEGORY,
+        "商品代码": KIND_CODE,
+    },
+    "商品销售数据": {
+        "门店名称": KIND_CATEGORY,
+        "一级类别": KIND_CATEGORY,
+        "二级类别": KIND_CATEGORY,
+        "三级类别": KIND_CATEGORY,
+        "商品名称": KIND_CATEGORY,
+        "采购规格": KIND_CATEGORY,
+        "基本单位": KIND_CATEGORY,
+        "商品代码": KIND_CODE,
+        "数量合计": KIND_QUANTITY,
+    },
+    # 配送分析的表头在第一行数据中，加载时列名无法匹配，由报表恢复表头后调用 apply_schema
+    "配送分析": {
+        "调出门店": KIND_CATEGORY,
+        "商品类别名称": KIND_CATEGORY,
+        "一级分类": KIND_CATEGORY,
+    },
+}
+
+
+def _to_category(series: pd.Series) -> pd.Series:
+    """文本列的不同值占比不超过阈值时转为分类类型"""
+    if isinstance(series.dtype, pd.CategoricalDtype) or is_numeric_dtype(series.dtype):
+        return series
+    if series.nunique(dropna=True) > len(series) * CATEGORY_MAX_UNIQUE_RATIO:
+        return series
+    return series.astype("category")
+
+
+def _to_compact_int(series: pd.Series) -> pd.Series:
+    """
+    全部为整数值的数值列转为能容纳其取值的最小整数类型（至少 32 位）
+
+    没有空值时使用 numpy 整数，有空值时使用可空整数；含小数或非数值的列保持不变
+    """
+    if is_bool_dtype(series.dtype) or not is_numeric_dtype(series.dtype):
+        return series
+    values = series.dropna()
+    if values.empty:
+        return series
+    if is_float_dtype(series.dtype) and not (values == np.floor(values)).all():
+        return series
+
+    low, high = values.min(), values.max()
+    bits = 32 if np.iinfo(np.int32).min <= low and high <= np.iinfo(np.int32).max else 64
+    dtype = f"Int{bits}" if len(values) < len(series) else f"int{bits}"
+    if is_integer_dtype(series.dtype) and series.dtype == dtype:
+        return series
+    return series.astype(dtype)
+
+
+_CONVERTERS = {
+    KIND_CATEGORY: _to_category,
+    KIND_CODE: _to_compact_int,
+    KIND_QUANTITY: _to_compact_int,
+}
+
+
+def apply_schema(df: pd.DataFrame, module_name: str) -> pd.DataFrame:
+    """
+    按模块的数据类型表转换列类型（只转换文件中存在且符合条件的列）
+
+    Args:
+        df: 加载得到的数据
+        module_name: 模块名称（文件名前缀）
+
+    Returns:
+        转换后的 DataFrame，未启用或没有对应类型表时原样返回
+    """
+    schema: Optional[Dict[str, str]] = MODULE_SCHEMAS.get(module_name)
+    if not FRAME_SCHEMA_ENABLED or not schema or df.empty:
+        return df
+
+    converted = {}
+    for column, kind in schema.items():
+        if column not in df.columns or not isinstance(df[column], pd.Series):
+            continue
+        try:
+            series = _CONVERTERS[kind](df[column])
+        except (TypeError, ValueError) as e:
+            logger.warning(f"转换列类型失败，保持原类型: {module_name}.{column} ({str(e)})")
+            continue
+        if series is not df[column]:
+            converted[column] = series
+
+    if not converted:
+        return df
+    before = df.memory_usage(deep=True).sum()
+    df = df.assign(**converted)
+    after = df.memory_usage(deep=True).sum()
+    logger.info(f"{module_name} 数据类型转换: {len(converted)} 列，内存 "
+                f"{before / 1024 / 1024:.1f} MB -> {after / 1024 / 1024:.1f} MB")
+    return df
+
+
+def fill_blank(series: pd.Series, value: str = "") -> pd.Series:
+    """
+    填充空值（分类类型的列先加入填充值作为类别，避免 fillna 报错）
+
+    Args:
+        series: 列数据
+        value: 填充值
+
+    Returns:
+        填充后的列
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype) and value not in series.cat.categories:
+        series = series.cat.add_categories([value])
+    return series.fillna(value)
@@ -0,0 +1,208 @@
+"""
+列式旁路缓存
+xlsx 解析一次后另存为 Parquet/Feather 文件（需要 pyarrow），
+以源文件的大小、修改时间和内容哈希校验，之后加载同一文件时直接读取列式文件
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+import pandas as pd
+from config.settings import SIDECAR_CACHE_ENABLED, SIDECAR_FORMAT, SIDECAR_DIR_NAME
+from utils.logger import get_logger
+
+try:
+    import pyarrow  # noqa: F401  pandas 读写 Parquet/Feather 需要
+except ImportError:  # pyarrow 为可选依赖，未安装时不使用旁路缓存
+    pyarrow = None
+
+logger = get_logger(__name__)
+
+
+def is_sidecar_enabled() -> bool:
+    """旁路缓存是否可用（已启用且安装了 pyarrow）"""
+    return SIDECAR_CACHE_ENABLED and pyarrow is not None
+
+
+def get_sidecar_paths(source: Path):
+    """
+    获取源文件对应的列式文件和校验信息文件路径
+
+    Args:
+        source: 源 xlsx 文件路径
+
+    Returns:
+        (列式文件路径, 校验信息文件路径)
+    """
+    sidecar_dir = source.parent / SIDECAR_DIR_NAME
+    return sidecar_dir / f"{source.stem}.{SIDECAR_FORMAT}", sidecar_dir / f"{source.stem}.json"
+
+
+def _file_hash(path: Path) -> str:
+    """计算文件内容的 sha256"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _source_signature(source: Path, with_hash: bool = True) -> Dict[str, Any]:
+    """源文件签名：大小、修改时间（纳秒）及内容哈希"""
+    stat = source.stat()
+    signature = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if with_hash:
+        signature["sha256"] = _file_hash(source)
+    return signature
+
+
+def _is_valid(source: Path, meta_path: Path) -> bool:
+    """
+    校验列式文件是否仍对应源文件
+
+    大小和修改时间一致直接视为有效；大小一致但修改时间变化时比较内容哈希，
+    内容未变则更新记录的修改时间
+    """
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+
+    current = _source_signature(source, with_hash=False)
+    if current["size"] != meta.get("size"):
+        return False
+    if current["mtime_ns"] == meta.get("mtime_ns"):
+        return True
+
+    if _file_hash(source) != meta.get("sha256"):
+        return False
+    meta["mtime_ns"] = current["mtime_ns"]
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    return True
+
+
+def get_sidecar_columns(source: Path) -> Optional[List[str]]:
+    """
+    读取列式缓存的列名（只读取文件结构，不读取数据）
+
+    Args:
+        source: 源 xlsx 文件路径
+
+    Returns:
+        列名列表，缓存不存在、已失效或读取失败返回None
+    """
+    if not is_sidecar_enabled():
+        return None
+
+    sidecar_path, meta_path = get_sidecar_paths(source)
+    if not sidecar_path.is_file() or not _is_valid(source, meta_path):
+        return None
+
+    try:
+        if SIDECAR_FORMAT == "feather":
+            import pyarrow.ipc
+            with pyarrow.ipc.open_file(sidecar_path) as reader:
+                return list(reader.schema.names)
+        import pyarrow.parquet
+        return list(pyarrow.parquet.read_schema(sidecar_path).names)
+    except Exception as e:
+        logger.warning(f"读取列式缓存结构失败: {sidecar_path.name} ({str(e)})")
+        return None
+
+
+def load_sidecar(source: Path, columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+    """
+    读取源文件对应的列式缓存
+
+    Args:
+        source: 源 xlsx 文件路径
+        columns: 只读取这些列，None 表示全部列
+
+    Returns:
+        DataFrame，缓存不存在、已失效或读取失败返回None
+    """
+    if not is_sidecar_enabled():
+        return None
+
+    sidecar_path, meta_path = get_sidecar_paths(source)
+    if not sidecar_path.is_file() or not _is_valid(source, meta_path):
+        return None
+
+    try:
+        if SIDECAR_FORMAT == "feather":
+            return pd.read_feather(sidecar_path, columns=columns)
+        return pd.read_parquet(sidecar_path, columns=columns)
+    except Exception as e:
+        logger.warning(f"读取列式缓存失败，改为读取原文件: {sidecar_path.name} ({str(e)})")
+        return None
+
+
+def write_sidecar(source: Path, df: pd.DataFrame) -> Optional[Path]:
+    """
+    为源文件写入列式缓存（先写临时文件再替换）
+
+    列类型无法用列式格式表示时（如同一列混有数字和文本）跳过，不影响加载
+
+    Args:
+        source: 源 xlsx 文件路径
+        df: 源文件解析后的数据
+
+    Returns:
+        列式文件路径，未写入返回None
+    """
+    if not is_sidecar_enabled():
+        return None
+
+    sidecar_path, meta_path = get_sidecar_paths(source)
+    temp_path = sidecar_path.with_name(sidecar_path.name + ".tmp")
+    try:
+        sidecar_path.parent.mkdir(parents=True, exist_ok=True)
+        if SIDECAR_FORMAT == "feather":
+            df.reset_index(drop=True).to_feather(temp_path)
+        else:
+            df.to_parquet(temp_path, index=False)
+        temp_path.replace(sidecar_path)
+
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(_source_signature(source), f)
+    except Exception as e:
+        temp_path.unlink(missing_ok=True)
+        logger.warning(f"生成列式缓存失败，将继续读取原文件: {source.name} ({str(e)})")
+        return None
+
+    logger.info(f"已生成列式缓存: {sidecar_path.name}")
+    return sidecar_path
+
+
+def remove_sidecar(source: Path):
+    """删除源文件对应的列式缓存"""
+    for path in get_sidecar_paths(source):
+        path.unlink(missing_ok=True)
+
+
+def remove_orphan_sidecars(directory: Path, module_name: str) -> int:
+    """
+    删除源文件已不存在的列式缓存
+
+    Args:
+        directory: 源文件所在目录
+        module_name: 模块名称（文件名前缀）
+
+    Returns:
+        删除的缓存数量
+    """
+    sidecar_dir = directory / SIDECAR_DIR_NAME
+    if not sidecar_dir.is_dir():
+        return 0
+
+    removed = 0
+    for path in sidecar_dir.glob(f"{module_name}_*"):
+        # 列式文件、校验信息及残留的临时文件都以源文件名（不含扩展名）开头
+        source = directory / f"{path.name.split('.', 1)[0]}.xlsx"
+        if not source.exists():
+            path.unlink(missing_ok=True)
+            removed += 1
+    return removed
@@ -0,0 +1,197 @@
+"""
+xlsx 读取引擎基准测试
+对下载目录中各模块的最新导出文件（及架构信息表）分别用 openpyxl 和 calamine 解析，
+比较解析速度，并校验两者读取结果的类型和值是否完全一致；校验结果按模块（文件名前缀）保存，
+供 auto 模式为各模块分别选择引擎
+
+用法: python -m utils.xlsx_benchmark [文件 ...] [--repeats N]
+"""
+
+import argparse
+import datetime
+import time
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+import pandas as pd
+from config.settings import DOWNLOADS_DIR, REFERENCE_DIR
+from utils.logger import get_logger
+from utils.xlsx_reader import (
+    ENGINE_OPENPYXL, ENGINE_CALAMINE, get_engine_versions, get_module_prefix,
+    is_calamine_available, get_module_check_results, save_check_result,
+)
+
+logger = get_logger(__name__)
+
+
+def collect_corpus() -> List[Path]:
+    """
+    收集测试文件：下载目录中每个模块的最新文件，以及全部架构信息表
+
+    Returns:
+        List[Path]: 文件路径列表
+    """
+    latest: Dict[str, Path] = {}
+    for path in DOWNLOADS_DIR.glob("*.xlsx"):
+        prefix = get_module_prefix(path)
+        if prefix not in latest or path.stat().st_mtime > latest[prefix].stat().st_mtime:
+            latest[prefix] = path
+    return sorted(latest.values()) + sorted(REFERENCE_DIR.glob("*.xlsx"))
+
+
+def _time_read(path: Path, engine: str, repeats: int):
+    """多次读取文件，返回 (最短耗时秒数, 读取结果)"""
+    best = None
+    df = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        df = pd.read_excel(path, engine=engine)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, df
+
+
+def compare_frames(expected: pd.DataFrame, actual: pd.DataFrame) -> Optional[str]:
+    """
+    比较两个引擎的读取结果（列名、类型和值必须完全一致）
+
+    Returns:
+        第一处差异的说明，完全一致返回None
+    """
+    try:
+        pd.testing.assert_frame_equal(expected, actual, check_exact=True)
+    except AssertionError as e:
+        return str(e).strip().splitlines()[0] if str(e).strip() else "结果不一致"
+    return None
+
+
+def benchmark_file(path: Path, engines: List[str], repeats: int) -> Dict[str, Any]:
+    """
+    测试单个文件
+
+    Args:
+        path: 文件路径
+        engines: 参与测试的引擎，第一个作为一致性比较的基准
+        repeats: 每个引擎的读取次数（取最短耗时）
+
+    Returns:
+        Dict: {file, size, rows, columns, timings: 引擎 -> 秒数, difference: 与基准的差异（一致为None）}
+    """
+    result = {"file": path.name, "size": path.stat().st_size, "timings": {}, "difference": None}
+    baseline = None
+    for engine in engines:
+        elapsed, df = _time_read(path, engine, repeats)
+        result["timings"][engine] = elapsed
+        if baseline is None:
+            baseline = df
+            result["rows"], result["columns"] = df.shape
+        elif result["difference"] is None:
+            difference = compare_frames(baseline, df)
+            if difference:
+                result["difference"] = f"{engine}: {difference}"
+    return result
+
+
+def print_results(results: List[Dict[str, Any]], engines: List[str]):
+    """打印各文件的解析耗时和吞吐量"""
+    print(f"\n{'文件':<40} {'行数':>8} {'列数':>5} " + " ".join(f"{engine:>22}" for engine in engines) + "  一致")
+    for result in results:
+        cells = []
+        for engine in engines:
+            elapsed = result["timings"][engine]
+            cells.append(f"{elapsed:7.2f}s {result['rows'] / elapsed:8.0f}行/s".rjust(22))
+        same = "-" if len(engines) == 1 else ("✅" if result["difference"] is None else "❌")
+        print(f"{result['file']:<40} {result['rows']:>8} {result['columns']:>5} " + " ".join(cells) + f"  {same}")
+        if result["difference"]:
+            print(f"    差异: {result['difference']}")
+
+    if len(engines) > 1:
+        totals = {engine: sum(result["timings"][engine] for result in results) for engine in engines}
+        speedup = totals[engines[0]] / totals[engines[1]] if totals[engines[1]] else 0
+        print(f"\n合计: " + ", ".join(f"{engine} {totals[engine]:.2f}s" for engine in engines)
+              + f"（{engines[1]} 为 {engines[0]} 的 {speedup:.1f} 倍速）")
+
+
+def run_benchmark(files: Optional[List[Path]] = None, repeats: int = 3) -> List[Dict[str, Any]]:
+    """
+    运行基准测试；calamine 可用时按模块保存一致性校验结果
+
+    Args:
+        files: 测试文件，None 时使用 collect_corpus 收集的文件
+        repeats: 每个引擎的读取次数
+
+    Returns:
+        各文件的测试结果
+    """
+    files = files if files is not None else collect_corpus()
+    if not files:
+        print("❌ 没有可测试的 xlsx 文件")
+        return []
+
+    engines = [ENGINE_OPENPYXL]
+    if is_calamine_available():
+        engines.append(ENGINE_CALAMINE)
+    else:
+        print("⚠️ 未安装 python-calamine（或 pandas 低于 2.2），只测试 openpyxl")
+
+    results = []
+    failed = []
+    for path in files:
+        try:
+            results.append(benchmark_file(path, engines, repeats))
+        except Exception as e:
+            failed.append(path.name)
+            logger.error(f"测试文件失败: {path.name} ({str(e)})")
+            print(f"❌ 测试文件失败: {path.name} ({str(e)})")
+    print_results(results, engines)
+
+    if ENGINE_CALAMINE in engines and (results or failed):
+        save_module_verdicts(results, failed)
+    return results
+
+
+def save_module_verdicts(results: List[Dict[str, Any]], failed: List[str]):
+    """
+    按模块（文件名前缀）保存一致性校验结果
+
+    只更新本次参与测试的模块，其他模块沿用之前的结果（库版本变化时旧结果全部作废）；
+    同一模块的文件必须全部一致，测试失败的文件视为不一致
+
+    Args:
+        results: 各文件的测试结果
+        failed: 测试失败的文件名
+    """
+    checked_at = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    verdicts: Dict[str, Dict[str, Any]] = {}
+    entries = [(result["file"], result["difference"] is None) for result in results]
+    entries += [(name, False) for name in failed]
+    for name, identical in entries:
+        verdict = verdicts.setdefault(get_module_prefix(name),
+                                      {"identical": True, "files": [], "checked_at": checked_at})
+        verdict["identical"] = verdict["identical"] and identical
+        verdict["files"].append(name)
+
+    modules = get_module_check_results()
+    modules.update(verdicts)
+    save_check_result({"versions": get_engine_versions(), "modules": modules})
+
+    for prefix, verdict in sorted(verdicts.items()):
+        if verdict["identical"]:
+            print(f"✅ {prefix}: calamine 与 openpyxl 结果完全一致，auto 模式将使用 calamine")
+        else:
+            print(f"❌ {prefix}: calamine 与 openpyxl 结果存在差异，auto 模式继续使用 openpyxl")
+    unchecked = sorted({get_module_prefix(path) for path in collect_corpus()} - set(modules))
+    if unchecked:
+        print(f"⚠️ 以下模块尚未校验，auto 模式使用 openpyxl: {', '.join(unchecked)}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="xlsx 读取引擎基准测试")
+    parser.add_argument("files", nargs="*", type=Path, help="测试文件（默认使用下载目录中各模块的最新文件和架构信息表）")
+    parser.add_argument("--repeats", type=int, default=3, help="每个引擎的读取次数（取最短耗时）")
+    args = parser.parse_args()
+    run_benchmark(args.files or None, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+xlsx 读取引擎
+所有 xlsx 解析统一经过 read_xlsx，按配置选择 openpyxl 或 calamine（Rust 实现，解析更快）；
+auto 模式下只有基准测试确认 calamine 与 openpyxl 在该模块文件上结果完全一致后才使用 calamine
+"""
+
+import json
+from importlib import metadata
+from pathlib import Path
+from typing import Optional, Dict, Any
+import pandas as pd
+from config.settings import XLSX_READER_ENGINE, XLSX_READER_MODULE_ENGINES, XLSX_READER_CHECK_FILE
+from utils.logger import get_logger
+
+try:
+    import python_calamine
+except ImportError:  # python-calamine 为可选依赖，未安装时使用 openpyxl
+    python_calamine = None
+
+logger = get_logger(__name__)
+
+ENGINE_OPENPYXL = "openpyxl"
+ENGINE_CALAMINE = "calamine"
+ENGINE_AUTO = "auto"
+
+_check_result: Optional[Dict[str, Any]] = None
+
+
+def is_calamine_available() -> bool:
+    """calamine 引擎是否可用（已安装 python-calamine 且 pandas 不低于 2.2）"""
+    if python_calamine is None:
+        return False
+    major, minor = (int(part) for part in pd.__version__.split(".")[:2])
+    return (major, minor) >= (2, 2)
+
+
+def get_engine_versions() -> Dict[str, Optional[str]]:
+    """当前环境中与读取结果相关的库版本（校验结果只对相同版本有效）"""
+    return {
+        "pandas": pd.__version__,
+        "python_calamine": metadata.version("python-calamine") if python_calamine is not None else None,
+    }
+
+
+def _load_check_result() -> Dict[str, Any]:
+    """读取基准测试的一致性校验结果（进程内只读取一次）"""
+    global _check_result
+    if _check_result is None:
+        try:
+            with open(XLSX_READER_CHECK_FILE, "r", encoding="utf-8") as f:
+                _check_result = json.load(f)
+        except (OSError, ValueError):
+            _check_result = {}
+    return _check_result
+
+
+def save_check_result(result: Dict[str, Any]):
+    """
+    保存基准测试的一致性校验结果
+
+    Args:
+        result: {versions: 库版本, modules: 模块名称 -> {identical: 是否完全一致, files: 参与校验的文件, ...}}
+    """
+    global _check_result
+    XLSX_READER_CHECK_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(XLSX_READER_CHECK_FILE, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    _check_result = result
+
+
+def get_module_check_results() -> Dict[str, Dict[str, Any]]:
+    """当前库版本下各模块的一致性校验结果（库版本变化后旧结果全部失效）"""
+    result = _load_check_result()
+    if result.get("versions") != get_engine_versions():
+        return {}
+    return dict(result.get("modules") or {})
+
+
+def is_calamine_verified(module_name: Optional[str]) -> bool:
+    """
+    calamine 是否已在当前库版本下通过该模块文件的一致性校验
+
+    Args:
+        module_name: 模块名称（文件名前缀），None 表示无法确定模块，视为未校验
+
+    Returns:
+        bool: 是否通过校验
+    """
+    if not module_name:
+        return False
+    return bool(get_module_check_results().get(module_name, {}).get("identical"))
+
+
+def get_module_prefix(source) -> Optional[str]:
+    """从下载文件名（模块名称_时间戳.xlsx）中取出模块名称，非文件路径返回None"""
+    if isinstance(source, (str, Path)):
+        return Path(source).stem.split("_", 1)[0]
+    return None
+
+
+def resolve_engine(module_name: Optional[str] = None) -> str:
+    """
+    确定读取引擎
+
+    Args:
+        module_name: 模块名称（文件名前缀），有单独配置时优先使用
+
+    Returns:
+        str: "openpyxl" 或 "calamine"
+    """
+    engine = XLSX_READER_MODULE_ENGINES.get(module_name, XLSX_READER_ENGINE) if module_name else XLSX_READER_ENGINE
+    if engine == ENGINE_AUTO:
+        return ENGINE_CALAMINE if is_calamine_available() and is_calamine_verified(module_name) else ENGINE_OPENPYXL
+    if engine == ENGINE_CALAMINE and not is_calamine_available():
+        return ENGINE_OPENPYXL
+    return engine
+
+
+def read_xlsx(source, module_name: Optional[str] = None, engine: Optional[str] = None,
+              **kwargs) -> pd.DataFrame:
+    """
+    读取 xlsx（参数同 pd.read_excel）
+
+    calamine 读取失败时改用 openpyxl 重试
+
+    Args:
+        source: 文件路径或文件内容（BytesIO）
+        module_name: 模块名称，None 时从文件名推断
+        engine: 指定引擎，None 时按配置选择
+        **kwargs: 传给 pd.read_excel 的其他参数
+
+    Returns:
+        pd.DataFrame
+    """
+    engine = engine or resolve_engine(module_name or get_module_prefix(source))
+    if engine != ENGINE_CALAMINE:
+        return pd.read_excel(source, engine=ENGINE_OPENPYXL, **kwargs)
+
+    try:
+        return pd.read_excel(source, engine=ENGINE_CALAMINE, **kwargs)
+    except Exception as e:
+        logger.warning(f"calamine 读取失败，改用 openpyxl: {str(e)}")
+        if hasattr(source, "seek"):
+            source.seek(0)
+        return pd.read_excel(source, engine=ENGINE_OPENPYXL, **kwargs)